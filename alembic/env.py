@@ -0,0 +1,70 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.core.config import settings
+from app.core.database import Base
+
+# Import all models to ensure they're registered with Base
+from app.models import client_expediteur, destinataire, livreur, colis, zone, historique_statut, charge_livreur, cle_idempotence
+
+config = context.config
+config.set_main_option("sqlalchemy.url", settings.database_url.replace("%", "%%"))
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Objets de la recherche texte créés en SQL brut (app/utils/text_search.py),
+# hors métadonnées : ignorés par l'autogénération
+UNMANAGED_OBJECTS = {"ix_colis_recherche_trgm"}
+UNMANAGED_PREFIXES = ("colis_fts",)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if reflected and compare_to is None:
+        if name in UNMANAGED_OBJECTS or (type_ == "table" and name.startswith(UNMANAGED_PREFIXES)):
+            return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    """Génère le SQL des migrations sans connexion à la base"""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Applique les migrations sur la base configurée"""
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+            include_object=include_object,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
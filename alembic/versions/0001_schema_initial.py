@@ -0,0 +1,79 @@
+"""schema initial
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+Tables telles que créées jusqu'ici par Base.metadata.create_all().
+Sur une base existante : alembic stamp 0001 puis alembic upgrade head.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUTS = ("créé", "collecté", "en stock", "en transit", "livré")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "client_expediteur",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("nom", sa.String()),
+        sa.Column("prenom", sa.String()),
+        sa.Column("email", sa.String(), unique=True),
+        sa.Column("telephone", sa.String()),
+        sa.Column("adresse", sa.String()),
+    )
+    op.create_table(
+        "destinataires",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("nom", sa.String(), nullable=False),
+        sa.Column("prenom", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), unique=True, nullable=False),
+        sa.Column("telephone", sa.String(), nullable=False),
+        sa.Column("adresse", sa.String(), nullable=False),
+    )
+    op.create_table(
+        "livreurs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("nom", sa.String(), nullable=False),
+        sa.Column("prenom", sa.String(), nullable=False),
+        sa.Column("telephone", sa.String(), nullable=False),
+        sa.Column("vehicule", sa.String(), nullable=True),
+        sa.Column("zone_assignee", sa.String(), nullable=True),
+    )
+    op.create_table(
+        "zones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("nom", sa.String(), nullable=False),
+        sa.Column("description", sa.String(), nullable=True),
+    )
+    op.create_table(
+        "colis",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("description", sa.String(), nullable=False),
+        sa.Column("poids", sa.String(), nullable=False),
+        sa.Column("statut", sa.Enum(*STATUTS, name="statutcolis")),
+        sa.Column("id_livreur", sa.Integer(), sa.ForeignKey("livreurs.id"), nullable=True),
+        sa.Column("id_client_expediteur", sa.Integer(), sa.ForeignKey("client_expediteur.id"), nullable=False),
+        sa.Column("id_destinataire", sa.Integer(), sa.ForeignKey("destinataires.id"), nullable=False),
+        sa.Column("id_zone", sa.Integer(), sa.ForeignKey("zones.id"), nullable=True),
+        sa.Column("ville_destination", sa.String(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("colis")
+    op.drop_table("zones")
+    op.drop_table("livreurs")
+    op.drop_table("destinataires")
+    op.drop_table("client_expediteur")
+    sa.Enum(name="statutcolis").drop(op.get_bind(), checkfirst=True)
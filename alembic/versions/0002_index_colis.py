@@ -0,0 +1,52 @@
+"""index colis pour la recherche et les assignations
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:30:00
+
+- (statut, id), (id_zone, id), (id_livreur, id) : filtres de search_colis,
+  get_assigned_colis et get_colis_by_livreur, triés pour la pagination
+- partiel id WHERE id_livreur IS NULL : get_unassigned_colis
+- partiel (id_livreur, statut) WHERE statut <> 'livré' : colis en cours
+
+Sur PostgreSQL les index sont construits avec CREATE INDEX CONCURRENTLY
+(hors transaction) pour ne pas bloquer les écritures sur la table colis.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_colis_statut_id", "colis", ["statut", "id"], postgresql_concurrently=True)
+        op.create_index("ix_colis_zone_id", "colis", ["id_zone", "id"], postgresql_concurrently=True)
+        op.create_index("ix_colis_livreur_id", "colis", ["id_livreur", "id"], postgresql_concurrently=True)
+        op.create_index(
+            "ix_colis_non_assignes", "colis", ["id"],
+            postgresql_where=sa.text("id_livreur IS NULL"),
+            sqlite_where=sa.text("id_livreur IS NULL"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_colis_actifs_livreur_statut", "colis", ["id_livreur", "statut"],
+            postgresql_where=sa.text("statut <> 'livré'"),
+            sqlite_where=sa.text("statut <> 'livré'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_colis_actifs_livreur_statut", table_name="colis")
+    op.drop_index("ix_colis_non_assignes", table_name="colis")
+    op.drop_index("ix_colis_livreur_id", table_name="colis")
+    op.drop_index("ix_colis_zone_id", table_name="colis")
+    op.drop_index("ix_colis_statut_id", table_name="colis")
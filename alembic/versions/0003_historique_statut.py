@@ -0,0 +1,45 @@
+"""historique des statuts des colis
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:00:00
+
+Journal en ajout seul des transitions de statut, lu par
+GET /colis/{id}/historique via l'index (id_colis, timestamp).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUTS = ("créé", "collecté", "en stock", "en transit", "livré")
+
+# Le type enum statutcolis existe déjà sur PostgreSQL (table colis)
+statut_colis = sa.Enum(*STATUTS, name="statutcolis").with_variant(
+    postgresql.ENUM(*STATUTS, name="statutcolis", create_type=False), "postgresql"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "historique_statut",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), primary_key=True),
+        sa.Column("id_colis", sa.Integer(), sa.ForeignKey("colis.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("ancien_statut", statut_colis, nullable=True),
+        sa.Column("nouveau_statut", statut_colis, nullable=False),
+        sa.Column("timestamp", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_historique_statut_colis_timestamp", "historique_statut", ["id_colis", "timestamp"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_historique_statut_colis_timestamp", table_name="historique_statut")
+    op.drop_table("historique_statut")
@@ -0,0 +1,47 @@
+"""charge des livreurs par statut
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 13:00:00
+
+Compteurs (id_livreur, statut) -> nombre de colis servis par
+GET /livreurs/workload, initialisés depuis la table colis.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUTS = ("créé", "collecté", "en stock", "en transit", "livré")
+
+# Le type enum statutcolis existe déjà sur PostgreSQL (table colis)
+statut_colis = sa.Enum(*STATUTS, name="statutcolis").with_variant(
+    postgresql.ENUM(*STATUTS, name="statutcolis", create_type=False), "postgresql"
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "charge_livreur",
+        sa.Column("id_livreur", sa.Integer(), sa.ForeignKey("livreurs.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("statut", statut_colis, primary_key=True),
+        sa.Column("nombre", sa.Integer(), nullable=False),
+    )
+    op.execute(
+        "INSERT INTO charge_livreur (id_livreur, statut, nombre) "
+        "SELECT id_livreur, statut, count(*) FROM colis "
+        "WHERE id_livreur IS NOT NULL AND statut IS NOT NULL "
+        "GROUP BY id_livreur, statut"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("charge_livreur")
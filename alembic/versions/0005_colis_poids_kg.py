@@ -0,0 +1,61 @@
+"""poids numérique des colis
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 15:00:00
+
+Ajoute colis.poids_kg, rempli en analysant les valeurs texte existantes de
+colis.poids (parse_poids, lots de BACKFILL_BATCH lignes validés un par un :
+le verrou pris par ADD COLUMN n'est pas conservé pendant tout le remplissage),
+puis l'index ix_colis_poids_kg des filtres poids_min / poids_max.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.poids import parse_poids
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 5000
+
+
+def upgrade() -> None:
+    op.add_column("colis", sa.Column("poids_kg", sa.Numeric(10, 3, asdecimal=False), nullable=True))
+
+    colis = sa.table("colis", sa.column("id", sa.Integer), sa.column("poids", sa.String),
+                     sa.column("poids_kg", sa.Numeric(10, 3, asdecimal=False)))
+    bind = op.get_bind()
+    # Hors de la transaction de la migration : ADD COLUMN est validé avant le
+    # remplissage et chaque lot est validé séparément (une seule instruction
+    # UPDATE par lot)
+    with op.get_context().autocommit_block():
+        last_id = 0
+        while True:
+            rows = bind.execute(
+                sa.select(colis.c.id, colis.c.poids).where(colis.c.id > last_id).order_by(colis.c.id).limit(BACKFILL_BATCH)
+            ).all()
+            if not rows:
+                break
+            first_id, last_id = rows[0].id, rows[-1].id
+            values = {row.id: parse_poids(row.poids) for row in rows}
+            values = {colis_id: poids_kg for colis_id, poids_kg in values.items() if poids_kg is not None}
+            if values:
+                bind.execute(
+                    colis.update()
+                    .where(colis.c.id.between(first_id, last_id))
+                    .values(poids_kg=sa.case(values, value=colis.c.id, else_=colis.c.poids_kg))
+                )
+
+        op.create_index("ix_colis_poids_kg", "colis", ["poids_kg"], postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_colis_poids_kg", table_name="colis")
+    op.drop_column("colis", "poids_kg")
@@ -0,0 +1,45 @@
+"""recherche texte sur les colis
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:00:00
+
+- PostgreSQL : extension pg_trgm et index GIN trigrammes
+  ix_colis_recherche_trgm (CREATE INDEX CONCURRENTLY)
+- SQLite : table FTS5 colis_fts, triggers de synchronisation et
+  indexation des colis existants
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.utils.text_search import POSTGRESQL_DDL, POSTGRESQL_DROP, SQLITE_DDL, SQLITE_DROP, SQLITE_REBUILD
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        with op.get_context().autocommit_block():
+            for statement in POSTGRESQL_DDL:
+                op.execute(statement.format(concurrently="CONCURRENTLY "))
+    elif dialect == "sqlite":
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        op.execute(SQLITE_REBUILD)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        for statement in POSTGRESQL_DROP:
+            op.execute(statement)
+    elif dialect == "sqlite":
+        for statement in SQLITE_DROP:
+            op.execute(statement)
@@ -0,0 +1,28 @@
+"""version des colis
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 17:00:00
+
+Ajoute colis.version (verrou optimiste des assignations et modifications),
+à 1 pour les lignes existantes via la valeur par défaut serveur.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("colis", sa.Column("version", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    op.drop_column("colis", "version")
@@ -0,0 +1,38 @@
+"""file d'attente des livreurs
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 18:00:00
+
+Ajoute colis.priorite (0 pour les colis existants) et l'index partiel
+ix_colis_file_attente (id_zone, priorite DESC, id) des colis non assignés,
+parcouru par POST /livreurs/{id}/claim.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("colis", sa.Column("priorite", sa.Integer(), nullable=False, server_default="0"))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_colis_file_attente", "colis", ["id_zone", sa.column("priorite").desc(), "id"],
+            postgresql_where=sa.text("id_livreur IS NULL"),
+            sqlite_where=sa.text("id_livreur IS NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_colis_file_attente", table_name="colis")
+    op.drop_column("colis", "priorite")
@@ -0,0 +1,38 @@
+"""clés d'idempotence
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 19:00:00
+
+Table cle_idempotence : réponses rejouées pour les POST /colis et
+POST /assignments portant un en-tête Idempotency-Key, quand
+IDEMPOTENCY_BACKEND=database. Les lignes expirées sont purgées par l'application.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cle_idempotence",
+        sa.Column("cle", sa.String(length=300), primary_key=True),
+        sa.Column("empreinte", sa.String(length=64), nullable=False),
+        sa.Column("code_statut", sa.Integer(), nullable=True),
+        sa.Column("reponse", sa.LargeBinary(), nullable=True),
+        sa.Column("expire_le", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_cle_idempotence_expire_le", "cle_idempotence", ["expire_le"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cle_idempotence_expire_le", table_name="cle_idempotence")
+    op.drop_table("cle_idempotence")
@@ -1,23 +1,42 @@
+from sqlalchemy import bindparam, case, select, update
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from app.models.colis import Colis, StatutColis
 from app.models.livreur import Livreur
 from app.models.zone import Zone
 from app.schemas.assignment import AssignmentCreate
+from collections import Counter
 from typing import Optional
 from app.utils.logger import get_logger
+from app.utils.queries import existing_ids, rows_by_id
+from app.utils.dispatch import plan_assignments
+from app.core.config import settings
+from app.controllers.historique_controller import record_statut_change, record_statut_changes
+from app.controllers.workload_controller import move_workload, apply_workload, active_loads
+from app.core.events import event_bus, publish_colis_event
+from app.controllers.colis_controller import ConcurrentModificationError, colis_query, colis_dicts
 
 logger = get_logger(__name__)
 
+CONFLICT_MESSAGE = "Colis modified concurrently"
+
 
 def assign_colis_to_livreur(db: Session, assignment: AssignmentCreate):
     try:
         logger.info(f"Tentative d'assignation du colis ID {assignment.colis_id} au livreur ID {assignment.livreur_id}")
         
-        colis = db.query(Colis).filter(Colis.id == assignment.colis_id).first()
+        # Ligne verrouillée jusqu'au commit (PostgreSQL) : deux dispatchers sur le
+        # même colis sont sérialisés ; la colonne version détecte les autres cas
+        colis = db.query(Colis).filter(Colis.id == assignment.colis_id).with_for_update().first()
         if not colis:
             logger.warning(f"Colis non trouvé pour l'assignation - ID: {assignment.colis_id}")
             return None, "Colis not found"
         
+        if assignment.version is not None and assignment.version != colis.version:
+            db.rollback()
+            logger.warning(f"Colis modifié depuis sa lecture - ID: {assignment.colis_id}, Version attendue: {assignment.version}, En base: {colis.version}")
+            return None, CONFLICT_MESSAGE
+        
         livreur = db.query(Livreur).filter(Livreur.id == assignment.livreur_id).first()
         if not livreur:
             logger.warning(f"Livreur non trouvé pour l'assignation - ID: {assignment.livreur_id}")
@@ -31,31 +50,273 @@ def assign_colis_to_livreur(db: Session, assignment: AssignmentCreate):
             colis.id_zone = assignment.zone_id
         
         old_statut = colis.statut
+        old_livreur = colis.id_livreur
         colis.id_livreur = assignment.livreur_id
         
         if colis.statut == StatutColis.CREE:
             colis.statut = StatutColis.EN_TRANSIT
+            record_statut_change(db, colis.id, old_statut, colis.statut)
+        
+        workload = Counter()
+        move_workload(workload, (old_livreur, old_statut), (colis.id_livreur, colis.statut))
+        apply_workload(db, workload)
         
         db.commit()
         db.refresh(colis)
+        publish_colis_event("colis.assigned", colis)
         
         logger.info(f"Colis assigné avec succès - Colis ID: {assignment.colis_id}, Livreur: {livreur.nom} {livreur.prenom}, Statut: {old_statut.value} -> {colis.statut.value}")
         return colis, "Colis assigned successfully"
+    except StaleDataError as e:
+        db.rollback()
+        logger.warning(f"Assignation concurrente du colis ID {assignment.colis_id}: {str(e)}")
+        return None, CONFLICT_MESSAGE
     except Exception as e:
         db.rollback()
         logger.error(f"Erreur lors de l'assignation du colis ID {assignment.colis_id}: {str(e)}")
         raise
 
 
-def get_assigned_colis(db: Session, livreur_id: Optional[int] = None):
+def assign_colis_batch(db: Session, assignments: list[AssignmentCreate]):
+    """
+    Assigne une vague de colis en une transaction : une requête IN par table
+    pour vérifier les références (colis verrouillés), puis un UPDATE exécuté en
+    lot par clé primaire et version. Retourne un résultat par élément, dans l'ordre de
+    la requête ; lève ConcurrentModificationError si un colis a changé entre
+    la lecture et l'écriture (rien n'est appliqué).
+    """
+    try:
+        logger.info(f"Tentative d'assignation groupée de {len(assignments)} colis")
+        
+        colis_rows = rows_by_id(
+            db, Colis, (a.colis_id for a in assignments),
+            Colis.statut, Colis.id_zone, Colis.id_livreur, Colis.version, for_update=True
+        )
+        livreurs = existing_ids(db, Livreur, (a.livreur_id for a in assignments))
+        zones = existing_ids(db, Zone, (a.zone_id for a in assignments))
+        
+        results = []
+        updates = []
+        seen = set()
+        for assignment in assignments:
+            colis = colis_rows.get(assignment.colis_id)
+            if not colis:
+                message = "Colis not found"
+            elif assignment.colis_id in seen:
+                message = "Duplicate colis in batch"
+            elif assignment.livreur_id not in livreurs:
+                message = "Livreur not found"
+            elif assignment.zone_id and assignment.zone_id not in zones:
+                message = "Zone not found"
+            elif assignment.version is not None and assignment.version != colis.version:
+                message = CONFLICT_MESSAGE
+            else:
+                message = None
+            
+            if message:
+                results.append({
+                    "colis_id": assignment.colis_id,
+                    "livreur_id": assignment.livreur_id,
+                    "zone_id": assignment.zone_id,
+                    "success": False,
+                    "message": message
+                })
+                continue
+            
+            seen.add(assignment.colis_id)
+            zone_id = assignment.zone_id or colis.id_zone
+            statut = StatutColis.EN_TRANSIT if colis.statut == StatutColis.CREE else colis.statut
+            updates.append({
+                "id": assignment.colis_id,
+                "id_livreur": assignment.livreur_id,
+                "id_zone": zone_id,
+                "statut": statut,
+                "version": colis.version
+            })
+            results.append({
+                "colis_id": assignment.colis_id,
+                "livreur_id": assignment.livreur_id,
+                "zone_id": zone_id,
+                "success": True,
+                "message": "Colis assigned successfully"
+            })
+        
+        if updates:
+            # Un seul UPDATE exécuté en lot (executemany) sur la table : la
+            # version lue est vérifiée dans le WHERE et incrémentée ; une ligne
+            # non modifiée signale une écriture concurrente
+            table = Colis.__table__
+            result = db.execute(
+                update(table)
+                .where(table.c.id == bindparam("b_id"), table.c.version == bindparam("b_version"))
+                .values(id_livreur=bindparam("b_livreur"), id_zone=bindparam("b_zone"),
+                        statut=bindparam("b_statut"), version=table.c.version + 1),
+                [{"b_id": item["id"], "b_version": item["version"], "b_livreur": item["id_livreur"],
+                  "b_zone": item["id_zone"], "b_statut": item["statut"]} for item in updates]
+            )
+            if db.get_bind().dialect.supports_sane_multi_rowcount and result.rowcount != len(updates):
+                raise StaleDataError(
+                    f"UPDATE de colis : {result.rowcount} ligne(s) modifiée(s) sur {len(updates)} attendue(s)"
+                )
+            record_statut_changes(db, [
+                {"id_colis": item["id"], "ancien_statut": colis_rows[item["id"]].statut, "nouveau_statut": item["statut"]}
+                for item in updates
+            ])
+            workload = Counter()
+            for item in updates:
+                colis = colis_rows[item["id"]]
+                move_workload(workload, (colis.id_livreur, colis.statut), (item["id_livreur"], item["statut"]))
+            apply_workload(db, workload)
+            db.commit()
+            for item in updates:
+                event_bus.publish(
+                    "colis.assigned",
+                    colis_id=item["id"],
+                    statut=item["statut"].value,
+                    id_livreur=item["id_livreur"],
+                    id_zone=item["id_zone"],
+                )
+        
+        logger.info(f"Assignation groupée terminée - Assignés: {len(updates)}, Rejetés: {len(results) - len(updates)}")
+        return len(updates), results
+    except StaleDataError as e:
+        db.rollback()
+        logger.warning(f"Assignation groupée en conflit avec une modification concurrente: {str(e)}")
+        raise ConcurrentModificationError(str(e)) from e
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erreur lors de l'assignation groupée: {str(e)}")
+        raise
+
+
+def get_assigned_colis(db: Session, livreur_id: Optional[int] = None, columns: Optional[tuple] = None):
 
-    query = db.query(Colis).filter(Colis.id_livreur.isnot(None))
+    query = colis_query(db, columns).filter(Colis.id_livreur.isnot(None))
     
     if livreur_id:
         query = query.filter(Colis.id_livreur == livreur_id)
     
-    return query.all()
+    return colis_dicts(query.all(), columns)
+
+
+def get_unassigned_colis(db: Session, columns: Optional[tuple] = None):
+    return colis_dicts(colis_query(db, columns).filter(Colis.id_livreur.is_(None)).all(), columns)
+
+
+def auto_assign_colis(db: Session, max_load: Optional[int] = None):
+    """
+    Assigne automatiquement les colis non assignés aux livreurs, en tenant
+    compte de la zone et de la charge de chacun ; retourne
+    (méthode, nombre assigné, nombre restant, résultats)
+    """
+    try:
+        max_load = max_load or settings.AUTO_ASSIGN_MAX_LOAD
+        # Mêmes colis que get_unassigned_colis, sans charger les objets complets
+        colis = db.execute(
+            select(Colis.id, Colis.id_zone).where(Colis.id_livreur.is_(None)).order_by(Colis.id)
+        ).all()
+        zones = dict(db.execute(select(Zone.nom, Zone.id)).all())
+        livreurs = [
+            (livreur_id, zones.get(zone_assignee))
+            for livreur_id, zone_assignee in db.execute(select(Livreur.id, Livreur.zone_assignee))
+        ]
+        loads = active_loads(db)
+        logger.info(f"Assignation automatique - Colis: {len(colis)}, Livreurs: {len(livreurs)}")
 
+        plan, method = plan_assignments(
+            [tuple(row) for row in colis], livreurs, loads,
+            zone_penalty=settings.AUTO_ASSIGN_ZONE_PENALTY,
+            max_load=max_load,
+            optimal_max=settings.AUTO_ASSIGN_OPTIMAL_MAX,
+        )
+        assigned, results = assign_colis_batch(
+            db, [AssignmentCreate(colis_id=colis_id, livreur_id=livreur_id) for colis_id, livreur_id in plan]
+        )
+        logger.info(f"Assignation automatique terminée ({method}) - Assignés: {assigned}, Restants: {len(colis) - assigned}")
+        return method, assigned, len(colis) - assigned, results
+    except ConcurrentModificationError as e:
+        # Conflit attendu (409), déjà journalisé par assign_colis_batch
+        db.rollback()
+        logger.warning(f"Assignation automatique en conflit avec une modification concurrente: {str(e)}")
+        raise
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erreur lors de l'assignation automatique: {str(e)}")
+        raise
+
+
+# Colis en attente d'un livreur : les colis non assignés déjà en transit ou
+# livrés ne sont pas proposés
+CLAIMABLE_STATUTS = (StatutColis.CREE, StatutColis.COLLECTE, StatutColis.EN_STOCK)
+
+# Ordre de la file de prise en charge : (tri SQL, même tri sur les lignes
+# retournées) ; l'ID croissant tient lieu d'ancienneté
+CLAIM_ORDERS = {
+    "priorite": ((Colis.priorite.desc(), Colis.id), lambda row: (-row["priorite"], row["id"])),
+    "anciennete": ((Colis.id,), lambda row: row["id"]),
+}
+
+
+def claim_colis(db: Session, livreur_id: int, n: int):
+    """
+    Attribue atomiquement au livreur les n prochains colis en attente de sa
+    zone (toutes zones si sa zone est inconnue), dans l'ordre CLAIM_ORDER ;
+    retourne les colis pris, ou None si le livreur n'existe pas.
 
-def get_unassigned_colis(db: Session):
-    return db.query(Colis).filter(Colis.id_livreur.is_(None)).all()
+    Un seul UPDATE ... WHERE id IN (SELECT ... FOR UPDATE SKIP LOCKED LIMIT n)
+    RETURNING : sur PostgreSQL, les livreurs concurrents sautent les lignes
+    déjà verrouillées au lieu de les attendre ; sur SQLite l'instruction
+    s'exécute sous le verrou d'écriture de la base.
+    """
+    try:
+        livreur = db.execute(select(Livreur.id, Livreur.zone_assignee).where(Livreur.id == livreur_id)).first()
+        if not livreur:
+            logger.warning(f"Livreur non trouvé pour la prise en charge - ID: {livreur_id}")
+            return None
+        zone_id = db.scalar(select(Zone.id).where(Zone.nom == livreur.zone_assignee))
+        order_by, sort_key = CLAIM_ORDERS[settings.CLAIM_ORDER]
+
+        pending = select(Colis.id).where(Colis.id_livreur.is_(None), Colis.statut.in_(CLAIMABLE_STATUTS))
+        if zone_id is not None:
+            pending = pending.where(Colis.id_zone == zone_id)
+        pending = pending.order_by(*order_by).limit(n).with_for_update(skip_locked=True)
+
+        # Les colis "créé" passent "en transit", comme pour une assignation
+        claimed = db.execute(
+            update(Colis)
+            .where(Colis.id.in_(pending), Colis.id_livreur.is_(None))
+            .values(
+                id_livreur=livreur_id,
+                statut=case((Colis.statut == StatutColis.CREE, StatutColis.EN_TRANSIT), else_=Colis.statut),
+                version=Colis.version + 1,
+            )
+            .returning(*Colis.__table__.c)
+            .execution_options(synchronize_session=False)
+        ).mappings().all()
+
+        if claimed:
+            record_statut_changes(db, [
+                {"id_colis": row["id"], "ancien_statut": StatutColis.CREE, "nouveau_statut": row["statut"]}
+                for row in claimed if row["statut"] == StatutColis.EN_TRANSIT
+            ])
+            workload = Counter()
+            for row in claimed:
+                move_workload(workload, (None, None), (livreur_id, row["statut"]))
+            apply_workload(db, workload)
+        db.commit()
+
+        for row in claimed:
+            event_bus.publish(
+                "colis.assigned",
+                colis_id=row["id"],
+                statut=row["statut"].value,
+                id_livreur=livreur_id,
+                id_zone=row["id_zone"],
+            )
+        claimed = sorted(claimed, key=sort_key)
+        logger.info(f"Prise en charge - Livreur ID: {livreur_id}, Zone: {zone_id}, Colis: {len(claimed)}/{n}")
+        return claimed
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erreur lors de la prise en charge de colis par le livreur ID {livreur_id}: {str(e)}")
+        raise
@@ -1,26 +1,54 @@
+from sqlalchemy import and_, delete, insert, or_, select
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
 from app.models.colis import Colis, StatutColis
-from app.schemas.colis import ColisCreate, ColisUpdate
+from app.models.client_expediteur import ClientExpediteur
+from app.models.destinataire import Destinataire
+from app.models.livreur import Livreur
+from app.models.zone import Zone
+from app.models.historique_statut import HistoriqueStatut
+from app.controllers.historique_controller import record_statut_change, record_statut_changes, get_historique_colis
+from app.controllers.workload_controller import move_workload, apply_workload
+from app.schemas.colis import ColisCreate, ColisUpdate, ColisRead
+from collections import Counter
 from typing import Optional
+from app.core.config import settings
+from app.core.events import publish_colis_event
 from app.utils.logger import get_logger
+from app.utils.pagination import encode_cursor, decode_cursor, InvalidCursorError
+from app.utils.queries import existing_ids
+from app.utils.poids import parse_poids
+from app.utils.text_search import apply_text_search
 
 logger = get_logger(__name__)
 
+
+class ConcurrentModificationError(Exception):
+    """Le colis a été modifié par une autre requête depuis sa lecture"""
+
+
 def create_colis(db:Session,colis:ColisCreate):
     try:
         logger.info(f"Tentative de création d'un colis - Description: {colis.description}, Destination: {colis.ville_destination}")
         db_colis = Colis(
             description=colis.description,
             poids=colis.poids,
+            poids_kg=parse_poids(colis.poids),
             statut=colis.statut,
             ville_destination=colis.ville_destination,
             id_livreur=colis.id_livreur,
             id_client_expediteur=colis.id_client_expediteur,
             id_destinataire=colis.id_destinataire,
-            id_zone=colis.id_zone
+            id_zone=colis.id_zone,
+            priorite=colis.priorite
         )
         
         db.add(db_colis)
+        db.flush()
+        record_statut_change(db, db_colis.id, None, db_colis.statut)
+        workload = Counter()
+        move_workload(workload, (None, None), (db_colis.id_livreur, db_colis.statut))
+        apply_workload(db, workload)
         db.commit()
         db.refresh(db_colis)
         logger.info(f"Colis créé avec succès - ID: {db_colis.id}, Statut: {db_colis.statut.value}")
@@ -30,12 +58,168 @@ def create_colis(db:Session,colis:ColisCreate):
         logger.error(f"Erreur lors de la création du colis: {str(e)}")
         raise
 
-def get_all_colis(db:Session):
-    return db.query(Colis).all()
+# Clés étrangères vérifiées avant l'insertion en masse : (champ, modèle, message)
+BULK_REFERENCES = (
+    ("id_client_expediteur", ClientExpediteur, "Client expéditeur introuvable"),
+    ("id_destinataire", Destinataire, "Destinataire introuvable"),
+    ("id_livreur", Livreur, "Livreur introuvable"),
+    ("id_zone", Zone, "Zone introuvable"),
+)
+
+
+def create_colis_bulk(db: Session, colis_list: list[ColisCreate]):
+    """
+    Crée un lot de colis dans une seule transaction.
+    
+    Les références sont vérifiées avec une requête IN par table, les lignes
+    invalides sont écartées et signalées par leur index, les autres sont
+    insérées en INSERT multi-lignes ... RETURNING id.
+    """
+    try:
+        logger.info(f"Tentative de création en masse de {len(colis_list)} colis")
+        
+        known = {
+            field: existing_ids(db, model, (getattr(colis, field) for colis in colis_list))
+            for field, model, _ in BULK_REFERENCES
+        }
+        
+        rows = []
+        errors = []
+        for index, colis in enumerate(colis_list):
+            missing = [
+                message for field, _, message in BULK_REFERENCES
+                if getattr(colis, field) is not None and getattr(colis, field) not in known[field]
+            ]
+            if missing:
+                errors.append({"index": index, "detail": ", ".join(missing)})
+                continue
+            row = colis.model_dump()
+            row["poids_kg"] = parse_poids(colis.poids)
+            rows.append(row)
+        
+        ids = []
+        if rows:
+            stmt = insert(Colis).returning(Colis.id, sort_by_parameter_order=True)
+            ids = list(db.scalars(stmt, rows))
+            record_statut_changes(db, [
+                {"id_colis": colis_id, "ancien_statut": None, "nouveau_statut": row["statut"]}
+                for colis_id, row in zip(ids, rows)
+            ])
+            workload = Counter()
+            for row in rows:
+                move_workload(workload, (None, None), (row["id_livreur"], row["statut"]))
+            apply_workload(db, workload)
+            db.commit()
+        
+        logger.info(f"Création en masse terminée - Créés: {len(ids)}, Rejetés: {len(errors)}")
+        return ids, errors
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erreur lors de la création en masse des colis: {str(e)}")
+        raise
+
+
+# Colonnes de ColisRead, dans l'ordre du schéma : lues en tuples par le chemin
+# de sérialisation rapide (FAST_JSON_RESPONSES), sans objets ORM
+READ_COLUMNS = tuple(getattr(Colis, field) for field in ColisRead.model_fields)
+
+
+class InvalidFieldsError(ValueError):
+    """Champ inconnu dans le paramètre fields"""
+
+
+def read_columns(fields: Optional[str] = None) -> Optional[tuple]:
+    """
+    Colonnes à lire pour une liste de colis : celles de fields=id,statut,...
+    (id toujours incluse, ordre de ColisRead), toutes en chemin rapide, ou
+    None pour des objets ORM validés par ColisRead
+    """
+    if fields is None:
+        return READ_COLUMNS if settings.FAST_JSON_RESPONSES else None
+    wanted = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = wanted - set(ColisRead.model_fields)
+    if unknown:
+        raise InvalidFieldsError(f"Champs inconnus : {', '.join(sorted(unknown))}")
+    wanted.add("id")
+    return tuple(column for column in READ_COLUMNS if column.key in wanted)
+
+
+def colis_query(db: Session, columns: Optional[tuple] = None):
+    """
+    Requête sur les colis : objets ORM, ou seulement les colonnes demandées
+    (lignes tuples, sans identity map)
+    """
+    return db.query(*columns) if columns else db.query(Colis)
+
+
+def colis_dicts(rows, columns: Optional[tuple] = None):
+    """
+    Lignes tuples -> dictionnaires prêts à encoder ; objets ORM inchangés
+    """
+    if not columns:
+        return rows
+    fields = tuple(column.key for column in columns)
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def _paginate(query, limit: int, after: Optional[str]):
+    """
+    Pagination par clé sur Colis.id : WHERE id > :dernier ORDER BY id LIMIT :n,
+    le coût d'une page ne dépend pas de sa profondeur (contrairement à OFFSET)
+    """
+    limit = max(1, min(limit, settings.PAGE_SIZE_MAX))
+    if after is not None:
+        last_id = decode_cursor(after)[0]
+        if not isinstance(last_id, int):
+            raise InvalidCursorError("Curseur de pagination invalide")
+        query = query.filter(Colis.id > last_id)
+
+    # Une ligne de plus que demandé indique l'existence d'une page suivante
+    rows = query.order_by(Colis.id).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id)
+    return rows, next_cursor
+
+
+def _paginate_ranked(query, score, limit: int, after: Optional[str], columns: Optional[tuple] = None):
+    """
+    Pagination par clé sur (score, id) pour les résultats classés de la
+    recherche texte : le score le plus petit est le plus pertinent
+    """
+    limit = max(1, min(limit, settings.PAGE_SIZE_MAX))
+    if after is not None:
+        last_score, last_id = decode_cursor(after, size=2)
+        if not isinstance(last_score, (int, float)) or not isinstance(last_id, int):
+            raise InvalidCursorError("Curseur de pagination invalide")
+        query = query.filter(or_(score > last_score, and_(score == last_score, Colis.id > last_id)))
+
+    rows = query.add_columns(score).order_by(score, Colis.id).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_id = rows[-1].id if columns else rows[-1][0].id
+        next_cursor = encode_cursor(rows[-1][-1], last_id)
+    if columns:
+        return [row[:-1] for row in rows], next_cursor
+    return [colis for colis, _ in rows], next_cursor
+
+
+def get_all_colis(db:Session, limit: int = settings.PAGE_SIZE_DEFAULT, after: Optional[str] = None,
+                  columns: Optional[tuple] = None):
+    rows, next_cursor = _paginate(colis_query(db, columns), limit, after)
+    return colis_dicts(rows, columns), next_cursor
 
 def get_colis_by_id(db:Session,colis_id:int):
     return db.query(Colis).filter(Colis.id == colis_id).first()
 
+def get_colis_version(db: Session, colis_id: int) -> Optional[int]:
+    """
+    Version courante d'un colis, sans charger la ligne complète ; None s'il n'existe pas
+    """
+    return db.scalar(select(Colis.version).where(Colis.id == colis_id))
+
 def update_colis(db: Session, colis_id: int, colis: ColisUpdate):
     try:
         logger.info(f"Tentative de modification du colis ID: {colis_id}")
@@ -44,13 +228,30 @@ def update_colis(db: Session, colis_id: int, colis: ColisUpdate):
             logger.warning(f"Colis non trouvé pour la modification - ID: {colis_id}")
             return None
         
+        old_statut = db_colis.statut
+        old_livreur = db_colis.id_livreur
         updated_fields = colis.model_dump(exclude_unset=True)
+        expected_version = updated_fields.pop("version", None)
+        if expected_version is not None and expected_version != db_colis.version:
+            raise ConcurrentModificationError(f"Version {expected_version} attendue, {db_colis.version} en base")
         for key, value in updated_fields.items():
             setattr(db_colis, key, value)
+        if "poids" in updated_fields:
+            db_colis.poids_kg = parse_poids(db_colis.poids)
+        if updated_fields.get("statut") is not None:
+            record_statut_change(db, colis_id, old_statut, StatutColis(updated_fields["statut"]))
+        workload = Counter()
+        move_workload(workload, (old_livreur, old_statut), (db_colis.id_livreur, db_colis.statut))
+        apply_workload(db, workload)
         db.commit()
         db.refresh(db_colis)
+        publish_colis_event("colis.updated", db_colis)
         logger.info(f"Colis modifié avec succès - ID: {colis_id}, Champs: {list(updated_fields.keys())}")
         return db_colis
+    except (ConcurrentModificationError, StaleDataError) as e:
+        db.rollback()
+        logger.warning(f"Modification concurrente du colis ID {colis_id}: {str(e)}")
+        raise ConcurrentModificationError(str(e)) from e
     except Exception as e:
         db.rollback()
         logger.error(f"Erreur lors de la modification du colis ID {colis_id}: {str(e)}")
@@ -65,31 +266,42 @@ def delete_colis(db: Session, colis_id: int):
             return None
         
         colis_desc = db_colis.description
+        # Équivalent explicite du ON DELETE CASCADE (non appliqué par SQLite)
+        db.execute(delete(HistoriqueStatut).where(HistoriqueStatut.id_colis == colis_id))
+        workload = Counter()
+        move_workload(workload, (db_colis.id_livreur, db_colis.statut), (None, None))
+        apply_workload(db, workload)
         db.delete(db_colis)
         db.commit()
         logger.info(f"Colis supprimé avec succès - ID: {colis_id}, Description: {colis_desc}")
         return db_colis
+    except StaleDataError as e:
+        db.rollback()
+        logger.warning(f"Modification concurrente du colis ID {colis_id} pendant sa suppression: {str(e)}")
+        raise ConcurrentModificationError(str(e)) from e
     except Exception as e:
         db.rollback()
         logger.error(f"Erreur lors de la suppression du colis ID {colis_id}: {str(e)}")
         raise
 
 
-def search_colis(
-    db: Session, 
-    statut: Optional[str] = None, 
-    zone_id: Optional[int] = None, 
-    livreur_id: Optional[int] = None
+def _filter_colis(
+    query,
+    statut: Optional[str] = None,
+    zone_id: Optional[int] = None,
+    livreur_id: Optional[int] = None,
+    poids_min: Optional[float] = None,
+    poids_max: Optional[float] = None
 ):
-  
-    query = db.query(Colis)
-    
+    """
+    Applique les filtres de recherche ; retourne None si le statut est inconnu
+    """
     if statut:
         try:
             statut_enum = StatutColis(statut)
             query = query.filter(Colis.statut == statut_enum)
         except ValueError:
-            return []
+            return None
     
     if zone_id is not None:
         query = query.filter(Colis.id_zone == zone_id)
@@ -97,12 +309,102 @@ def search_colis(
     if livreur_id is not None:
         query = query.filter(Colis.id_livreur == livreur_id)
     
-    return query.all()
+    # Intervalle sur poids_kg (index ix_colis_poids_kg) ; les poids non reconnus sont exclus
+    if poids_min is not None:
+        query = query.filter(Colis.poids_kg >= poids_min)
+    
+    if poids_max is not None:
+        query = query.filter(Colis.poids_kg <= poids_max)
+    
+    return query
+
+
+def search_colis(
+    db: Session, 
+    statut: Optional[str] = None, 
+    zone_id: Optional[int] = None, 
+    livreur_id: Optional[int] = None,
+    limit: int = settings.PAGE_SIZE_DEFAULT,
+    after: Optional[str] = None,
+    poids_min: Optional[float] = None,
+    poids_max: Optional[float] = None,
+    q: Optional[str] = None,
+    columns: Optional[tuple] = None
+):
+  
+    query = _filter_colis(colis_query(db, columns), statut, zone_id, livreur_id, poids_min, poids_max)
+    if query is None:
+        return [], None
+    
+    if q:
+        # Recherche texte : résultats classés par pertinence puis par ID
+        query, score = apply_text_search(query, db.get_bind().dialect.name, q, Colis)
+        if query is None:
+            return [], None
+        rows, next_cursor = _paginate_ranked(query, score, limit, after, columns)
+    else:
+        rows, next_cursor = _paginate(query, limit, after)
+    return colis_dicts(rows, columns), next_cursor
+
 
+EXPORT_COLUMNS = (
+    Colis.id,
+    Colis.description,
+    Colis.poids,
+    Colis.poids_kg,
+    Colis.statut,
+    Colis.ville_destination,
+    Colis.id_livreur,
+    Colis.id_client_expediteur,
+    Colis.id_destinataire,
+    Colis.id_zone,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
 
-def get_colis_by_livreur(db: Session, livreur_id: int):
+
+def colis_export_statement(
+    statut: Optional[str] = None,
+    zone_id: Optional[int] = None,
+    livreur_id: Optional[int] = None,
+    poids_min: Optional[float] = None,
+    poids_max: Optional[float] = None
+):
+    """
+    Requête d'export des colis filtrés, en colonnes simples (sans objets ORM) ;
+    None si le statut est inconnu
+    """
+    statement = _filter_colis(select(*EXPORT_COLUMNS), statut, zone_id, livreur_id, poids_min, poids_max)
+    if statement is None:
+        return None
+    
+    logger.info(f"Export des colis - Statut: {statut}, Zone: {zone_id}, Livreur: {livreur_id}")
+    return statement.order_by(Colis.id)
+
+
+def get_historique(db: Session, colis_id: int):
+    """
+    Chronologie des statuts d'un colis ; None si le colis n'existe pas
+    """
+    historique = get_historique_colis(db, colis_id)
+    # Tout colis a au moins son entrée de création : l'existence n'est
+    # vérifiée que pour un historique vide
+    if not historique and not db.query(Colis.id).filter(Colis.id == colis_id).first():
+        return None
+    return historique
+
+
+def get_colis_by_livreur(db: Session, livreur_id: int, columns: Optional[tuple] = None):
     """
     Get all colis assigned to a specific livreur
     """
-    return db.query(Colis).filter(Colis.id_livreur == livreur_id).all()
+    return colis_dicts(colis_query(db, columns).filter(Colis.id_livreur == livreur_id).order_by(Colis.id).all(), columns)
+
+
+def get_colis_versions_by_livreur(db: Session, livreur_id: int):
+    """
+    (id, version) des colis d'un livreur, dans l'ordre de get_colis_by_livreur
+    """
+    return db.execute(
+        select(Colis.id, Colis.version).where(Colis.id_livreur == livreur_id).order_by(Colis.id)
+    ).all()
 
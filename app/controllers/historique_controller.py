@@ -0,0 +1,33 @@
+from typing import Optional
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.models.colis import StatutColis
+from app.models.historique_statut import HistoriqueStatut
+
+
+def record_statut_change(db: Session, colis_id: int, ancien_statut: Optional[StatutColis], nouveau_statut: StatutColis):
+    """
+    Ajoute une transition à l'historique, dans la transaction en cours
+    (sans commit : l'appelant valide avec le changement de statut)
+    """
+    if ancien_statut == nouveau_statut:
+        return
+    db.add(HistoriqueStatut(id_colis=colis_id, ancien_statut=ancien_statut, nouveau_statut=nouveau_statut))
+
+
+def record_statut_changes(db: Session, changes: list[dict]):
+    """
+    Ajoute un lot de transitions {id_colis, ancien_statut, nouveau_statut}
+    en un INSERT multi-lignes, dans la transaction en cours
+    """
+    rows = [change for change in changes if change["ancien_statut"] != change["nouveau_statut"]]
+    if rows:
+        db.execute(insert(HistoriqueStatut), rows)
+
+
+def get_historique_colis(db: Session, colis_id: int):
+    return db.scalars(
+        select(HistoriqueStatut)
+        .where(HistoriqueStatut.id_colis == colis_id)
+        .order_by(HistoriqueStatut.timestamp, HistoriqueStatut.id)
+    ).all()
@@ -1,10 +1,17 @@
 from sqlalchemy.orm import Session
 from app.models.livreur import Livreur
-from app.schemas.livreur import LivreurCreate, LivreurUpdate
+from app.schemas.livreur import LivreurCreate, LivreurUpdate, LivreurRead
+from app.core.config import settings
+from app.utils.cache import TTLCache
 from app.utils.logger import get_logger
+from app.controllers.workload_controller import delete_workload
 
 logger = get_logger(__name__)
 
+# Lectures des livreurs servies depuis le cache (schémas LivreurRead),
+# invalidé à chaque création, modification ou suppression
+livreurs_cache = TTLCache("livreurs", settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+
 def create_livreur(db: Session, livreur: LivreurCreate):
     try:
         logger.info(f"Tentative de création d'un livreur: {livreur.nom} {livreur.prenom}")
@@ -18,6 +25,7 @@ def create_livreur(db: Session, livreur: LivreurCreate):
         db.add(db_livreur)
         db.commit()
         db.refresh(db_livreur)
+        livreurs_cache.invalidate()
         logger.info(f"Livreur créé avec succès - ID: {db_livreur.id}, Nom: {db_livreur.nom} {db_livreur.prenom}")
         return db_livreur
     except Exception as e:
@@ -27,16 +35,27 @@ def create_livreur(db: Session, livreur: LivreurCreate):
 
 
 def get_livreurs(db:Session):
-    return db.query(Livreur).all()
+    return livreurs_cache.get_or_load(
+        "all",
+        lambda: [LivreurRead.model_validate(livreur) for livreur in db.query(Livreur).all()]
+    )
 
 
 def get_livreur_by_id(db:Session,livreur_id:int):
+    def load():
+        livreur = _get_livreur(db, livreur_id)
+        return LivreurRead.model_validate(livreur) if livreur else None
+
+    return livreurs_cache.get_or_load(("id", livreur_id), load)
+
+
+def _get_livreur(db: Session, livreur_id: int):
     return db.query(Livreur).filter(Livreur.id == livreur_id).first()
 
 def update_livreur(db: Session, livreur_id: int, livreur_update: LivreurUpdate):
     try:
         logger.info(f"Tentative de modification du livreur ID: {livreur_id}")
-        db_livreur = get_livreur_by_id(db, livreur_id)
+        db_livreur = _get_livreur(db, livreur_id)
         
         if not db_livreur:
             logger.warning(f"Livreur non trouvé pour la modification - ID: {livreur_id}")
@@ -47,6 +66,7 @@ def update_livreur(db: Session, livreur_id: int, livreur_update: LivreurUpdate):
             setattr(db_livreur, key, value)
         db.commit()
         db.refresh(db_livreur)
+        livreurs_cache.invalidate()
         logger.info(f"Livreur modifié avec succès - ID: {livreur_id}, Champs: {list(updated_fields.keys())}")
         return db_livreur
     except Exception as e:
@@ -57,14 +77,16 @@ def update_livreur(db: Session, livreur_id: int, livreur_update: LivreurUpdate):
 def delete_livreur(db: Session, livreur_id: int):
     try:
         logger.info(f"Tentative de suppression du livreur ID: {livreur_id}")
-        db_livreur = get_livreur_by_id(db, livreur_id)
+        db_livreur = _get_livreur(db, livreur_id)
         if not db_livreur:
             logger.warning(f"Livreur non trouvé pour la suppression - ID: {livreur_id}")
             return None
         
         livreur_name = f"{db_livreur.nom} {db_livreur.prenom}"
+        delete_workload(db, livreur_id)
         db.delete(db_livreur)
         db.commit()
+        livreurs_cache.invalidate()
         logger.info(f"Livreur supprimé avec succès - ID: {livreur_id}, Nom: {livreur_name}")
         return db_livreur
     except Exception as e:
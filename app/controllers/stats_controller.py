@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.models.colis import Colis
+from app.schemas.stats import ColisStats
+from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Un seul calcul par intervalle STATS_CACHE_TTL_SECONDS et par worker, quel que
+# soit le nombre de tableaux de bord ; pas d'invalidation sur écriture
+stats_cache = TTLCache("stats", 16, settings.STATS_CACHE_TTL_SECONDS)
+
+
+def _compute_colis_stats(db: Session) -> ColisStats:
+    rows = db.execute(
+        select(
+            Colis.statut, Colis.id_zone, Colis.id_livreur,
+            func.count(), func.coalesce(func.sum(Colis.poids_kg), 0), func.avg(Colis.poids_kg), func.count(Colis.poids_kg)
+        )
+        .group_by(Colis.statut, Colis.id_zone, Colis.id_livreur)
+    ).all()
+    par_statut = {}
+    groupes = []
+    poids_total = 0.0
+    pesees = 0
+    for statut, id_zone, id_livreur, nombre, somme, moyenne, avec_poids in rows:
+        statut = statut.value if statut is not None else None
+        groupes.append({
+            "statut": statut, "id_zone": id_zone, "id_livreur": id_livreur, "nombre": nombre,
+            "poids_total_kg": round(float(somme), 3),
+            "poids_moyen_kg": round(float(moyenne), 3) if moyenne is not None else None,
+        })
+        poids_total += float(somme)
+        pesees += avec_poids
+        if statut is not None:
+            par_statut[statut] = par_statut.get(statut, 0) + nombre
+    logger.info(f"Statistiques des colis recalculées - Groupes: {len(groupes)}")
+    return ColisStats(
+        total=sum(group["nombre"] for group in groupes),
+        poids_total_kg=round(poids_total, 3),
+        poids_moyen_kg=round(poids_total / pesees, 3) if pesees else None,
+        par_statut=par_statut,
+        groupes=groupes,
+        calcule_le=datetime.now(timezone.utc),
+    )
+
+
+def get_colis_stats(db: Session) -> ColisStats:
+    """
+    Nombre de colis par statut x zone x livreur (un seul GROUP BY), en cache
+    """
+    return stats_cache.get_or_load("colis", lambda: _compute_colis_stats(db))
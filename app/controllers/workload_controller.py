@@ -0,0 +1,95 @@
+from collections import Counter
+from typing import Optional
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.charge_livreur import ChargeLivreur
+from app.models.colis import Colis, StatutColis
+
+# Dialectes disposant de INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def move_workload(deltas: Counter, ancien: tuple, nouveau: tuple, nombre: int = 1):
+    """
+    Reporte dans deltas le passage de nombre colis de (livreur, statut) ancien
+    à nouveau ; (None, None) pour un colis créé ou supprimé
+    """
+    if ancien == nouveau:
+        return
+    if ancien[0] is not None and ancien[1] is not None:
+        deltas[(ancien[0], StatutColis(ancien[1]))] -= nombre
+    if nouveau[0] is not None and nouveau[1] is not None:
+        deltas[(nouveau[0], StatutColis(nouveau[1]))] += nombre
+
+
+def apply_workload(db: Session, deltas: Counter):
+    """
+    Applique les variations {(id_livreur, statut): delta} dans la transaction
+    en cours, par un upsert atomique (nombre = nombre + delta) par ligne
+    """
+    rows = [
+        {"id_livreur": livreur_id, "statut": statut, "nombre": delta}
+        for (livreur_id, statut), delta in deltas.items() if delta
+    ]
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in UPSERT_INSERTS:
+        stmt = UPSERT_INSERTS[dialect](ChargeLivreur)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ChargeLivreur.id_livreur, ChargeLivreur.statut],
+            set_={"nombre": ChargeLivreur.nombre + stmt.excluded.nombre},
+        )
+        db.execute(stmt, rows)
+        return
+    for row in rows:
+        updated = db.execute(
+            update(ChargeLivreur)
+            .where(ChargeLivreur.id_livreur == row["id_livreur"], ChargeLivreur.statut == row["statut"])
+            .values(nombre=ChargeLivreur.nombre + row["nombre"])
+        )
+        if not updated.rowcount:
+            db.add(ChargeLivreur(**row))
+
+
+def rebuild_workload(db: Session):
+    """
+    Recalcule toute la table depuis colis (reprise de données, contrôle de cohérence)
+    """
+    db.execute(delete(ChargeLivreur))
+    db.execute(insert(ChargeLivreur).from_select(
+        ["id_livreur", "statut", "nombre"],
+        select(Colis.id_livreur, Colis.statut, func.count())
+        .where(Colis.id_livreur.isnot(None), Colis.statut.isnot(None))
+        .group_by(Colis.id_livreur, Colis.statut)
+    ))
+
+
+def delete_workload(db: Session, livreur_id: int):
+    db.execute(delete(ChargeLivreur).where(ChargeLivreur.id_livreur == livreur_id))
+
+
+def get_workload(db: Session, livreur_id: Optional[int] = None):
+    """
+    Charge de chaque livreur ayant au moins un colis : total, colis en cours
+    (non livrés) et répartition par statut
+    """
+    query = select(ChargeLivreur.id_livreur, ChargeLivreur.statut, ChargeLivreur.nombre).where(ChargeLivreur.nombre > 0)
+    if livreur_id:
+        query = query.where(ChargeLivreur.id_livreur == livreur_id)
+    workload = {}
+    for id_livreur, statut, nombre in db.execute(query.order_by(ChargeLivreur.id_livreur)):
+        entry = workload.setdefault(id_livreur, {"id_livreur": id_livreur, "total": 0, "en_cours": 0, "par_statut": {}})
+        entry["total"] += nombre
+        if statut != StatutColis.LIVRE:
+            entry["en_cours"] += nombre
+        entry["par_statut"][statut] = nombre
+    return list(workload.values())
+
+
+def active_loads(db: Session) -> dict[int, int]:
+    """
+    Nombre de colis en cours (non livrés) par livreur
+    """
+    return {entry["id_livreur"]: entry["en_cours"] for entry in get_workload(db)}
@@ -1,10 +1,17 @@
 from sqlalchemy.orm import Session
 from app.models.zone import Zone
-from app.schemas.zone import ZoneCreate, ZoneUpdate
+from app.schemas.zone import ZoneCreate, ZoneUpdate, ZoneRead
+from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.utils.etag import content_etag
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Les zones changent rarement : lectures servies depuis le cache (sous forme de
+# schémas ZoneRead, détachés de la session), invalidé à chaque écriture
+zones_cache = TTLCache("zones", settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+
 
 def create_zone(db: Session, zone: ZoneCreate):
     try:
@@ -16,6 +23,7 @@ def create_zone(db: Session, zone: ZoneCreate):
         db.add(db_zone)
         db.commit()
         db.refresh(db_zone)
+        zones_cache.invalidate()
         logger.info(f"Zone créée avec succès - ID: {db_zone.id}, Nom: {db_zone.nom}")
         return db_zone
     except Exception as e:
@@ -25,8 +33,24 @@ def create_zone(db: Session, zone: ZoneCreate):
 
 
 def get_all_zones(db: Session):
-    return db.query(Zone).all()
+    return get_all_zones_with_etag(db)[0]
+
+
+def get_all_zones_with_etag(db: Session) -> tuple[list[ZoneRead], str]:
+    """
+    Liste des zones et son ETag (empreinte du contenu), mis en cache ensemble :
+    l'ETag correspond toujours à la liste renvoyée
+    """
+    def load():
+        zones = [ZoneRead.model_validate(zone) for zone in db.query(Zone).all()]
+        return zones, content_etag(zones)
+
+    return zones_cache.get_or_load("all", load)
 
 
 def get_zone(db: Session, zone_id: int):
-    return db.query(Zone).filter(Zone.id == zone_id).first()
+    def load():
+        zone = db.query(Zone).filter(Zone.id == zone_id).first()
+        return ZoneRead.model_validate(zone) if zone else None
+
+    return zones_cache.get_or_load(("id", zone_id), load)
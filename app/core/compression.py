@@ -0,0 +1,190 @@
+"""
+Compression des réponses HTTP (gzip, brotli si le paquet est installé)
+
+Middleware ASGI pur : les réponses en flux (exports NDJSON / CSV) sont
+compressées morceau par morceau, sans être mises en mémoire. Le seuil est
+appliqué sur les premiers octets reçus : une réponse plus petite part telle
+quelle.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle : gzip seul
+    brotli = None
+
+# Types de contenu compressés ; le flux SSE est exclu (chaque événement doit
+# partir immédiatement, sans attendre le remplissage du compresseur)
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+EXCLUDED_TYPES = ("text/event-stream",)
+
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        # wbits 16 + MAX_WBITS : en-tête et somme de contrôle gzip
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def available_encodings() -> tuple[str, ...]:
+    """
+    Encodages proposés, par ordre de préférence du serveur
+    """
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def make_compressor(encoding: str, gzip_level: Optional[int] = None, brotli_quality: Optional[int] = None):
+    if encoding == "br":
+        return BrotliCompressor(settings.COMPRESSION_BROTLI_QUALITY if brotli_quality is None else brotli_quality)
+    return GzipCompressor(settings.COMPRESSION_GZIP_LEVEL if gzip_level is None else gzip_level)
+
+
+def negotiate_encoding(accept_encoding: Optional[str], encodings: tuple[str, ...]) -> Optional[str]:
+    """
+    Premier encodage du serveur accepté par Accept-Encoding (q > 0, "*" compris)
+    """
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(EXCLUDED_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Compresse les réponses JSON / NDJSON / texte selon Accept-Encoding
+    (brotli de préférence, sinon gzip) au-delà de minimum_size octets
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None, gzip_level: Optional[int] = None,
+                 brotli_quality: Optional[int] = None):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"), available_encodings())
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, self)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send, encoding: str, middleware: CompressionMiddleware):
+        self._send = send
+        self.encoding = encoding
+        self.middleware = middleware
+        self.start_message = None
+        self.buffer = []
+        self.buffered = 0
+        self.compressor = None
+        # None : décision en attente des premiers octets
+        self.compressing = None
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            if not is_compressible(headers):
+                self.compressing = False
+                await self._send(message)
+            return
+        if message["type"] != "http.response.body" or self.compressing is False:
+            await self._send(message)
+            return
+        if self.compressing:
+            await self._send_compressed(message.get("body", b""), message.get("more_body", False))
+            return
+
+        # Mise en attente jusqu'au seuil ou à la fin de la réponse
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        self.buffer.append(body)
+        self.buffered += len(body)
+        if more_body and self.buffered < self.middleware.minimum_size:
+            return
+        pending = b"".join(self.buffer)
+        self.buffer = []
+        if self.buffered < self.middleware.minimum_size:
+            self.compressing = False
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": pending, "more_body": False})
+            return
+        self.compressing = True
+        self._start_compression(streaming=more_body)
+        if more_body:
+            await self._send(self.start_message)
+            await self._send_compressed(pending, more_body)
+            return
+        # Réponse complète reçue d'un seul tenant : longueur exacte
+        data = self.compressor.compress(pending) + self.compressor.finish()
+        MutableHeaders(raw=self.start_message["headers"])["Content-Length"] = str(len(data))
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": data, "more_body": False})
+
+    def _start_compression(self, streaming: bool):
+        self.compressor = make_compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # La représentation change : l'ETag fort devient faible (comparaison
+        # faible de If-None-Match, cf. app/utils/etag.py)
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        if streaming and "content-length" in headers:
+            del headers["Content-Length"]
+
+    async def _send_compressed(self, body: bytes, more_body: bool):
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.finish()
+        elif not data:
+            return
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
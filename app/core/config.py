@@ -1,6 +1,10 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
-from typing import Optional
+from sqlalchemy.engine import make_url
+from typing import Optional, Literal
+
+# Pilote asynchrone utilisé pour chaque base quand DB_ASYNC est activé
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
 
 
 class Setting(BaseSettings):
@@ -11,6 +15,77 @@ class Setting(BaseSettings):
     POSTGRES_PORT: int = 5432
     DATABASE_URL: Optional[str] = None
 
+    # Pile base de données asynchrone (AsyncSession + asyncpg)
+    DB_ASYNC: bool = False
+
+    # Pool de connexions (par worker) et journalisation SQL
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_SATURATION_WARNING: float = 0.9
+    DB_ECHO: bool = False
+
+    # Journalisation asynchrone (file bornée, rotation des fichiers)
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_QUEUE_POLICY: Literal["drop", "block"] = "drop"
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_BACKUP_COUNT: int = 5
+
+    # Cache des données de référence (zones, livreurs)
+    CACHE_TTL_SECONDS: float = 300.0
+    CACHE_MAX_ENTRIES: int = 1024
+
+    # Statistiques du tableau de bord : durée de vie du résultat en cache
+    STATS_CACHE_TTL_SECONDS: float = 5.0
+
+    # Événements temps réel (WebSocket / SSE) : transport et file par connexion
+    EVENT_BACKEND: Literal["memory"] = "memory"
+    EVENT_QUEUE_SIZE: int = 100
+    SSE_KEEPALIVE_SECONDS: float = 15.0
+
+    # Assignation automatique : pénalité (en colis) d'un livreur hors zone,
+    # charge maximale par livreur, taille de vague traitée par affectation optimale
+    AUTO_ASSIGN_ZONE_PENALTY: int = 20
+    AUTO_ASSIGN_MAX_LOAD: int = 100
+    AUTO_ASSIGN_OPTIMAL_MAX: int = 100
+
+    # Prise en charge par les livreurs (POST /livreurs/{id}/claim) : ordre de
+    # la file (priorité puis ancienneté, ou ancienneté seule), colis par appel
+    CLAIM_ORDER: Literal["priorite", "anciennete"] = "priorite"
+    CLAIM_MAX_ITEMS: int = 100
+
+    # Pagination par curseur
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 1000
+
+    # Listes de colis lues en tuples et encodées par orjson, sans revalidation
+    # par response_model (désactivé : objets ORM validés par ColisRead)
+    FAST_JSON_RESPONSES: bool = False
+
+    # Compression des réponses (brotli si installé, sinon gzip) : taille
+    # minimale compressée en octets, niveaux gzip (1-9) et brotli (0-11)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # Idempotence des POST /colis et /assignments (en-tête Idempotency-Key) :
+    # stockage des réponses (mémoire par worker ou table partagée), durée de
+    # conservation, bail d'une clé en cours (stockage en base : au-delà, un
+    # worker arrêté en plein traitement ne bloque plus la clé), nombre
+    # maximal de clés en mémoire
+    IDEMPOTENCY_BACKEND: Literal["memory", "database"] = "memory"
+    IDEMPOTENCY_TTL_SECONDS: float = 86400.0
+    IDEMPOTENCY_LEASE_SECONDS: float = 60.0
+    IDEMPOTENCY_MAX_ENTRIES: int = 10000
+
+    # Export en flux (nombre de lignes lues par aller-retour)
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Opérations en masse (taille maximale d'un lot : manifeste, vague d'assignation)
+    BULK_MAX_ITEMS: int = 50000
+
     model_config = ConfigDict(env_file=".env")
         
     @property
@@ -19,4 +94,10 @@ class Setting(BaseSettings):
             return self.DATABASE_URL
         return f"postgresql+psycopg2://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    @property
+    def async_database_url(self):
+        url = make_url(self.database_url)
+        backend = url.get_backend_name()
+        return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
 settings = Setting()
\ No newline at end of file
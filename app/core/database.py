@@ -1,20 +1,101 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session, declarative_base
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.pool_metrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool, instrument_pool
 
 Base = declarative_base()
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    echo=True
-)
+
+def engine_options(url: str, poolclass) -> dict:
+    """
+    Options du moteur issues de la configuration (taille du pool, délais, echo)
+    """
+    options = {"pool_pre_ping": True, "echo": settings.DB_ECHO}
+    if make_url(url).database in (None, "", ":memory:"):
+        # SQLite en mémoire : une seule connexion, pool par défaut de SQLAlchemy
+        return options
+    options.update(
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, InstrumentedQueuePool))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_db():
+# Compteurs des pools exposés par /metrics/pool
+pool_metrics = {"sync": instrument_pool(engine.pool, "sync")}
+
+# Pile asynchrone (asyncpg / aiosqlite), créée uniquement si DB_ASYNC est activé
+async_engine = None
+AsyncSessionLocal = None
+if settings.DB_ASYNC:
+    async_engine = create_async_engine(
+        settings.async_database_url,
+        **engine_options(settings.async_database_url, InstrumentedAsyncQueuePool)
+    )
+    pool_metrics["async"] = instrument_pool(async_engine.sync_engine.pool, "async")
+    # expire_on_commit=False : les objets retournés par les contrôleurs restent
+    # lisibles lors de la sérialisation de la réponse, hors du contexte async
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Dépendance utilisée par toutes les routes : Session ou AsyncSession selon la configuration
+get_db = get_async_db if settings.DB_ASYNC else get_sync_db
+
+
+async def run_db(db, fn, *args, **kwargs):
+    """
+    Exécute un contrôleur synchrone fn(session, *args, **kwargs) sans bloquer la boucle :
+    via AsyncSession.run_sync en mode asynchrone (E/S non bloquantes asyncpg),
+    sinon dans le threadpool de Starlette comme une route synchrone
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def stream_rows(db, statement, batch_size: int):
+    """
+    Parcourt le résultat d'une requête par lots de batch_size lignes (curseur côté
+    serveur), pour les deux types de session. La session est refermée en fin de flux.
+    """
+    statement = statement.execution_options(yield_per=batch_size)
+    try:
+        if isinstance(db, AsyncSession):
+            result = await db.stream(statement)
+            async for batch in result.partitions():
+                yield batch
+        else:
+            result = await run_in_threadpool(db.execute, statement)
+            while True:
+                batch = await run_in_threadpool(result.fetchmany, batch_size)
+                if not batch:
+                    break
+                yield batch
+    finally:
+        if isinstance(db, AsyncSession):
+            await db.close()
+        else:
+            await run_in_threadpool(db.close)
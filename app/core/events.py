@@ -0,0 +1,171 @@
+import asyncio
+import itertools
+import json
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class EventBackend(ABC):
+    """
+    Transport des événements entre émetteurs et abonnés. deliver(event) est
+    appelé pour chaque événement reçu, sur tous les workers abonnés au transport.
+    """
+
+    def attach(self, deliver: Callable[[dict], None]):
+        self._deliver = deliver
+
+    @abstractmethod
+    def publish(self, event: dict):
+        ...
+
+
+class InMemoryBackend(EventBackend):
+    """
+    Transport en mémoire : les événements ne sortent pas du worker qui les émet
+    """
+
+    def publish(self, event: dict):
+        self._deliver(event)
+
+
+# Transports disponibles (EVENT_BACKEND) ; un transport inter-workers
+# (Redis pub/sub, LISTEN/NOTIFY...) s'ajoute ici
+EVENT_BACKENDS = {"memory": InMemoryBackend}
+
+
+class Subscription:
+    """
+    Abonnement d'une connexion (WebSocket ou SSE) : file bornée propre à la
+    connexion, alimentée sur sa boucle d'événements. File pleine : l'événement
+    le plus ancien est abandonné, un client lent ne retient donc jamais plus
+    de maxsize événements en mémoire.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int,
+                 colis_id: Optional[int] = None, zone_id: Optional[int] = None, livreur_id: Optional[int] = None):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.colis_id = colis_id
+        self.zone_id = zone_id
+        self.livreur_id = livreur_id
+        self.dropped = 0
+
+    def matches(self, event: dict) -> bool:
+        return (
+            (self.colis_id is None or event.get("colis_id") == self.colis_id)
+            and (self.zone_id is None or event.get("id_zone") == self.zone_id)
+            and (self.livreur_id is None or event.get("id_livreur") == self.livreur_id)
+        )
+
+    def offer(self, event: dict):
+        # Exécuté sur la boucle de l'abonné (call_soon_threadsafe)
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    async def get(self) -> dict:
+        return await self.queue.get()
+
+
+class EventBus:
+    """
+    Pub/sub en processus : les contrôleurs publient depuis le threadpool (ou la
+    boucle en mode asynchrone), les connexions temps réel consomment sur la boucle
+    """
+
+    def __init__(self, backend: EventBackend, queue_size: int):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._subscriptions: set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self.published = 0
+        self.dropped = 0
+        backend.attach(self._deliver)
+
+    def subscribe(self, **filters) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size, **filters)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            self.dropped += subscription.dropped
+
+    def publish(self, event_type: str, **payload):
+        """
+        Publie un événement ; ne lève jamais d'exception (la requête émettrice
+        a déjà validé sa transaction)
+        """
+        event = {
+            "id": next(self._sequence),
+            "type": event_type,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            **payload,
+        }
+        try:
+            self.backend.publish(event)
+        except Exception as e:
+            logger.error(f"Erreur lors de la publication de l'événement {event_type}: {str(e)}")
+
+    def _deliver(self, event: dict):
+        self.published += 1
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if s.matches(event)]
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # Boucle fermée : connexion terminée sans désabonnement
+                self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "subscribers": len(self._subscriptions),
+                "queue_size": self.queue_size,
+                "published": self.published,
+                "dropped": self.dropped + sum(s.dropped for s in self._subscriptions),
+            }
+
+
+event_bus = EventBus(EVENT_BACKENDS[settings.EVENT_BACKEND](), settings.EVENT_QUEUE_SIZE)
+
+
+def publish_colis_event(event_type: str, colis):
+    """
+    Publie l'état courant d'un colis (après commit)
+    """
+    event_bus.publish(
+        event_type,
+        colis_id=colis.id,
+        statut=colis.statut.value if colis.statut is not None else None,
+        id_livreur=colis.id_livreur,
+        id_zone=colis.id_zone,
+    )
+
+
+async def sse_stream(subscription: Subscription, keepalive: float):
+    """
+    Formate les événements d'un abonnement en Server-Sent Events ; un
+    commentaire est envoyé toutes les keepalive secondes sans événement
+    """
+    while True:
+        try:
+            event = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+        except asyncio.TimeoutError:
+            yield b": keepalive\n\n"
+            continue
+        data = json.dumps(event, ensure_ascii=False)
+        yield f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n".encode("utf-8")
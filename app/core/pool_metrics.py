@@ -0,0 +1,147 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Délai minimal entre deux avertissements de saturation d'un même pool
+SATURATION_WARNING_INTERVAL = 60.0
+
+
+class PoolMetrics:
+    """
+    Compteurs d'un pool de connexions, alimentés par les événements du pool
+    (checkout / checkin / connect) et par la mesure de l'attente d'une connexion
+    """
+
+    def __init__(self, name: str, pool_size: int, max_overflow: int):
+        self.name = name
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.capacity = pool_size + max(max_overflow, 0)
+        self._lock = threading.Lock()
+        self._last_warning = 0.0
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checked_out = 0
+            self.peak_checked_out = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.connections_created = 0
+            self.timeouts = 0
+            self.wait_count = 0
+            self.wait_time_total = 0.0
+            self.wait_time_max = 0.0
+
+    def on_connect(self, *_):
+        with self._lock:
+            self.connections_created += 1
+
+    def on_checkout(self, *_):
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+            checked_out = self.checked_out
+        self._check_saturation(checked_out)
+
+    def on_checkin(self, *_):
+        with self._lock:
+            self.checkins += 1
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_time_total += seconds
+            self.wait_time_max = max(self.wait_time_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+        if timed_out:
+            logger.error(f"Pool {self.name} : aucune connexion disponible après {seconds:.1f}s")
+
+    def saturation(self, checked_out: int) -> float:
+        return checked_out / self.capacity if self.capacity else 0.0
+
+    def _check_saturation(self, checked_out: int):
+        ratio = self.saturation(checked_out)
+        if ratio < settings.DB_POOL_SATURATION_WARNING:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_warning < SATURATION_WARNING_INTERVAL:
+                return
+            self._last_warning = now
+        logger.warning(
+            f"Pool {self.name} saturé à {ratio:.0%} - Connexions utilisées: {checked_out}/{self.capacity}, "
+            f"les requêtes suivantes attendront jusqu'à {settings.DB_POOL_TIMEOUT}s"
+        )
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "saturation": round(self.saturation(self.checked_out), 3),
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connections_created": self.connections_created,
+                "timeouts": self.timeouts,
+                "wait_time_avg_ms": round(self.wait_time_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+            }
+
+
+class _TimedCheckoutMixin:
+    """
+    Mesure le temps passé à obtenir une connexion du pool (attente comprise)
+    """
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        if self.metrics is None:
+            return super()._do_get()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() recrée le pool : les événements sont repris par SQLAlchemy, pas les compteurs
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_pool(pool, name: str) -> PoolMetrics:
+    """
+    Branche les compteurs sur les événements d'un pool et les retourne
+    """
+    metrics = PoolMetrics(name, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+    if isinstance(pool, _TimedCheckoutMixin):
+        pool.metrics = metrics
+    event.listen(pool, "connect", metrics.on_connect)
+    event.listen(pool, "checkout", metrics.on_checkout)
+    event.listen(pool, "checkin", metrics.on_checkin)
+    return metrics
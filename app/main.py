@@ -1,10 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
 from app.core.database import Base, engine
-from app.routes import client_routes, destinataire_routes, livreur_routes, colis_routes, zone_routes, assignment_routes
+from app.routes import client_routes, destinataire_routes, livreur_routes, colis_routes, zone_routes, assignment_routes, monitoring_routes, realtime_routes, stats_routes
 
 # Import all models to ensure they're registered with Base
-from app.models import client_expediteur, destinataire, livreur, colis, zone, historique_statut
+from app.models import client_expediteur, destinataire, livreur, colis, zone, historique_statut, charge_livreur, cle_idempotence
 
 # Create tables only if not in test environment
 import os
@@ -49,6 +51,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],)
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 
 # routes
 app.include_router(client_routes.router)
@@ -57,6 +62,9 @@ app.include_router(livreur_routes.router)
 app.include_router(colis_routes.router)
 app.include_router(zone_routes.router)
 app.include_router(assignment_routes.router)
+app.include_router(stats_routes.router)
+app.include_router(monitoring_routes.router)
+app.include_router(realtime_routes.router)
 
 # 
 @app.get("/")
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Enum, ForeignKey, Integer
+from app.core.database import Base
+from app.models.colis import StatutColis
+
+
+class ChargeLivreur(Base):
+    """
+    Nombre de colis par livreur et par statut, tenu à jour dans la même
+    transaction que chaque assignation, changement de statut ou suppression
+    """
+    __tablename__ = "charge_livreur"
+
+    id_livreur = Column(Integer, ForeignKey("livreurs.id", ondelete="CASCADE"), primary_key=True)
+    statut = Column(Enum(StatutColis, name="statutcolis", values_callable=lambda obj: [e.value for e in obj]), primary_key=True)
+    nombre = Column(Integer, nullable=False, default=0)
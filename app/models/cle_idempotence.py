@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String
+from app.core.database import Base
+
+
+class CleIdempotence(Base):
+    """
+    Réponses rejouables des POST portant un en-tête Idempotency-Key
+    (stockage IDEMPOTENCY_BACKEND=database, partagé entre workers).
+    Une ligne sans code_statut est une requête en cours de traitement.
+    """
+    __tablename__ = "cle_idempotence"
+
+    cle = Column(String(300), primary_key=True)
+    empreinte = Column(String(64), nullable=False)
+    code_statut = Column(Integer, nullable=True)
+    reponse = Column(LargeBinary, nullable=True)
+    expire_le = Column(DateTime(timezone=True), nullable=False, index=True)
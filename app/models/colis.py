@@ -1,8 +1,9 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum
+from sqlalchemy import DDL, Column, Integer, Numeric, String, ForeignKey, Enum, Index, event, text
 from app.core.database import Base
+from app.utils.text_search import POSTGRESQL_DDL, SQLITE_DDL, SQLITE_DROP
 import enum
 
-class StatutColis(enum.Enum):
+class StatutColis(str, enum.Enum):
     CREE = "créé"
     COLLECTE = "collecté"
     EN_STOCK = "en stock"
@@ -16,9 +17,46 @@ class Colis(Base):
     id = Column(Integer, primary_key=True)
     description = Column(String, nullable=False)
     poids = Column(String, nullable=False)
+    # Poids en kg déduit de poids à l'écriture (None si la saisie n'est pas reconnue)
+    poids_kg = Column(Numeric(10, 3, asdecimal=False), nullable=True)
     statut = Column(Enum(StatutColis, values_callable=lambda obj: [e.value for e in obj]), default=StatutColis.CREE)
     id_livreur = Column(Integer, ForeignKey("livreurs.id"), nullable=True)
     id_client_expediteur = Column(Integer, ForeignKey("client_expediteur.id"), nullable=False)
     id_destinataire = Column(Integer, ForeignKey("destinataires.id"), nullable=False)
     id_zone = Column(Integer, ForeignKey("zones.id"), nullable=True)
     ville_destination = Column(String, nullable=False)
+    # Priorité de prise en charge (POST /livreurs/{id}/claim) : la plus haute d'abord
+    priorite = Column(Integer, nullable=False, default=0, server_default="0")
+    # Verrou optimiste : chaque UPDATE porte WHERE version = :lue et incrémente
+    # la version ; une écriture concurrente fait échouer la seconde (StaleDataError)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # Index alignés sur les filtres de /colis/search et des assignations ;
+    # "id" en seconde colonne sert le tri de la pagination par curseur
+    __table_args__ = (
+        Index("ix_colis_statut_id", "statut", "id"),
+        Index("ix_colis_zone_id", "id_zone", "id"),
+        Index("ix_colis_livreur_id", "id_livreur", "id"),
+        Index("ix_colis_poids_kg", "poids_kg"),
+        Index("ix_colis_non_assignes", "id",
+              postgresql_where=text("id_livreur IS NULL"),
+              sqlite_where=text("id_livreur IS NULL")),
+        # File d'attente des livreurs : colis non assignés d'une zone, dans l'ordre de prise en charge
+        Index("ix_colis_file_attente", "id_zone", priorite.desc(), "id",
+              postgresql_where=text("id_livreur IS NULL"),
+              sqlite_where=text("id_livreur IS NULL")),
+        Index("ix_colis_actifs_livreur_statut", "id_livreur", "statut",
+              postgresql_where=text("statut <> 'livré'"),
+              sqlite_where=text("statut <> 'livré'")),
+    )
+    __mapper_args__ = {"version_id_col": version}
+
+
+# Recherche texte (paramètre q de /colis/search) : index trigrammes sur
+# PostgreSQL, table FTS5 et ses triggers sur SQLite, créés avec la table
+for statement in POSTGRESQL_DDL:
+    event.listen(Colis.__table__, "after_create", DDL(statement.format(concurrently="")).execute_if(dialect="postgresql"))
+for statement in SQLITE_DDL:
+    event.listen(Colis.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in SQLITE_DROP:
+    event.listen(Colis.__table__, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
@@ -1 +1,31 @@
-# Modèle Historique Statut
+from datetime import datetime, timezone
+from sqlalchemy import BigInteger, Column, DateTime, Enum, ForeignKey, Index, Integer, event
+from app.core.database import Base
+from app.models.colis import StatutColis
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+class HistoriqueStatut(Base):
+    """
+    Journal des changements de statut des colis, en ajout seul
+    """
+    __tablename__ = "historique_statut"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    id_colis = Column(Integer, ForeignKey("colis.id", ondelete="CASCADE"), nullable=False)
+    ancien_statut = Column(Enum(StatutColis, name="statutcolis", values_callable=lambda obj: [e.value for e in obj]), nullable=True)
+    nouveau_statut = Column(Enum(StatutColis, name="statutcolis", values_callable=lambda obj: [e.value for e in obj]), nullable=False)
+    timestamp = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
+
+    # La chronologie d'un colis se lit en un seul parcours de cet index
+    __table_args__ = (
+        Index("ix_historique_statut_colis_timestamp", "id_colis", "timestamp"),
+    )
+
+
+@event.listens_for(HistoriqueStatut, "before_update")
+def _refuser_modification(mapper, connection, target):
+    raise ValueError("L'historique des statuts est en ajout seul")
@@ -1,13 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Header
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, run_db
+from app.core.config import settings
 from app.controllers.assignment_controller import (
     assign_colis_to_livreur,
+    assign_colis_batch,
+    auto_assign_colis,
     get_assigned_colis,
-    get_unassigned_colis
+    get_unassigned_colis,
+    CONFLICT_MESSAGE
 )
-from app.schemas.assignment import AssignmentCreate, AssignmentResponse
+from app.controllers.colis_controller import ConcurrentModificationError, read_columns, InvalidFieldsError
+from app.schemas.assignment import AssignmentCreate, AssignmentResponse, AssignmentBatchResponse, AutoAssignmentResponse
 from app.schemas.colis import ColisRead
+from app.utils.idempotency import idempotent
 from typing import Optional
 
 router = APIRouter(
@@ -15,17 +22,29 @@ router = APIRouter(
     tags=["Assignations"],
     responses={
         404: {"description": "Ressource non trouvée (colis, livreur ou zone)"},
+        409: {"description": "Colis modifié entre-temps par une autre requête"},
         500: {"description": "Erreur interne du serveur"}
     }
 )
 
 
+def _read_columns(fields: Optional[str]):
+    try:
+        return read_columns(fields)
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.post("/",
              response_model=AssignmentResponse,
              status_code=status.HTTP_201_CREATED,
              summary="Assigner un colis à un livreur",
              description="Assigne un colis spécifique à un livrer avec option de zone")
-def create_assignment_route(assignment: AssignmentCreate, db: Session = Depends(get_db)):
+async def create_assignment_route(
+    assignment: AssignmentCreate,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, max_length=255)
+):
     """
     Assigne un colis à un livreur.
     
@@ -35,65 +54,170 @@ def create_assignment_route(assignment: AssignmentCreate, db: Session = Depends(
     
     **Champs optionnels** :
     - **zone_id** : ID de la zone de livraison (si applicable)
+    - **version** : Version du colis lue par le dispatcher ; l'assignation est
+      refusée si le colis a changé depuis
+    
+    **En-tête optionnel** :
+    - **Idempotency-Key** : Une reprise avec la même clé rejoue la réponse
+      d'origine, sans nouvelle transaction
     
     Le statut du colis sera automatiquement mis à jour vers "en transit" si il était "créé".
     
     Retourne une erreur 404 si le colis, le livreur ou la zone n'existe pas.
+    La ligne du colis est verrouillée pendant l'assignation : deux assignations
+    simultanées du même colis ne peuvent pas s'écraser, la seconde reçoit 409.
 
     **Retour** :
     - Code 201 : Assignation créée avec succès
     - Code 404 : Colis, livreur ou zone non trouvé
+    - Code 409 : Colis modifié entre-temps par une autre requête, ou requête
+      de même clé en cours sur un autre worker
+    - Code 422 : Idempotency-Key déjà utilisée pour un autre corps de requête
     
     Permet d'organiser efficacement les tournées de livraison.
     L'action est enregistrée dans les logs système.
     """
-    colis, message = assign_colis_to_livreur(db, assignment)
+    async def assign():
+        colis, message = await run_db(db, assign_colis_to_livreur, assignment)
+
+        if not colis:
+            if message == CONFLICT_MESSAGE:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=message)
+            raise HTTPException(status_code=404, detail=message)
+
+        return AssignmentResponse(
+            colis_id=colis.id,
+            livreur_id=colis.id_livreur,
+            zone_id=colis.id_zone,
+            version=colis.version,
+            message=message
+        )
+
+    return await idempotent(db, "assignments", idempotency_key, assignment, assign,
+                            AssignmentResponse, status.HTTP_201_CREATED)
+
+
+@router.post("/batch",
+             response_model=AssignmentBatchResponse,
+             summary="Assigner une vague de colis",
+             description="Assigne plusieurs colis en une seule transaction, avec un résultat par élément")
+async def create_assignment_batch_route(assignments: list[AssignmentCreate], db: Session = Depends(get_db)):
+    """
+    Assigne une vague de colis à des livreurs.
+    
+    **Corps** :
+    - Liste d'assignations (**colis_id**, **livreur_id**, **zone_id** et
+      **version** optionnels)
     
-    if not colis:
-        raise HTTPException(status_code=404, detail=message)
+    Les colis au statut "créé" passent automatiquement "en transit".
     
-    return AssignmentResponse(
-        colis_id=colis.id,
-        livreur_id=colis.id_livreur,
-        zone_id=colis.id_zone,
-        message=message
-    )
+    **Retour** :
+    - Code 200 : Vague traitée
+      - **assigned** : Nombre de colis assignés
+      - **results** : Résultat de chaque assignation, dans l'ordre du lot
+        (échec si colis, livreur ou zone introuvable, colis en double ou
+        version périmée)
+    - Code 409 : Un colis du lot a été modifié pendant l'assignation ; rien n'est appliqué
+    - Code 413 : Lot trop volumineux
+    
+    Les assignations valides sont appliquées dans une seule transaction.
+    """
+    if len(assignments) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Un lot ne peut pas dépasser {settings.BULK_MAX_ITEMS} assignations")
+    try:
+        assigned, results = await run_db(db, assign_colis_batch, assignments)
+    except ConcurrentModificationError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=CONFLICT_MESSAGE)
+    return {"assigned": assigned, "results": results}
+
+
+@router.post("/auto",
+             response_model=AutoAssignmentResponse,
+             summary="Assigner automatiquement les colis non assignés",
+             description="Répartit les colis non assignés entre les livreurs selon la zone et la charge")
+async def auto_assignment_route(
+    db: Session = Depends(get_db),
+    max_load: Optional[int] = Query(None, ge=1, description="Nombre maximal de colis en cours par livreur")
+):
+    """
+    Assigne automatiquement tous les colis non assignés.
+    
+    **Paramètres optionnels** :
+    - **max_load** : Nombre maximal de colis en cours par livreur (défaut : AUTO_ASSIGN_MAX_LOAD)
+    
+    **Répartition** :
+    - Un livreur de la zone du colis (zone_assignee) est préféré ; un livreur
+      d'une autre zone n'est choisi que s'il a AUTO_ASSIGN_ZONE_PENALTY colis
+      en cours de moins
+    - Les colis sont répartis pour équilibrer la charge des livreurs
+    - Affectation optimale jusqu'à AUTO_ASSIGN_OPTIMAL_MAX colis, heuristique
+      gloutonne au-delà
+    
+    **Retour** :
+    - Code 200 : Vague traitée
+      - **method** : `optimal` ou `greedy`
+      - **assigned** : Nombre de colis assignés
+      - **unassigned** : Colis restés sans livreur (capacité atteinte)
+      - **results** : Résultat de chaque assignation
+    - Code 409 : Un colis a été modifié pendant l'assignation ; rien n'est appliqué
+    
+    Les assignations sont appliquées dans une seule transaction, comme /assignments/batch.
+    """
+    try:
+        method, assigned, unassigned, results = await run_db(db, auto_assign_colis, max_load)
+    except ConcurrentModificationError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=CONFLICT_MESSAGE)
+    return {"method": method, "assigned": assigned, "unassigned": unassigned, "results": results}
 
 
 @router.get("/assigned",
             response_model=list[ColisRead],
             summary="Consulter les colis assignés",
             description="Liste tous les colis qui ont un livreur assigné, avec filtre optionnel par livreur")
-def get_assigned_colis_route(
+async def get_assigned_colis_route(
     db: Session = Depends(get_db),
-    livreur_id: Optional[int] = Query(None, description="Filtrer par ID du livreur spécifique")
+    livreur_id: Optional[int] = Query(None, description="Filtrer par ID du livreur spécifique"),
+    fields: Optional[str] = Query(None, description="Champs à retourner, séparés par des virgules (ex. id,statut) ; id est toujours inclus")
 ):
     """
     Récupère tous les colis qui ont été assignés à un livreur.
     
     **Paramètres optionnels** :
     - **livreur_id** : Filtre les résultats pour un livreur spécifique
+    - **fields** : Seuls ces champs sont lus en base et retournés (ex. `id,statut`)
     
     **Retour** :
     - Liste des colis assignés avec leurs informations complètes
     - Liste vide si aucun colis n'est assigné
+    - Code 400 : Champ inconnu
     
     Utile pour suivre l'état des assignations en cours.
     """
-    return get_assigned_colis(db, livreur_id)
+    columns = _read_columns(fields)
+    if columns:
+        return ORJSONResponse(await run_db(db, get_assigned_colis, livreur_id, columns=columns))
+    return await run_db(db, get_assigned_colis, livreur_id)
 
 
 @router.get("/unassigned",
             response_model=list[ColisRead],
             summary="Consulter les colis non assignés",
             description="Liste tous les colis en attente d'assignation à un livreur")
-def get_unassigned_colis_route(db: Session = Depends(get_db)):
+async def get_unassigned_colis_route(
+    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Champs à retourner, séparés par des virgules (ex. id,statut) ; id est toujours inclus")
+):
     """
     Récupère tous les colis qui ne sont pas encore assignés à un livreur.
     
+    **Paramètres optionnels** :
+    - **fields** : Seuls ces champs sont lus en base et retournés (ex. `id,statut`)
+    
     **Retour** :
     - Liste des colis en attente d'assignation
     - Liste vide si tous les colis sont assignés
+    - Code 400 : Champ inconnu
     
     **Cas d'usage** :
     - Voir les colis nécessitant une assignation
@@ -102,4 +226,7 @@ def get_unassigned_colis_route(db: Session = Depends(get_db)):
     
     Ces colis requirent une action pour être pris en charge.
     """
-    return get_unassigned_colis(db)
+    columns = _read_columns(fields)
+    if columns:
+        return ORJSONResponse(await run_db(db, get_unassigned_colis, columns=columns))
+    return await run_db(db, get_unassigned_colis)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, run_db
 from app.controllers.client_controller import (create_client, update_client, delete_client, get_clients, get_clients_by_id)
 from app.schemas.client_expediteur import (ClientExpediteurBase, ClientExpediteurRead, ClientExpediteurUpdate, ClientExpediteurCreate)
 
@@ -19,7 +19,7 @@ router = APIRouter(
              status_code=status.HTTP_201_CREATED,
              summary="Créer un nouveau client expéditeur",
              description="Enregistre un nouveau client expéditeur dans le système")
-def create_client_route(client: ClientExpediteurCreate,db: Session = Depends(get_db)):
+async def create_client_route(client: ClientExpediteurCreate,db: Session = Depends(get_db)):
     """
     Crée un nouveau client expéditeur.
     
@@ -37,7 +37,7 @@ def create_client_route(client: ClientExpediteurCreate,db: Session = Depends(get
     L'email doit être unique dans le système.
     """
     try:
-        return create_client(db,client)
+        return await run_db(db, create_client, client)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
@@ -45,7 +45,7 @@ def create_client_route(client: ClientExpediteurCreate,db: Session = Depends(get
             response_model=list[ClientExpediteurRead],
             summary="Lister tous les clients expéditeurs",
             description="Récupère la liste complète de tous les clients expéditeurs enregistrés")
-def get_client_route(db:Session = Depends(get_db)):
+async def get_client_route(db:Session = Depends(get_db)):
     """
     Récupère tous les clients expéditeurs.
     
@@ -53,14 +53,14 @@ def get_client_route(db:Session = Depends(get_db)):
     - Liste de tous les clients avec leurs informations complètes
     - Liste vide si aucun client n'est enregistré
     """
-    return get_clients(db)
+    return await run_db(db, get_clients)
 
 
 @router.get("/{client_id}",
             response_model=ClientExpediteurRead,
             summary="Récupérer un client par son ID",
             description="Récupère les détails complets d'un client expéditeur spécifique")
-def get_client_by_id_route(client_id: int, db: Session = Depends(get_db)):
+async def get_client_by_id_route(client_id: int, db: Session = Depends(get_db)):
     """
     Récupère un client expéditeur spécifique par son identifiant.
     
@@ -71,7 +71,7 @@ def get_client_by_id_route(client_id: int, db: Session = Depends(get_db)):
     - Code 200 : Détails du client
     - Code 404 : Client non trouvé
     """
-    client = get_clients_by_id(db, client_id)
+    client = await run_db(db, get_clients_by_id, client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     return client
@@ -80,7 +80,7 @@ def get_client_by_id_route(client_id: int, db: Session = Depends(get_db)):
             response_model=ClientExpediteurRead,
             summary="Mettre à jour un client",
             description="Modifie les informations d'un client expéditeur existant")
-def update_client_route(client_id: int, client_update: ClientExpediteurUpdate, db: Session = Depends(get_db)):
+async def update_client_route(client_id: int, client_update: ClientExpediteurUpdate, db: Session = Depends(get_db)):
     """
     Met à jour les informations d'un client expéditeur.
     
@@ -97,7 +97,7 @@ def update_client_route(client_id: int, client_update: ClientExpediteurUpdate, d
     
     L'action est enregistrée dans les logs système.
     """
-    client = update_client(db, client_id, client_update)
+    client = await run_db(db, update_client, client_id, client_update)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     return client
@@ -107,7 +107,7 @@ def update_client_route(client_id: int, client_update: ClientExpediteurUpdate, d
                status_code=status.HTTP_204_NO_CONTENT,
                summary="Supprimer un client",
                description="Supprime définitivement un client expéditeur du système")
-def delete_client_route(client_id: int, db: Session = Depends(get_db)):
+async def delete_client_route(client_id: int, db: Session = Depends(get_db)):
     """
     Supprime un client expéditeur du système.
     
@@ -121,7 +121,7 @@ def delete_client_route(client_id: int, db: Session = Depends(get_db)):
     Attention : Cette opération est irréversible.
     La suppression est enregistrée dans les logs système.
     """
-    client = delete_client(db, client_id)
+    client = await run_db(db, delete_client, client_id)
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     return None
\ No newline at end of file
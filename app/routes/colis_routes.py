@@ -1,16 +1,32 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Header, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from app.schemas.colis import ColisCreate, ColisUpdate, ColisRead
+from app.schemas.colis import ColisCreate, ColisUpdate, ColisRead, ColisPage, ColisBulkResult
+from app.schemas.historique_statut import HistoriqueStatutRead
 from app.controllers.colis_controller import (
     create_colis,
+    create_colis_bulk,
     get_all_colis,
     get_colis_by_id,
+    get_colis_version,
     update_colis,
     delete_colis,
-    search_colis
+    search_colis,
+    colis_export_statement,
+    get_historique,
+    ConcurrentModificationError,
+    EXPORT_FIELDS,
+    read_columns,
+    InvalidFieldsError
 )
-from app.core.database import get_db
-from typing import Optional
+from app.core.database import get_db, run_db, stream_rows
+from app.core.config import settings
+from app.core.events import event_bus, sse_stream
+from app.utils.pagination import InvalidCursorError
+from app.utils.etag import version_etag, etag_matches, not_modified
+from app.utils.idempotency import idempotent
+from app.utils.export import ndjson_batch, csv_batch
+from typing import Optional, Literal
 
 router = APIRouter(
     prefix="/colis",
@@ -26,7 +42,11 @@ router = APIRouter(
              status_code=status.HTTP_201_CREATED,
              summary="Créer un nouveau colis",
              description="Enregistre un nouveau colis dans le système avec toutes ses informations de livraison")
-def create_colis_route(colis: ColisCreate, db: Session = Depends(get_db)):
+async def create_colis_route(
+    colis: ColisCreate,
+    db: Session = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, max_length=255)
+):
     """
     Crée un nouveau colis.
     
@@ -42,36 +62,101 @@ def create_colis_route(colis: ColisCreate, db: Session = Depends(get_db)):
     - **id_livreur** : ID du livreur (peut être assigné plus tard)
     - **id_zone** : ID de la zone de livraison
     
+    **En-tête optionnel** :
+    - **Idempotency-Key** : Clé choisie par le client ; une reprise avec la même
+      clé rejoue la réponse d'origine (en-tête Idempotent-Replayed) sans créer
+      de doublon
+    
     **Retour** :
-    - Code 201 : Colis créé avec succès
+    - Code 201 : Colis créé avec succès (ou réponse rejouée)
+    - Code 409 : Requête de même clé en cours sur un autre worker
+    - Code 422 : Clé déjà utilisée pour un autre corps de requête
     
     L'action est enregistrée dans les logs système.
     """
-    return create_colis(db, colis)
+    return await idempotent(db, "colis", idempotency_key, colis, lambda: run_db(db, create_colis, colis),
+                            ColisRead, status.HTTP_201_CREATED)
+
+
+@router.post("/bulk",
+             response_model=ColisBulkResult,
+             status_code=status.HTTP_201_CREATED,
+             summary="Créer des colis en masse",
+             description="Enregistre un manifeste de colis en une seule transaction, avec rapport d'erreurs par ligne")
+async def create_colis_bulk_route(colis: list[ColisCreate], db: Session = Depends(get_db)):
+    """
+    Crée un lot de colis (manifeste d'expédition).
+    
+    **Corps** :
+    - Liste de colis, chacun avec les mêmes champs que `POST /colis/`
+    
+    **Retour** :
+    - Code 201 : Lot traité
+      - **created** : Nombre de colis créés
+      - **ids** : IDs des colis créés, dans l'ordre du lot
+      - **errors** : Lignes rejetées (index dans le lot et motif)
+    - Code 413 : Lot trop volumineux
+    - Code 422 : Au moins une ligne est mal formée (l'index figure dans `loc`)
+    
+    Les lignes valides sont insérées dans une seule transaction.
+    """
+    if len(colis) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Un lot ne peut pas dépasser {settings.BULK_MAX_ITEMS} colis")
+    ids, errors = await run_db(db, create_colis_bulk, colis)
+    return {"created": len(ids), "ids": ids, "errors": errors}
 
 
 @router.get("/", 
-            response_model=list[ColisRead],
+            response_model=ColisPage,
             summary="Lister tous les colis",
-            description="Récupère la liste complète de tous les colis enregistrés dans le système")
-def get_all_colis_route(db: Session = Depends(get_db)):
+            description="Récupère les colis enregistrés dans le système, page par page (pagination par curseur)")
+async def get_all_colis_route(
+    db: Session = Depends(get_db),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Nombre maximum de colis par page"),
+    after: Optional[str] = Query(None, description="Curseur retourné par la page précédente (next_cursor)"),
+    fields: Optional[str] = Query(None, description="Champs à retourner, séparés par des virgules (ex. id,statut) ; id est toujours inclus")
+):
     """
-    Récupère tous les colis enregistrés.
+    Récupère les colis enregistrés, triés par ID.
+    
+    **Pagination** :
+    - **limit** : Taille de la page (plafonnée)
+    - **after** : Valeur de `next_cursor` de la page précédente
     
-    Retourne une liste vide si aucun colis n'est enregistré.
+    **Projection** :
+    - **fields** : Seuls ces champs sont lus en base et retournés (ex. `id,statut`)
+    
+    **Retour** :
+    - **items** : Colis de la page (liste vide si aucun colis n'est enregistré)
+    - **next_cursor** : Curseur de la page suivante, `null` sur la dernière page
+    - Code 400 : Curseur invalide ou champ inconnu
     """
-    return get_all_colis(db)
+    try:
+        columns = read_columns(fields)
+        items, next_cursor = await run_db(db, get_all_colis, limit=limit, after=after, columns=columns)
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if columns:
+        return ORJSONResponse({"items": items, "next_cursor": next_cursor})
+    return {"items": items, "next_cursor": next_cursor}
 
 
 @router.get("/search", 
-            response_model=list[ColisRead],
+            response_model=ColisPage,
             summary="Rechercher des colis avec filtres avancés",
-            description="Filtre les colis par statut, zone et/ou livreur - Tous les filtres sont optionnels et combinables")
-def search_colis_route(
+            description="Filtre les colis par statut, zone, livreur, poids et/ou texte - Tous les filtres sont optionnels et combinables")
+async def search_colis_route(
     db: Session = Depends(get_db),
     statut: Optional[str] = Query(None, description="Statut du colis : CREE, EN_TRANSIT, EN_LIVRAISON, LIVRE, RETOURNE"),
     zone_id: Optional[int] = Query(None, description="ID de la zone de livraison"),
-    livreur_id: Optional[int] = Query(None, description="ID du livreur assigné")
+    livreur_id: Optional[int] = Query(None, description="ID du livreur assigné"),
+    poids_min: Optional[float] = Query(None, ge=0, description="Poids minimal en kg"),
+    poids_max: Optional[float] = Query(None, ge=0, description="Poids maximal en kg"),
+    q: Optional[str] = Query(None, min_length=2, max_length=100, description="Texte recherché dans la description et la ville de destination"),
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX, description="Nombre maximum de colis par page"),
+    after: Optional[str] = Query(None, description="Curseur retourné par la page précédente (next_cursor)"),
+    fields: Optional[str] = Query(None, description="Champs à retourner, séparés par des virgules (ex. id,statut) ; id est toujours inclus")
 ):
     """
     Recherche des colis avec des filtres optionnels.
@@ -80,40 +165,201 @@ def search_colis_route(
     - **statut** : Filtrer par statut (CREE, EN_TRANSIT, EN_LIVRAISON, LIVRE, RETOURNE)
     - **zone_id** : Filtrer par zone de livraison
     - **livreur_id** : Filtrer par livreur assigné
+    - **poids_min**, **poids_max** : Intervalle de poids en kg (bornes incluses) ;
+      les colis dont le poids saisi n'est pas reconnu sont exclus
+    - **q** : Texte recherché dans la description et la ville de destination ;
+      les résultats sont alors classés par pertinence (index plein texte)
+    
+    **Pagination** :
+    - **limit** : Taille de la page (plafonnée)
+    - **after** : Valeur de `next_cursor` de la page précédente
+    
+    **Projection** :
+    - **fields** : Seuls ces champs sont lus en base et retournés (ex. `id,statut`)
     
     **Retour** :
-    - Liste des colis correspondant aux critères
-    - Liste vide si aucun colis ne correspond
-    - Sans filtres, retourne tous les colis
+    - **items** : Colis correspondant aux critères (liste vide si aucun ne correspond)
+    - **next_cursor** : Curseur de la page suivante, `null` sur la dernière page
+    - Sans filtres, parcourt tous les colis
+    - Code 400 : Curseur invalide ou champ inconnu
     
     Tous les filtres sont combinables pour une recherche précise.
     """
-    return search_colis(db, statut=statut, zone_id=zone_id, livreur_id=livreur_id)
+    try:
+        columns = read_columns(fields)
+        items, next_cursor = await run_db(db, search_colis, statut=statut, zone_id=zone_id, livreur_id=livreur_id,
+                                                   limit=limit, after=after, poids_min=poids_min, poids_max=poids_max, q=q,
+                                                   columns=columns)
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if columns:
+        return ORJSONResponse({"items": items, "next_cursor": next_cursor})
+    return {"items": items, "next_cursor": next_cursor}
+
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+@router.get("/export",
+            response_class=StreamingResponse,
+            summary="Exporter les colis en flux (NDJSON ou CSV)",
+            description="Exporte les colis filtrés en flux continu, sans charger toute la table en mémoire")
+async def export_colis_route(
+    db: Session = Depends(get_db),
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Format d'export : ndjson ou csv"),
+    statut: Optional[str] = Query(None, description="Statut du colis : CREE, EN_TRANSIT, EN_LIVRAISON, LIVRE, RETOURNE"),
+    zone_id: Optional[int] = Query(None, description="ID de la zone de livraison"),
+    livreur_id: Optional[int] = Query(None, description="ID du livreur assigné"),
+    poids_min: Optional[float] = Query(None, ge=0, description="Poids minimal en kg"),
+    poids_max: Optional[float] = Query(None, ge=0, description="Poids maximal en kg")
+):
+    """
+    Exporte les colis correspondant aux filtres, triés par ID.
+    
+    **Paramètres** (tous optionnels) :
+    - **format** : `ndjson` (un objet JSON par ligne) ou `csv` (avec en-tête)
+    - **statut**, **zone_id**, **livreur_id**, **poids_min**, **poids_max** : Mêmes filtres que `/colis/search`
+    
+    **Retour** :
+    - Code 200 : Flux des colis, envoyé au fil de la lecture en base
+    
+    Destiné aux traitements de masse (réconciliation nocturne, etc.) :
+    la mémoire reste constante quel que soit le volume exporté.
+    """
+    statement = colis_export_statement(statut=statut, zone_id=zone_id, livreur_id=livreur_id,
+                                       poids_min=poids_min, poids_max=poids_max)
+
+    async def body():
+        if format == "csv":
+            yield csv_batch([], EXPORT_FIELDS, header=True)
+        if statement is None:
+            return
+        # Un lot de EXPORT_BATCH_SIZE lignes par morceau envoyé ; stream_rows
+        # referme la session une fois le flux terminé
+        async for batch in stream_rows(db, statement, settings.EXPORT_BATCH_SIZE):
+            if format == "csv":
+                yield csv_batch(batch, EXPORT_FIELDS)
+            else:
+                yield ndjson_batch(batch, EXPORT_FIELDS)
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="colis.{format}"'}
+    )
+
+
+@router.get("/stream",
+            response_class=StreamingResponse,
+            summary="Suivre les colis en temps réel (SSE)",
+            description="Flux Server-Sent Events des changements de statut et des assignations")
+async def stream_colis_route(
+    colis_id: Optional[int] = Query(None, description="ID du colis à suivre"),
+    zone_id: Optional[int] = Query(None, description="ID de la zone de livraison"),
+    livreur_id: Optional[int] = Query(None, description="ID du livreur assigné")
+):
+    """
+    Ouvre un flux Server-Sent Events (`text/event-stream`) des événements colis.
+    
+    **Paramètres** (tous optionnels, combinables) :
+    - **colis_id**, **zone_id**, **livreur_id** : Ne recevoir que les événements correspondants
+    
+    **Événements** :
+    - `colis.updated` : Colis modifié (PUT /colis/{id})
+    - `colis.assigned` : Colis assigné à un livreur
+    
+    Chaque événement contient colis_id, statut, id_livreur, id_zone et timestamp.
+    Un commentaire `: keepalive` est envoyé en l'absence d'événement.
+    
+    **Retour** :
+    - Code 200 : Flux continu, jusqu'à la déconnexion du client
+    
+    Remplace le polling de GET /colis/{id}. Un client trop lent perd les
+    événements les plus anciens (file bornée à EVENT_QUEUE_SIZE).
+    """
+    subscription = event_bus.subscribe(colis_id=colis_id, zone_id=zone_id, livreur_id=livreur_id)
+
+    async def body():
+        try:
+            async for chunk in sse_stream(subscription, settings.SSE_KEEPALIVE_SECONDS):
+                yield chunk
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/{colis_id}", 
             response_model=ColisRead,
             summary="Récupérer un colis par son ID",
             description="Récupère les détails d'un colis spécifique à partir de son identifiant")
-def get_colis_by_id_route(colis_id: int, db: Session = Depends(get_db)):
+async def get_colis_by_id_route(
+    colis_id: int,
+    response: Response,
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Récupère un colis spécifique par son ID.
     
     - **colis_id**: L'identifiant unique du colis
     
     Retourne une erreur 404 si le colis n'existe pas.
+    
+    La réponse porte un en-tête **ETag** tiré de la version du colis. Renvoyé
+    dans If-None-Match, il donne un code 304 sans corps tant que le colis n'a
+    pas changé : seule sa version est alors lue en base.
     """
-    db_colis = get_colis_by_id(db, colis_id)
+    if if_none_match:
+        version = await run_db(db, get_colis_version, colis_id)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Colis not found")
+        etag = version_etag("colis", colis_id, version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    db_colis = await run_db(db, get_colis_by_id, colis_id)
     if not db_colis:
         raise HTTPException(status_code=404, detail="Colis not found")
+    response.headers["ETag"] = version_etag("colis", db_colis.id, db_colis.version)
     return db_colis
 
 
+@router.get("/{colis_id}/historique",
+            response_model=list[HistoriqueStatutRead],
+            summary="Historique des statuts d'un colis",
+            description="Retourne la chronologie des changements de statut d'un colis")
+async def get_historique_route(colis_id: int, db: Session = Depends(get_db)):
+    """
+    Retourne l'historique des statuts d'un colis, du plus ancien au plus récent.
+    
+    **Paramètres** :
+    - **colis_id** : Identifiant unique du colis
+    
+    Chaque entrée contient l'ancien statut (null à la création), le nouveau
+    statut et l'horodatage de la transition. L'historique est en ajout seul.
+    
+    **Retour** :
+    - Code 200 : Liste des transitions
+    - Code 404 : Colis non trouvé
+    """
+    historique = await run_db(db, get_historique, colis_id)
+    if historique is None:
+        raise HTTPException(status_code=404, detail="Colis not found")
+    return historique
+
+
 @router.put("/{colis_id}", 
             response_model=ColisRead,
             summary="Mettre à jour un colis",
             description="Modifie les informations d'un colis existant (statut, assignation, etc.)")
-def update_colis_route(colis_id: int, colis_update: ColisUpdate, db: Session = Depends(get_db)):
+async def update_colis_route(colis_id: int, colis_update: ColisUpdate, db: Session = Depends(get_db)):
     """
     Met à jour un colis existant.
     
@@ -125,6 +371,10 @@ def update_colis_route(colis_id: int, colis_update: ColisUpdate, db: Session = D
     - id_livreur, id_zone
     - Seuls les champs fournis seront mis à jour
     
+    **Champ optionnel** :
+    - **version** : Version du colis lue par le client ; la modification est
+      refusée si le colis a changé depuis
+    
     **Cas d'usage** :
     - Changer le statut du colis lors de son parcours
     - Réassigner à un autre livreur
@@ -133,10 +383,14 @@ def update_colis_route(colis_id: int, colis_update: ColisUpdate, db: Session = D
     **Retour** :
     - Code 200 : Colis mis à jour avec succès
     - Code 404 : Colis non trouvé
+    - Code 409 : Colis modifié entre-temps par une autre requête
     
     Toute modification est enregistrée dans les logs.
     """
-    db_colis = update_colis(db, colis_id, colis_update)
+    try:
+        db_colis = await run_db(db, update_colis, colis_id, colis_update)
+    except ConcurrentModificationError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Colis modified concurrently")
     if not db_colis:
         raise HTTPException(status_code=404, detail="Colis not found")
     return db_colis
@@ -146,16 +400,20 @@ def update_colis_route(colis_id: int, colis_update: ColisUpdate, db: Session = D
                status_code=status.HTTP_204_NO_CONTENT,
                summary="Supprimer un colis",
                description="Supprime définitivement un colis du système")
-def delete_colis_route(colis_id: int, db: Session = Depends(get_db)):
+async def delete_colis_route(colis_id: int, db: Session = Depends(get_db)):
     """
     Supprime un colis du système.
     
     - **colis_id**: L'identifiant unique du colis à supprimer
     
-    Retourne une erreur 404 si le colis n'existe pas.
+    Retourne une erreur 404 si le colis n'existe pas, 409 s'il est modifié
+    pendant la suppression.
     Attention : Cette opération est irréversible.
     """
-    db_colis = delete_colis(db, colis_id)
+    try:
+        db_colis = await run_db(db, delete_colis, colis_id)
+    except ConcurrentModificationError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Colis modified concurrently")
     if not db_colis:
         raise HTTPException(status_code=404, detail="Colis not found")
     return None
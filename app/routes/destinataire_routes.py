@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from app.controllers.destinataire_controller import (create_destinataire, get_destinataires, get_destinataire_by_id, update_destinataire, delete_destinataire)
 from app.schemas.destinataire import (DestinataireBase, DestinataireCreate, DestinataireRead, DestinataireUpdate)
-from app.core.database import get_db
+from app.core.database import get_db, run_db
 from sqlalchemy.orm import Session
 
 router = APIRouter(
@@ -18,7 +18,7 @@ router = APIRouter(
              status_code=status.HTTP_201_CREATED,
              summary="Créer un nouveau destinataire",
              description="Enregistre un nouveau destinataire dans le système")
-def create_destinataire_route(destinataire: DestinataireCreate, db: Session = Depends(get_db)):
+async def create_destinataire_route(destinataire: DestinataireCreate, db: Session = Depends(get_db)):
     """
     Crée un nouveau destinataire.
     
@@ -34,13 +34,13 @@ def create_destinataire_route(destinataire: DestinataireCreate, db: Session = De
     
     L'action est enregistrée dans les logs système.
     """
-    return create_destinataire(db, destinataire)
+    return await run_db(db, create_destinataire, destinataire)
 
 @router.get("/",
             response_model=list[DestinataireRead],
             summary="Lister tous les destinataires",
             description="Récupère la liste complète de tous les destinataires enregistrés")
-def get_destinataires_route(db: Session = Depends(get_db)):
+async def get_destinataires_route(db: Session = Depends(get_db)):
     """
     Récupère tous les destinataires.
     
@@ -48,13 +48,13 @@ def get_destinataires_route(db: Session = Depends(get_db)):
     - Liste de tous les destinataires avec leurs coordonnées complètes
     - Liste vide si aucun destinataire n'est enregistré
     """
-    return get_destinataires(db)
+    return await run_db(db, get_destinataires)
 
 @router.get("/{destinataire_id}",
             response_model=DestinataireRead,
             summary="Récupérer un destinataire par son ID",
             description="Récupère les détails complets d'un destinataire spécifique")
-def get_destinataire_by_id_route(destinataire_id: int, db: Session = Depends(get_db)):
+async def get_destinataire_by_id_route(destinataire_id: int, db: Session = Depends(get_db)):
     """
     Récupère un destinataire spécifique.
     
@@ -65,7 +65,7 @@ def get_destinataire_by_id_route(destinataire_id: int, db: Session = Depends(get
     - Code 200 : Détails du destinataire
     - Code 404 : Destinataire non trouvé
     """
-    destinataire = get_destinataire_by_id(db, destinataire_id)
+    destinataire = await run_db(db, get_destinataire_by_id, destinataire_id)
     if not destinataire:
         raise HTTPException(status_code=404, detail="Destinataire not found")
     return destinataire
@@ -74,7 +74,7 @@ def get_destinataire_by_id_route(destinataire_id: int, db: Session = Depends(get
             response_model=DestinataireRead,
             summary="Mettre à jour un destinataire",
             description="Modifie les informations d'un destinataire existant")
-def update_destinataire_route(destinataire_id: int, destinataire_update: DestinataireUpdate, db: Session = Depends(get_db)):
+async def update_destinataire_route(destinataire_id: int, destinataire_update: DestinataireUpdate, db: Session = Depends(get_db)):
     """
     Met à jour les informations d'un destinataire.
     
@@ -91,7 +91,7 @@ def update_destinataire_route(destinataire_id: int, destinataire_update: Destina
     
     L'action est enregistrée dans les logs système.
     """
-    destinataire = update_destinataire(db, destinataire_id, destinataire_update)
+    destinataire = await run_db(db, update_destinataire, destinataire_id, destinataire_update)
     if not destinataire:
         raise HTTPException(status_code=404, detail="Destinataire not found")
     return destinataire
@@ -100,7 +100,7 @@ def update_destinataire_route(destinataire_id: int, destinataire_update: Destina
                status_code=status.HTTP_204_NO_CONTENT,
                summary="Supprimer un destinataire",
                description="Supprime définitivement un destinataire du système")
-def delete_destinataire_route(destinataire_id: int, db: Session = Depends(get_db)):
+async def delete_destinataire_route(destinataire_id: int, db: Session = Depends(get_db)):
     """
     Supprime un destinataire du système.
     
@@ -114,7 +114,7 @@ def delete_destinataire_route(destinataire_id: int, db: Session = Depends(get_db
     Attention : Cette opération est irréversible.
     La suppression est enregistrée dans les logs système.
     """
-    destinataire = delete_destinataire(db, destinataire_id)
+    destinataire = await run_db(db, delete_destinataire, destinataire_id)
     if not destinataire:
         raise HTTPException(status_code=404, detail="Destinataire not found")
     return None
\ No newline at end of file
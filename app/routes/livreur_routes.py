@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Header, Response
+from fastapi.responses import ORJSONResponse
 from app.controllers.livreur_controller import (create_livreur, update_livreur, delete_livreur, get_livreur_by_id, get_livreurs)
-from app.controllers.colis_controller import get_colis_by_livreur
-from app.schemas.livreur import (LivreurBase, LivreurRead, LivreurCreate, LivreurUpdate)
+from app.controllers.colis_controller import get_colis_by_livreur, get_colis_versions_by_livreur, read_columns
+from app.controllers.workload_controller import get_workload
+from app.controllers.assignment_controller import claim_colis
+from app.core.config import settings
+from app.schemas.livreur import (LivreurBase, LivreurRead, LivreurCreate, LivreurUpdate, LivreurWorkload)
 from app.schemas.colis import ColisRead
-from app.core.database import get_db
+from app.core.database import get_db, run_db
+from app.utils.etag import versions_etag, etag_matches, not_modified
+from typing import Optional
 from sqlalchemy.orm import Session
 
 router = APIRouter(
@@ -22,7 +28,7 @@ router = APIRouter(
              status_code=status.HTTP_201_CREATED,
              summary="Créer un nouveau livreur",
              description="Enregistre un nouveau livreur dans le système avec ses informations et zone assignée")
-def create_livreur_route(livreur: LivreurCreate, db: Session = Depends(get_db)):
+async def create_livreur_route(livreur: LivreurCreate, db: Session = Depends(get_db)):
     """
     Crée un nouveau livreur.
     
@@ -38,7 +44,7 @@ def create_livreur_route(livreur: LivreurCreate, db: Session = Depends(get_db)):
     
     L'action est enregistrée dans les logs système.
     """
-    return create_livreur(db, livreur)
+    return await run_db(db, create_livreur, livreur)
 
 
 
@@ -46,7 +52,7 @@ def create_livreur_route(livreur: LivreurCreate, db: Session = Depends(get_db)):
             response_model=list[LivreurRead],
             summary="Lister tous les livreurs",
             description="Récupère la liste complète de tous les livreurs enregistrés dans le système")
-def get_livreurs_route(db: Session = Depends(get_db)):
+async def get_livreurs_route(db: Session = Depends(get_db)):
     """
     Récupère tous les livreurs.
     
@@ -55,14 +61,34 @@ def get_livreurs_route(db: Session = Depends(get_db)):
     - Inclut la zone assignée et le type de véhicule
     - Liste vide si aucun livreur n'est enregistré
     """
-    return get_livreurs(db)
+    return await run_db(db, get_livreurs)
+
+
+@router.get("/workload",
+            response_model=list[LivreurWorkload],
+            summary="Charge de travail des livreurs",
+            description="Nombre de colis par livreur et par statut, pour toute la flotte en une lecture")
+async def get_workload_route(db: Session = Depends(get_db)):
+    """
+    Récupère la charge de travail de tous les livreurs.
+    
+    **Retour** (un élément par livreur ayant au moins un colis) :
+    - **id_livreur** : Identifiant du livreur
+    - **total** : Nombre de colis assignés
+    - **en_cours** : Colis non encore livrés
+    - **par_statut** : Nombre de colis par statut
+    
+    Les compteurs sont tenus à jour à chaque assignation, changement de
+    statut ou suppression : aucun colis n'est relu pour les calculer.
+    """
+    return await run_db(db, get_workload)
 
 
 @router.get("/{livreur_id}",
             response_model=LivreurRead,
             summary="Récupérer un livreur par son ID",
             description="Récupère les détails complets d'un livreur spécifique")
-def get_livreur_by_id_route(livreur_id: int, db: Session = Depends(get_db)):
+async def get_livreur_by_id_route(livreur_id: int, db: Session = Depends(get_db)):
     """
     Récupère un livreur spécifique par son identifiant.
     
@@ -73,7 +99,7 @@ def get_livreur_by_id_route(livreur_id: int, db: Session = Depends(get_db)):
     - Code 200 : Détails du livreur (nom, prénom, véhicule, zone, etc.)
     - Code 404 : Livreur non trouvé
     """
-    livreur = get_livreur_by_id(db, livreur_id)
+    livreur = await run_db(db, get_livreur_by_id, livreur_id)
     if not livreur:
         raise HTTPException(status_code=404, detail="Livreur not found")
     return livreur
@@ -84,7 +110,12 @@ def get_livreur_by_id_route(livreur_id: int, db: Session = Depends(get_db)):
             response_model=list[ColisRead],
             summary="Récupérer tous les colis d'un livreur",
             description="Liste tous les colis assignés à un livreur spécifique avec leurs statuts")
-def get_livreur_colis_route(livreur_id: int, db: Session = Depends(get_db)):
+async def get_livreur_colis_route(
+    livreur_id: int,
+    response: Response,
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Récupère tous les colis assignés à un livreur.
     
@@ -95,24 +126,75 @@ def get_livreur_colis_route(livreur_id: int, db: Session = Depends(get_db)):
     - Liste des colis avec leurs statuts et destinations
     - Liste vide si le livreur n'a pas de colis assignés
     - Code 404 si le livreur n'existe pas
+    - En-tête **ETag** : empreinte des (id, version) des colis ; renvoyé dans
+      If-None-Match, il donne un code 304 sans corps tant qu'aucun colis n'a
+      été ajouté, retiré ou modifié (seuls id et version sont alors lus)
     
     Utile pour voir la charge de travail actuelle d'un livreur.
     """
     # Verify livreur exists
-    livreur = get_livreur_by_id(db, livreur_id)
+    livreur = await run_db(db, get_livreur_by_id, livreur_id)
     if not livreur:
         raise HTTPException(status_code=404, detail="Livreur not found")
     
-    return get_colis_by_livreur(db, livreur_id)
-
-
+    if if_none_match:
+        etag = versions_etag(await run_db(db, get_colis_versions_by_livreur, livreur_id))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    
+    columns = read_columns()
+    if columns:
+        items = await run_db(db, get_colis_by_livreur, livreur_id, columns=columns)
+        etag = versions_etag((colis["id"], colis["version"]) for colis in items)
+        return ORJSONResponse(items, headers={"ETag": etag})
+    items = await run_db(db, get_colis_by_livreur, livreur_id)
+    response.headers["ETag"] = versions_etag((colis.id, colis.version) for colis in items)
+    return items
+
+
+
+@router.post("/{livreur_id}/claim",
+             response_model=list[ColisRead],
+             summary="Prendre en charge les prochains colis",
+             description="Attribue atomiquement au livreur les prochains colis en attente de sa zone")
+async def claim_colis_route(
+    livreur_id: int,
+    db: Session = Depends(get_db),
+    n: int = Query(10, ge=1, le=settings.CLAIM_MAX_ITEMS, description="Nombre de colis à prendre en charge")
+):
+    """
+    Prend en charge les prochains colis en attente pour un livreur.
+    
+    **Paramètres** :
+    - **livreur_id** : Identifiant unique du livreur
+    - **n** : Nombre de colis souhaités (défaut : 10, maximum : CLAIM_MAX_ITEMS)
+    
+    **File d'attente** :
+    - Colis non assignés aux statuts "créé", "collecté" ou "en stock", dans
+      la zone du livreur (zone_assignee) ; toutes zones si elle est inconnue
+    - Ordre CLAIM_ORDER : priorité décroissante puis ancienneté (`priorite`),
+      ou ancienneté seule (`anciennete`)
+    
+    Chaque colis n'est attribué qu'à un seul livreur, même si des centaines
+    d'appels sont simultanés : les colis en cours d'attribution à un autre
+    livreur sont sautés plutôt qu'attendus. Les colis "créé" passent "en transit".
+    
+    **Retour** :
+    - Code 200 : Colis attribués, dans l'ordre de la file (au plus n ; liste
+      vide si aucun colis n'est en attente)
+    - Code 404 : Livreur non trouvé
+    """
+    claimed = await run_db(db, claim_colis, livreur_id, n)
+    if claimed is None:
+        raise HTTPException(status_code=404, detail="Livreur not found")
+    return claimed
 
 
 @router.put("/{livreur_id}",
             response_model=LivreurRead,
             summary="Mettre à jour un livreur",
             description="Modifie les informations d'un livreur existant")
-def update_livreur_route(livreur_id: int, livreur_update: LivreurUpdate, db: Session = Depends(get_db)):
+async def update_livreur_route(livreur_id: int, livreur_update: LivreurUpdate, db: Session = Depends(get_db)):
     """
     Met à jour les informations d'un livreur.
     
@@ -129,7 +211,7 @@ def update_livreur_route(livreur_id: int, livreur_update: LivreurUpdate, db: Ses
     
     L'action est enregistrée dans les logs système.
     """
-    livreur = update_livreur(db, livreur_id, livreur_update)
+    livreur = await run_db(db, update_livreur, livreur_id, livreur_update)
     if not livreur:
         raise HTTPException(status_code=404, detail="Livreur not found")
     return livreur
@@ -141,7 +223,7 @@ def update_livreur_route(livreur_id: int, livreur_update: LivreurUpdate, db: Ses
                status_code=status.HTTP_204_NO_CONTENT,
                summary="Supprimer un livreur",
                description="Supprime définitivement un livreur du système")
-def delete_livreur_route(livreur_id: int, db: Session = Depends(get_db)):
+async def delete_livreur_route(livreur_id: int, db: Session = Depends(get_db)):
     """
     Supprime un livreur du système.
     
@@ -156,7 +238,7 @@ def delete_livreur_route(livreur_id: int, db: Session = Depends(get_db)):
     Les colis assignés à ce livreur devront être réassignés.
     La suppression est enregistrée dans les logs système.
     """
-    livreur = delete_livreur(db, livreur_id)
+    livreur = await run_db(db, delete_livreur, livreur_id)
     if not livreur:
         raise HTTPException(status_code=404, detail="Livreur not found")
     return None
\ No newline at end of file
@@ -0,0 +1,84 @@
+from fastapi import APIRouter
+from app.core.database import pool_metrics
+from app.utils.logger import logging_stats
+from app.utils.cache import caches
+from app.core.events import event_bus
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Monitoring"],
+    responses={
+        500: {"description": "Erreur interne du serveur"}
+    }
+)
+
+
+@router.get("/pool",
+            summary="Statistiques du pool de connexions",
+            description="Compteurs du pool de connexions à la base de données de ce worker")
+def get_pool_metrics_route():
+    """
+    Retourne l'état du pool de connexions de ce worker.
+    
+    **Retour** (par pool : `sync`, et `async` si DB_ASYNC est activé) :
+    - **pool_size**, **max_overflow** : Dimensionnement configuré
+    - **checked_out**, **peak_checked_out** : Connexions en cours d'utilisation (actuel / maximum)
+    - **saturation** : Part de la capacité (pool_size + max_overflow) utilisée
+    - **checkouts**, **checkins**, **connections_created** : Compteurs cumulés
+    - **timeouts** : Requêtes n'ayant pas obtenu de connexion dans DB_POOL_TIMEOUT
+    - **wait_time_avg_ms**, **wait_time_max_ms** : Temps d'obtention d'une connexion
+    
+    Un temps d'attente qui augmente indique que les requêtes font la queue
+    pour une connexion : augmenter DB_POOL_SIZE ou réduire la charge.
+    """
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+
+
+@router.get("/logging",
+            summary="Statistiques de la journalisation",
+            description="État de la file de journalisation asynchrone de ce worker")
+def get_logging_metrics_route():
+    """
+    Retourne l'état de la file de journalisation.
+    
+    **Retour** :
+    - **queue_size** / **queue_capacity** : Messages en attente d'écriture / taille de la file
+    - **policy** : Comportement quand la file est pleine (`drop` ou `block`)
+    - **dropped** : Messages abandonnés faute de place (politique `drop`)
+    """
+    return logging_stats()
+
+
+@router.get("/cache",
+            summary="Statistiques des caches",
+            description="Compteurs des caches en mémoire de ce worker (succès, échecs, évictions)")
+def get_cache_metrics_route():
+    """
+    Retourne les compteurs de chaque cache en mémoire.
+    
+    **Retour** (par cache) :
+    - **size** / **maxsize** : Entrées présentes / capacité (éviction LRU au-delà)
+    - **ttl_seconds** : Durée de vie d'une entrée
+    - **hits**, **misses**, **hit_ratio** : Lectures servies depuis le cache ou la base
+    - **evictions** : Entrées évincées faute de place
+    - **invalidations** : Invalidations explicites (écritures)
+    - **coalesced** : Lectures servies par le chargement d'une autre requête (single-flight)
+    """
+    return {name: cache.stats() for name, cache in caches.items()}
+
+
+@router.get("/events",
+            summary="Statistiques des événements temps réel",
+            description="Abonnés et événements publiés ou abandonnés sur ce worker")
+def get_events_metrics_route():
+    """
+    Retourne l'état du bus d'événements temps réel.
+    
+    **Retour** :
+    - **backend** : Transport utilisé (EVENT_BACKEND)
+    - **subscribers** : Connexions WebSocket / SSE ouvertes
+    - **queue_size** : Capacité de la file de chaque connexion
+    - **published** : Événements publiés
+    - **dropped** : Événements abandonnés car un client ne lisait pas assez vite
+    """
+    return event_bus.stats()
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from app.core.events import event_bus
+
+router = APIRouter(
+    prefix="/ws",
+    tags=["Temps réel"]
+)
+
+
+async def _wait_disconnect(websocket: WebSocket):
+    # Les messages du client sont ignorés ; seule la déconnexion compte
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+@router.websocket("/colis")
+async def colis_websocket(
+    websocket: WebSocket,
+    colis_id: Optional[int] = None,
+    zone_id: Optional[int] = None,
+    livreur_id: Optional[int] = None
+):
+    """
+    Pousse les événements colis (`colis.updated`, `colis.assigned`) en JSON,
+    filtrés par colis_id, zone_id et/ou livreur_id. Même contenu que le flux
+    SSE GET /colis/stream ; la file de chaque connexion est bornée.
+    """
+    # Abonnement avant l'acceptation : aucun événement perdu après la connexion
+    subscription = event_bus.subscribe(colis_id=colis_id, zone_id=zone_id, livreur_id=livreur_id)
+    disconnected = None
+    try:
+        await websocket.accept()
+        disconnected = asyncio.create_task(_wait_disconnect(websocket))
+        while True:
+            next_event = asyncio.create_task(subscription.get())
+            await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected.done():
+                next_event.cancel()
+                break
+            await websocket.send_json(next_event.result())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        event_bus.unsubscribe(subscription)
+        if disconnected:
+            disconnected.cancel()
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.controllers.stats_controller import get_colis_stats
+from app.schemas.stats import ColisStats
+from app.core.database import get_db, run_db
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["Statistiques"],
+    responses={
+        500: {"description": "Erreur interne du serveur"}
+    }
+)
+
+
+@router.get("/colis",
+            response_model=ColisStats,
+            summary="Statistiques des colis",
+            description="Nombre de colis par statut, zone et livreur pour le tableau de bord")
+async def get_colis_stats_route(db: Session = Depends(get_db)):
+    """
+    Récupère les compteurs de colis du tableau de bord.
+    
+    **Retour** :
+    - **total** : Nombre total de colis
+    - **poids_total_kg**, **poids_moyen_kg** : Somme et moyenne des poids (SUM / AVG en base,
+      colis au poids non reconnu exclus de la moyenne)
+    - **par_statut** : Nombre de colis par statut
+    - **groupes** : Nombre de colis, poids total et moyen par combinaison
+      (statut, id_zone, id_livreur) ; id_zone / id_livreur à null pour les
+      colis sans zone ou non assignés
+    - **calcule_le** : Date du calcul
+    
+    Le résultat est recalculé au plus une fois toutes les STATS_CACHE_TTL_SECONDS
+    secondes (5 s par défaut) : les requêtes simultanées partagent le même calcul.
+    """
+    return await run_db(db, get_colis_stats)
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.controllers.zone_controller import create_zone, get_all_zones, get_zone
+from app.core.database import get_db, run_db
+from app.controllers.zone_controller import create_zone, get_all_zones_with_etag, get_zone
+from app.utils.etag import etag_matches, not_modified
+from typing import Optional
 from app.schemas.zone import ZoneBase, ZoneRead, ZoneUpdate, ZoneCreate
 
 router = APIRouter(
@@ -19,7 +21,7 @@ router = APIRouter(
              status_code=status.HTTP_201_CREATED,
              summary="Créer une nouvelle zone de livraison",
              description="Enregistre une nouvelle zone géographique de livraison")
-def create_zone_route(zone: ZoneCreate, db: Session = Depends(get_db)):
+async def create_zone_route(zone: ZoneCreate, db: Session = Depends(get_db)):
     """
     Crée une nouvelle zone de livraison.
     
@@ -33,31 +35,41 @@ def create_zone_route(zone: ZoneCreate, db: Session = Depends(get_db)):
     Les zones permettent d'organiser efficacement les livraisons.
     L'action est enregistrée dans les logs système.
     """
-    return create_zone(db, zone)
+    return await run_db(db, create_zone, zone)
 
 
 @router.get("/",
             response_model=list[ZoneRead],
             summary="Lister toutes les zones de livraison",
             description="Récupère la liste complète de toutes les zones de livraison")
-def get_all_zones_route(db: Session = Depends(get_db)):
+async def get_all_zones_route(
+    response: Response,
+    db: Session = Depends(get_db),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Récupère toutes les zones de livraison.
     
     **Retour** :
     - Liste de toutes les zones avec leurs détails
     - Liste vide si aucune zone n'est configurée
+    - En-tête **ETag** : empreinte de la liste ; renvoyé dans If-None-Match,
+      il donne un code 304 sans corps tant que les zones n'ont pas changé
     
     Utile pour afficher la couverture géographique disponible.
     """
-    return get_all_zones(db)
+    zones, etag = await run_db(db, get_all_zones_with_etag)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return zones
 
 
 @router.get("/{id}",
             response_model=ZoneRead,
             summary="Récupérer une zone par son ID",
             description="Récupère les détails d'une zone de livraison spécifique")
-def get_zone_route(id: int, db: Session = Depends(get_db)):
+async def get_zone_route(id: int, db: Session = Depends(get_db)):
     """
     Récupère une zone de livraison spécifique.
     
@@ -68,7 +80,7 @@ def get_zone_route(id: int, db: Session = Depends(get_db)):
     - Code 200 : Détails de la zone
     - Code 404 : Zone non trouvée
     """
-    zone = get_zone(db, id)
+    zone = await run_db(db, get_zone, id)
     if not zone:
         raise HTTPException(status_code=404, detail="Zone not found")
     return zone
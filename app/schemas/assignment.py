@@ -1,17 +1,40 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import Optional, Literal
 
 
 class AssignmentCreate(BaseModel):
     colis_id: int
     livreur_id: int
     zone_id: Optional[int] = None
+    # Version du colis lue par le dispatcher : refus (409) si le colis a changé depuis
+    version: Optional[int] = None
 
 
 class AssignmentResponse(BaseModel):
     colis_id: int
     livreur_id: int
     zone_id: Optional[int]
+    version: int
     message: str
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class AssignmentBatchItemResult(BaseModel):
+    colis_id: int
+    livreur_id: int
+    zone_id: Optional[int]
+    success: bool
+    message: str
+
+
+class AssignmentBatchResponse(BaseModel):
+    assigned: int
+    results: list[AssignmentBatchItemResult]
+
+
+class AutoAssignmentResponse(BaseModel):
+    method: Literal["optimal", "greedy"]
+    assigned: int
+    unassigned: int
+    results: list[AssignmentBatchItemResult]
@@ -19,6 +19,7 @@ class ColisBase(BaseModel):
     id_destinataire: int
     id_zone: Optional[int]
     ville_destination: str
+    priorite: int = 0
     
 class ColisCreate(ColisBase):
     pass 
@@ -30,8 +31,29 @@ class ColisUpdate(BaseModel):
     ville_destination: Optional[str] = None
     id_livreur: Optional[int] = None
     id_zone: Optional[int] = None
+    priorite: Optional[int] = None
+    # Version lue par le client : la modification est refusée (409) si le colis a changé depuis
+    version: Optional[int] = None
     
 class ColisRead(ColisBase):
     id: int
+    poids_kg: Optional[float] = None
+    version: int = 1
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ColisPage(BaseModel):
+    items: list[ColisRead]
+    next_cursor: Optional[str] = None
+
+
+
+class ColisBulkError(BaseModel):
+    index: int
+    detail: str
+
+
+class ColisBulkResult(BaseModel):
+    created: int
+    ids: list[int]
+    errors: list[ColisBulkError]
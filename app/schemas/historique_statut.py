@@ -0,0 +1,14 @@
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Optional
+from app.schemas.colis import StatutColis
+
+
+class HistoriqueStatutRead(BaseModel):
+    id: int
+    id_colis: int
+    ancien_statut: Optional[StatutColis]
+    nouveau_statut: StatutColis
+    timestamp: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, ConfigDict
 from typing import Optional
+from app.schemas.colis import StatutColis
 
 
 class LivreurBase(BaseModel):
@@ -21,4 +22,11 @@ class LivreurUpdate(BaseModel):
 
 class LivreurRead(LivreurBase):
     id: int
-    model_config = ConfigDict(from_attributes=True) 
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LivreurWorkload(BaseModel):
+    id_livreur: int
+    total: int
+    en_cours: int
+    par_statut: dict[StatutColis, int]
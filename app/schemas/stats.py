@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+from app.schemas.colis import StatutColis
+
+
+class ColisStatsGroup(BaseModel):
+    statut: Optional[StatutColis]
+    id_zone: Optional[int]
+    id_livreur: Optional[int]
+    nombre: int
+    poids_total_kg: float
+    poids_moyen_kg: Optional[float]
+
+
+class ColisStats(BaseModel):
+    total: int
+    poids_total_kg: float
+    poids_moyen_kg: Optional[float]
+    par_statut: dict[str, int]
+    groupes: list[ColisStatsGroup]
+    calcule_le: datetime
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from sqlalchemy.exc import MissingGreenlet
+from sqlalchemy.util import await_only
+
+_MISSING = object()
+
+# Caches déclarés, exposés par /metrics/cache
+caches: dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """
+    Cache en mémoire (par worker) à expiration (TTL) et éviction LRU, thread-safe
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrémentée à chaque invalidation : une valeur chargée avant une
+        # invalidation concurrente n'est pas remise en cache
+        self._generation = 0
+        # Chargements en cours par clé (single-flight) : threads, et boucle
+        # d'événements en mode DB_ASYNC
+        self._inflight: dict = {}
+        self._inflight_async: dict = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.coalesced = 0
+        caches[name] = self
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value, generation: int = None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (self._clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], object]):
+        """
+        Retourne la valeur en cache, ou l'obtient avec loader() et la met en cache
+        (une valeur None n'est pas mise en cache).
+
+        Single-flight : pendant un chargement, les autres threads demandant la
+        même clé attendent son résultat au lieu de relancer loader().
+        Sur la boucle d'événements (mode DB_ASYNC, contrôleur exécuté par
+        run_sync), l'attente passe par une asyncio.Future par clé.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if _in_event_loop():
+            return self._get_or_load_async(key, loader)
+        with self._lock:
+            loading = self._inflight.get(key)
+            if loading is None:
+                loading = self._inflight[key] = threading.Event()
+                leader = True
+            else:
+                leader = False
+
+        if not leader:
+            loading.wait()
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                with self._lock:
+                    self.coalesced += 1
+                return value
+
+        try:
+            generation = self._generation
+            value = loader()
+            if value is not None:
+                self.set(key, value, generation)
+            return value
+        finally:
+            if leader:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                loading.set()
+
+    def _get_or_load_async(self, key: Hashable, loader: Callable[[], object]):
+        # Attendre un Event bloquerait la boucle qui exécute justement le
+        # chargement : les suiveurs attendent la Future du meneur via le
+        # greenlet de run_sync (await_only), qui rend la main à la boucle
+        loading = self._inflight_async.get(key)
+        leader = loading is None
+        if leader:
+            loading = self._inflight_async[key] = asyncio.get_running_loop().create_future()
+        else:
+            try:
+                await_only(_wait_for(loading))
+            except MissingGreenlet:
+                # Appel hors run_sync : impossible d'attendre sans bloquer
+                pass
+            else:
+                value = self.get(key, _MISSING)
+                if value is not _MISSING:
+                    with self._lock:
+                        self.coalesced += 1
+                    return value
+
+        try:
+            generation = self._generation
+            value = loader()
+            if value is not None:
+                self.set(key, value, generation)
+            return value
+        finally:
+            if leader:
+                self._inflight_async.pop(key, None)
+                loading.set_result(None)
+
+    def invalidate(self, key: Hashable = _MISSING):
+        """
+        Supprime une entrée, ou tout le cache si aucune clé n'est donnée
+        """
+        with self._lock:
+            if key is _MISSING:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "coalesced": self.coalesced,
+            }
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+async def _wait_for(loading: asyncio.Future):
+    await asyncio.shield(loading)
+
+
+def clear_all_caches():
+    for cache in caches.values():
+        cache.invalidate()
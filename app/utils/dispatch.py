@@ -0,0 +1,177 @@
+"""
+Calcul des assignations automatiques colis -> livreurs, sans accès à la base
+
+Coût d'affecter un colis à un livreur = charge du livreur (colis en cours,
+y compris ceux déjà affectés dans la vague) + une pénalité si le livreur
+n'appartient pas à la zone du colis. Chaque livreur est limité à max_load
+colis en cours ; les colis sans place restent non assignés.
+"""
+import heapq
+from typing import Optional
+
+OPTIMAL = "optimal"
+GREEDY = "greedy"
+
+
+def hungarian(cost: list[list[float]]) -> list[int]:
+    """
+    Affectation de coût total minimal (algorithme hongrois, O(n²·m)) pour une
+    matrice n x m avec n <= m ; retourne la colonne choisie pour chaque ligne
+    """
+    n, m = len(cost), len(cost[0])
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    p = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            row = cost[i0 - 1]
+            ui0 = u[i0]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - ui0 - v[j]
+                    if cur < minv[j]:
+                        minv[j] = cur
+                        way[j] = j0
+                    if minv[j] < delta:
+                        delta = minv[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    result = [-1] * n
+    for j in range(1, m + 1):
+        if p[j]:
+            result[p[j] - 1] = j - 1
+    return result
+
+
+def _plan_optimal(colis, zone_of, loads, zone_penalty, max_load):
+    n = len(colis)
+    # Le k-ième colis supplémentaire d'un livreur coûte sa charge + k : une
+    # colonne par « place » (livreur, k), ce qui rend le coût convexe en la charge
+    # et répartit les colis. Seules les n places les moins chargées de chaque zone
+    # de la vague, et les n moins chargées toutes zones confondues, peuvent servir
+    # dans une solution optimale : les autres colonnes sont écartées.
+    def places(livreur_ids):
+        return heapq.nsmallest(n, (
+            (loads.get(livreur_id, 0) + k, livreur_id)
+            for livreur_id in livreur_ids
+            for k in range(min(n, max_load - loads.get(livreur_id, 0)))
+        ))
+
+    by_zone: dict = {}
+    for livreur_id, zone_id in zone_of.items():
+        by_zone.setdefault(zone_id, []).append(livreur_id)
+    columns = set(places(zone_of))
+    for zone_id in {zone for _, zone in colis if zone is not None}:
+        columns.update(places(by_zone.get(zone_id, ())))
+    columns = sorted(columns)
+
+    # Colonnes fictives « non assigné », plus chères que toute place réelle
+    unassigned_cost = max_load + zone_penalty + 1
+    width = max(len(columns), n)
+    matrix = [
+        [
+            load + (0 if zone is None or zone_of[livreur_id] == zone else zone_penalty)
+            for load, livreur_id in columns
+        ] + [unassigned_cost] * (width - len(columns))
+        for _, zone in colis
+    ]
+    plan = []
+    for (colis_id, _), column in zip(colis, hungarian(matrix)):
+        if column < len(columns):
+            plan.append((colis_id, columns[column][1]))
+    return plan
+
+
+def _plan_greedy(colis, zone_of, loads, zone_penalty, max_load):
+    # Tas (charge, livreur) par zone et global ; une entrée est périmée si la
+    # charge du livreur a changé depuis son insertion
+    current = {livreur_id: loads.get(livreur_id, 0) for livreur_id in zone_of}
+    everyone = []
+    by_zone: dict = {}
+    for livreur_id, zone_id in zone_of.items():
+        if current[livreur_id] < max_load:
+            everyone.append((current[livreur_id], livreur_id))
+            by_zone.setdefault(zone_id, []).append((current[livreur_id], livreur_id))
+    heapq.heapify(everyone)
+    for heap in by_zone.values():
+        heapq.heapify(heap)
+
+    def top(heap):
+        while heap:
+            load, livreur_id = heap[0]
+            if load == current[livreur_id]:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    plan = []
+    for colis_id, zone in colis:
+        best = None
+        if zone is not None:
+            best = top(by_zone.get(zone, []))
+        candidate = top(everyone)
+        if candidate is not None:
+            penalty = 0 if zone is None or zone_of[candidate[1]] == zone else zone_penalty
+            if best is None or candidate[0] + penalty < best[0]:
+                best = candidate
+        if best is None:
+            break
+        livreur_id = best[1]
+        plan.append((colis_id, livreur_id))
+        current[livreur_id] += 1
+        if current[livreur_id] < max_load:
+            entry = (current[livreur_id], livreur_id)
+            heapq.heappush(everyone, entry)
+            heapq.heappush(by_zone[zone_of[livreur_id]], entry)
+        else:
+            current[livreur_id] = max_load + 1  # périme toutes ses entrées
+    return plan
+
+
+def plan_assignments(
+    colis: list[tuple[int, Optional[int]]],
+    livreurs: list[tuple[int, Optional[int]]],
+    loads: dict[int, int],
+    zone_penalty: int,
+    max_load: int,
+    optimal_max: int,
+) -> tuple[list[tuple[int, int]], str]:
+    """
+    Calcule les assignations d'une vague.
+
+    - colis : (id, id_zone) des colis à assigner, par ordre de priorité
+    - livreurs : (id, id_zone) des livreurs disponibles
+    - loads : nombre de colis en cours par livreur
+
+    Affectation optimale (coût total minimal) jusqu'à optimal_max colis,
+    heuristique gloutonne (livreur le moins coûteux, colis par colis) au-delà.
+    Retourne la liste (colis_id, livreur_id) et la méthode utilisée.
+    """
+    zone_of = {livreur_id: zone_id for livreur_id, zone_id in livreurs if loads.get(livreur_id, 0) < max_load}
+    if not colis or not zone_of:
+        return [], OPTIMAL if len(colis) <= optimal_max else GREEDY
+    if len(colis) <= optimal_max:
+        return _plan_optimal(colis, zone_of, loads, zone_penalty, max_load), OPTIMAL
+    return _plan_greedy(colis, zone_of, loads, zone_penalty, max_load), GREEDY
@@ -0,0 +1,56 @@
+"""
+ETag forts et GET conditionnels (If-None-Match -> 304 Not Modified)
+
+- Colis : la colonne version suffit, "<id>-<version>"
+- Listes de colis : empreinte des couples (id, version)
+- Données de référence sans version (zones) : empreinte du contenu
+"""
+import hashlib
+from typing import Iterable, Optional
+
+import orjson
+from fastapi import Response, status
+
+
+def version_etag(kind: str, id_: int, version: int) -> str:
+    return f'"{kind}-{id_}-{version}"'
+
+
+def content_etag(content) -> str:
+    """
+    Empreinte d'un contenu encodable par orjson (schémas pydantic compris)
+    """
+    digest = hashlib.blake2b(orjson.dumps(content, default=_default), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def versions_etag(pairs: Iterable[tuple[int, int]]) -> str:
+    """
+    Empreinte d'une collection à partir des (id, version) de ses éléments
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for id_, version in pairs:
+        digest.update(f"{id_}:{version};".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Comparaison faible de If-None-Match (RFC 9110) : "*" ou liste d'ETags
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return etag in (candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+def _default(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError
@@ -0,0 +1,33 @@
+import csv
+import enum
+import io
+import json
+from typing import Iterable, Sequence
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def ndjson_batch(rows: Iterable[Sequence], fields: Sequence[str]) -> bytes:
+    """
+    Sérialise un lot de lignes (tuples) en NDJSON, un objet JSON par ligne
+    """
+    return "".join(
+        json.dumps({field: _plain(value) for field, value in zip(fields, row)}, ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+def csv_batch(rows: Iterable[Sequence], fields: Sequence[str], header: bool = False) -> bytes:
+    """
+    Sérialise un lot de lignes (tuples) en CSV, précédé de l'en-tête si demandé
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(fields)
+    writer.writerows([_plain(value) for value in row] for row in rows)
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,208 @@
+"""
+Idempotence des POST (en-tête Idempotency-Key)
+
+La première requête portant une clé est exécutée et sa réponse (2xx) est
+conservée IDEMPOTENCY_TTL_SECONDS : une reprise de la même requête la rejoue
+sans transaction d'écriture. Les doublons simultanés d'un même worker
+attendent la requête en cours (single-flight) au lieu de s'exécuter.
+"""
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import run_db
+from app.models.cle_idempotence import CleIdempotence
+from app.utils.cache import TTLCache
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    body: bytes
+
+
+class IdempotencyStore(ABC):
+    """
+    Stockage des réponses rejouables. reserve() marque une clé comme en cours
+    de traitement et retourne False si un autre worker la détient déjà.
+    """
+
+    @abstractmethod
+    async def get(self, db, key: str) -> Optional[StoredResponse]:
+        ...
+
+    async def reserve(self, db, key: str, fingerprint: str) -> bool:
+        return True
+
+    @abstractmethod
+    async def save(self, db, key: str, response: StoredResponse):
+        ...
+
+    async def release(self, db, key: str):
+        pass
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """
+    En mémoire (par worker), bornée à IDEMPOTENCY_MAX_ENTRIES clés (LRU)
+    """
+
+    def __init__(self):
+        self.cache = TTLCache("idempotency", settings.IDEMPOTENCY_MAX_ENTRIES, settings.IDEMPOTENCY_TTL_SECONDS)
+
+    async def get(self, db, key: str) -> Optional[StoredResponse]:
+        return self.cache.get(key)
+
+    async def save(self, db, key: str, response: StoredResponse):
+        self.cache.set(key, response)
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """
+    Table cle_idempotence : partagée entre workers et conservée aux
+    redémarrages ; une clé en cours sur un autre worker donne 409
+    """
+
+    async def get(self, db, key: str) -> Optional[StoredResponse]:
+        return await run_db(db, _db_get, key)
+
+    async def reserve(self, db, key: str, fingerprint: str) -> bool:
+        return await run_db(db, _db_reserve, key, fingerprint)
+
+    async def save(self, db, key: str, response: StoredResponse):
+        await run_db(db, _db_save, key, response)
+
+    async def release(self, db, key: str):
+        await run_db(db, _db_release, key)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _db_get(db, key: str) -> Optional[StoredResponse]:
+    row = db.execute(
+        select(CleIdempotence.empreinte, CleIdempotence.code_statut, CleIdempotence.reponse)
+        .where(CleIdempotence.cle == key, CleIdempotence.code_statut.is_not(None),
+               CleIdempotence.expire_le > _utcnow())
+    ).first()
+    db.commit()
+    return StoredResponse(row.empreinte, row.code_statut, row.reponse) if row else None
+
+
+def _db_reserve(db, key: str, fingerprint: str) -> bool:
+    now = _utcnow()
+    # Réponse expirée, ou clé en cours dont le bail a expiré (worker arrêté
+    # en plein traitement) : la clé est reprise
+    db.execute(delete(CleIdempotence).where(CleIdempotence.cle == key, CleIdempotence.expire_le <= now))
+    try:
+        # Bail court tant que la requête est en cours ; la durée de
+        # conservation n'est appliquée qu'à la réponse (_db_save)
+        db.execute(insert(CleIdempotence).values(
+            cle=key, empreinte=fingerprint,
+            expire_le=now + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+        ))
+        db.commit()
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+
+
+def _db_save(db, key: str, response: StoredResponse):
+    now = _utcnow()
+    db.execute(
+        update(CleIdempotence).where(CleIdempotence.cle == key)
+        .values(code_statut=response.status_code, reponse=response.body,
+                expire_le=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS))
+    )
+    # Purge des clés expirées : la table reste bornée par le TTL
+    db.execute(delete(CleIdempotence).where(CleIdempotence.expire_le <= now))
+    db.commit()
+
+
+def _db_release(db, key: str):
+    db.rollback()
+    db.execute(delete(CleIdempotence).where(CleIdempotence.cle == key, CleIdempotence.code_statut.is_(None)))
+    db.commit()
+
+
+# Stockages disponibles (IDEMPOTENCY_BACKEND)
+IDEMPOTENCY_STORES = {"memory": MemoryIdempotencyStore, "database": DatabaseIdempotencyStore}
+
+store: IdempotencyStore = IDEMPOTENCY_STORES[settings.IDEMPOTENCY_BACKEND]()
+
+# Requêtes en cours par clé, sur ce worker (single-flight)
+_inflight: dict[str, asyncio.Future] = {}
+
+
+def _replay(stored: StoredResponse, fingerprint: str) -> Response:
+    if stored.fingerprint != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key déjà utilisée pour une requête différente"
+        )
+    return Response(content=stored.body, status_code=stored.status_code, media_type="application/json",
+                    headers={REPLAYED_HEADER: "true"})
+
+
+async def idempotent(db, scope: str, key: Optional[str], payload: BaseModel,
+                     handler: Callable[[], Awaitable], response_model: type[BaseModel], status_code: int):
+    """
+    Exécute handler() une seule fois par (scope, key) et rejoue sa réponse,
+    sérialisée par response_model, aux reprises portant la même clé.
+    Sans clé, handler() est simplement exécuté.
+
+    Une même clé avec un corps différent donne 422 ; une réponse en erreur
+    n'est pas conservée (la reprise est exécutée à nouveau).
+    """
+    if key is None:
+        return await handler()
+    key = f"{scope}:{key}"
+    fingerprint = hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+    while True:
+        stored = await store.get(db, key)
+        if stored is not None:
+            return _replay(stored, fingerprint)
+        pending = _inflight.get(key)
+        if pending is None:
+            break
+        # Doublon simultané : attendre la requête en cours puis relire sa réponse
+        await asyncio.shield(pending)
+
+    pending = _inflight[key] = asyncio.get_running_loop().create_future()
+    try:
+        if not await store.reserve(db, key, fingerprint):
+            stored = await store.get(db, key)
+            if stored is not None:
+                return _replay(stored, fingerprint)
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail="Requête identique en cours de traitement")
+        try:
+            result = await handler()
+        except BaseException:
+            await store.release(db, key)
+            raise
+        body = response_model.model_validate(result, from_attributes=True).model_dump_json().encode()
+        await store.save(db, key, StoredResponse(fingerprint, status_code, body))
+        logger.info(f"Réponse conservée pour la clé d'idempotence {key}")
+        return Response(content=body, status_code=status_code, media_type="application/json")
+    finally:
+        del _inflight[key]
+        pending.set_result(None)
@@ -1,7 +1,13 @@
+import atexit
 import logging
+import queue
 import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
+from app.core.config import settings
+
 log_dir = Path("logs")
 log_dir.mkdir(exist_ok=True)
 
@@ -9,34 +15,101 @@ log_dir.mkdir(exist_ok=True)
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# Attente maximale pour un message d'erreur quand la file est pleine (politique "drop")
+ERROR_PUT_TIMEOUT = 1.0
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Dépose les messages dans une file bornée ; les écritures sont faites par le
+    thread du QueueListener. File pleine : politique "drop" (les messages sous
+    ERROR sont abandonnés et comptés) ou "block" (attente d'une place).
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop"):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def enqueue(self, record):
+        if self.policy == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.ERROR:
+                try:
+                    self.queue.put(record, timeout=ERROR_PUT_TIMEOUT)
+                    return
+                except queue.Full:
+                    pass
+            with self._lock:
+                self.dropped += 1
+
+
+class _BlockingSentinelListener(QueueListener):
+    def enqueue_sentinel(self):
+        # Attend une place pour le signal d'arrêt au lieu d'échouer si la file est pleine
+        self.queue.put(self._sentinel)
+
+
+def _build_handlers() -> list[logging.Handler]:
+    formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+
+    # Console handler
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(logging.INFO)
+
+    # File handler for all logs
+    file_handler = RotatingFileHandler(
+        log_dir / "app.log",
+        maxBytes=settings.LOG_MAX_BYTES,
+        backupCount=settings.LOG_BACKUP_COUNT,
+        encoding="utf-8"
+    )
+    file_handler.setLevel(logging.INFO)
+
+    # Error file handler
+    error_handler = RotatingFileHandler(
+        log_dir / "errors.log",
+        maxBytes=settings.LOG_MAX_BYTES,
+        backupCount=settings.LOG_BACKUP_COUNT,
+        encoding="utf-8"
+    )
+    error_handler.setLevel(logging.ERROR)
+
+    handlers = [console_handler, file_handler, error_handler]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+_log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+_queue_handler = BoundedQueueHandler(_log_queue, policy=settings.LOG_QUEUE_POLICY)
+_queue_handler.setLevel(logging.INFO)
+_listener = _BlockingSentinelListener(_log_queue, *_build_handlers(), respect_handler_level=True)
+_listener.start()
+atexit.register(_listener.stop)
+
 
 def get_logger(name: str) -> logging.Logger:
 
     logger = logging.getLogger(name)
-    
+
     if not logger.handlers:
         logger.setLevel(logging.INFO)
-        
-        # Console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(logging.INFO)
-        console_formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
-        console_handler.setFormatter(console_formatter)
-        
-        # File handler for all logs
-        file_handler = logging.FileHandler(log_dir / "app.log", encoding="utf-8")
-        file_handler.setLevel(logging.INFO)
-        file_formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
-        file_handler.setFormatter(file_formatter)
-        
-        # Error file handler
-        error_handler = logging.FileHandler(log_dir / "errors.log", encoding="utf-8")
-        error_handler.setLevel(logging.ERROR)
-        error_formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
-        error_handler.setFormatter(error_formatter)
-        
-        logger.addHandler(console_handler)
-        logger.addHandler(file_handler)
-        logger.addHandler(error_handler)
-    
+        # Sur le chemin de la requête, journaliser se limite à un dépôt dans la file
+        logger.addHandler(_queue_handler)
+
     return logger
+
+
+def logging_stats() -> dict:
+    return {
+        "queue_size": _log_queue.qsize(),
+        "queue_capacity": _log_queue.maxsize,
+        "policy": _queue_handler.policy,
+        "dropped": _queue_handler.dropped,
+    }
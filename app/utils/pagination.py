@@ -0,0 +1,28 @@
+import base64
+import json
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(*values) -> str:
+    """
+    Encode la position du dernier élément d'une page en un curseur opaque
+    """
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int = 1) -> list:
+    """
+    Décode un curseur produit par encode_cursor
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Curseur de pagination invalide")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorError("Curseur de pagination invalide")
+    return values
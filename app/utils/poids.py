@@ -0,0 +1,27 @@
+import re
+from typing import Optional
+
+# Nombre (virgule ou point décimal) suivi d'une unité optionnelle (kg par défaut)
+_POIDS_RE = re.compile(r"^\s*(\d+(?:[.,]\d+)?)\s*(kg|kgs|kilos?|g|gr|grammes?|t|tonnes?)?\s*$", re.IGNORECASE)
+
+# Borne exclue de colis.poids_kg (Numeric(10, 3) : 7 chiffres avant la virgule)
+POIDS_KG_MAX = 10 ** 7
+
+# Facteur de conversion vers le kilogramme
+_UNITES = {"g": 0.001, "gr": 0.001, "gramme": 0.001, "grammes": 0.001, "t": 1000.0, "tonne": 1000.0, "tonnes": 1000.0}
+
+
+def parse_poids(poids: Optional[str]) -> Optional[float]:
+    """
+    Convertit un poids saisi librement ("5kg", "2,5 kg", "500 g") en kilogrammes ;
+    None si la valeur n'est pas reconnue ou ne tient pas dans colis.poids_kg
+    """
+    if not poids:
+        return None
+    match = _POIDS_RE.match(poids)
+    if not match:
+        return None
+    value = float(match.group(1).replace(",", "."))
+    unite = (match.group(2) or "kg").lower()
+    poids_kg = round(value * _UNITES.get(unite, 1.0), 3)
+    return poids_kg if poids_kg < POIDS_KG_MAX else None
@@ -0,0 +1,36 @@
+from typing import Iterable
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+# Reste sous la limite de paramètres liés de SQLite (32766) et de PostgreSQL
+IN_CHUNK_SIZE = 10000
+
+
+def existing_ids(db: Session, model, ids: Iterable[int]) -> set[int]:
+    """
+    Retourne le sous-ensemble des IDs présents en base, en une requête IN par lot
+    """
+    wanted = sorted({id_ for id_ in ids if id_ is not None})
+    found = set()
+    for start in range(0, len(wanted), IN_CHUNK_SIZE):
+        chunk = wanted[start:start + IN_CHUNK_SIZE]
+        found.update(db.scalars(select(model.id).where(model.id.in_(chunk))))
+    return found
+
+
+def rows_by_id(db: Session, model, ids: Iterable[int], *columns, for_update: bool = False) -> dict:
+    """
+    Charge les colonnes demandées pour une liste d'IDs, indexées par ID ;
+    for_update verrouille les lignes (SELECT ... FOR UPDATE) jusqu'à la fin de
+    la transaction, dans l'ordre des IDs pour éviter les interblocages
+    """
+    wanted = sorted({id_ for id_ in ids if id_ is not None})
+    rows = {}
+    for start in range(0, len(wanted), IN_CHUNK_SIZE):
+        chunk = wanted[start:start + IN_CHUNK_SIZE]
+        statement = select(model.id, *columns).where(model.id.in_(chunk))
+        if for_update:
+            statement = statement.order_by(model.id).with_for_update()
+        for row in db.execute(statement):
+            rows[row.id] = row
+    return rows
@@ -0,0 +1,95 @@
+"""
+Recherche texte sur description et ville_destination des colis
+
+- PostgreSQL : extension pg_trgm, index GIN trigrammes sur
+  description || ' ' || ville_destination ; correspondance ILIKE '%q%',
+  classement par word_similarity
+- SQLite (exécution locale) : table FTS5 à contenu externe colis_fts tenue à
+  jour par triggers ; correspondance MATCH par préfixe de mots, classement bm25
+
+Dans les deux cas le score est « plus petit = plus pertinent », ce qui permet
+la pagination par curseur (score, id).
+"""
+import re
+from typing import Optional
+
+from sqlalchemy import Double, cast, column, func, literal_column, table
+
+# Expression indexée sur PostgreSQL : doit rester identique à celle de l'index
+SEARCH_EXPRESSION = "description || ' ' || ville_destination"
+
+colis_fts = table("colis_fts", column("rowid"))
+
+POSTGRESQL_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"CREATE INDEX {{concurrently}}IF NOT EXISTS ix_colis_recherche_trgm ON colis "
+    f"USING gin (({SEARCH_EXPRESSION}) gin_trgm_ops)",
+)
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS colis_fts USING fts5("
+    "description, ville_destination, content='colis', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS colis_fts_ai AFTER INSERT ON colis BEGIN "
+    "INSERT INTO colis_fts(rowid, description, ville_destination) "
+    "VALUES (new.id, new.description, new.ville_destination); END",
+    "CREATE TRIGGER IF NOT EXISTS colis_fts_ad AFTER DELETE ON colis BEGIN "
+    "INSERT INTO colis_fts(colis_fts, rowid, description, ville_destination) "
+    "VALUES ('delete', old.id, old.description, old.ville_destination); END",
+    "CREATE TRIGGER IF NOT EXISTS colis_fts_au AFTER UPDATE OF description, ville_destination ON colis BEGIN "
+    "INSERT INTO colis_fts(colis_fts, rowid, description, ville_destination) "
+    "VALUES ('delete', old.id, old.description, old.ville_destination); "
+    "INSERT INTO colis_fts(rowid, description, ville_destination) "
+    "VALUES (new.id, new.description, new.ville_destination); END",
+)
+
+# Indexation des lignes déjà présentes (migration)
+SQLITE_REBUILD = "INSERT INTO colis_fts(colis_fts) VALUES ('rebuild')"
+
+SQLITE_DROP = (
+    "DROP TRIGGER IF EXISTS colis_fts_au",
+    "DROP TRIGGER IF EXISTS colis_fts_ad",
+    "DROP TRIGGER IF EXISTS colis_fts_ai",
+    "DROP TABLE IF EXISTS colis_fts",
+)
+
+POSTGRESQL_DROP = ("DROP INDEX IF EXISTS ix_colis_recherche_trgm",)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def fts5_query(q: str) -> Optional[str]:
+    """
+    Requête FTS5 : chaque mot saisi doit apparaître, en préfixe ("lyo" trouve
+    Lyon) ; un mot découpé par le tokenizer ("n°4242") devient une phrase
+    ("n 4242"*) ; None si q ne contient aucun mot
+    """
+    phrases = []
+    for chunk in q.split():
+        tokens = re.findall(r"\w+", chunk)
+        if tokens:
+            phrases.append(f'"{" ".join(tokens)}"*')
+    return " ".join(phrases) or None
+
+
+def apply_text_search(query, dialect: str, q: str, model):
+    """
+    Ajoute la correspondance texte à query (Query ou Select sur model) ;
+    retourne (query, score) ou (None, None) si q ne peut correspondre à rien
+    """
+    if dialect == "postgresql":
+        document = literal_column(f"({SEARCH_EXPRESSION})")
+        query = query.filter(document.ilike(f"%{_escape_like(q)}%", escape="\\"))
+        # word_similarity est un real (float4) : sa valeur lue puis renvoyée dans
+        # le curseur ne serait plus égale au score en base. En double précision,
+        # le score fait l'aller-retour exact par le curseur JSON
+        return query, -cast(func.word_similarity(q, document), Double)
+
+    match = fts5_query(q)
+    if match is None:
+        return None, None
+    document = literal_column("colis_fts")
+    query = query.join(colis_fts, colis_fts.c.rowid == model.id).filter(document.op("MATCH")(match))
+    return query, func.bm25(document)
@@ -0,0 +1 @@
+# Benchmarks de performance (à lancer depuis la racine : python -m benchmarks.<script>)
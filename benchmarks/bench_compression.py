@@ -0,0 +1,88 @@
+"""
+Coût CPU de la compression des réponses contre octets économisés, sur des
+pages typiques de GET /colis/ (100 et 1000 colis) et sur l'export NDJSON.
+Le temps de transfert est estimé pour un lien mobile (--mbps).
+
+    python -m benchmarks.bench_compression --rows 20000
+    python -m benchmarks.bench_compression --mbps 2 --levels 1,6,9
+"""
+import argparse
+
+# En premier : positionne TESTING avant le chargement de la configuration de l'application
+from benchmarks.common import DEFAULT_URL, make_engine, make_session, reset_schema, seed, measure
+
+from fastapi.testclient import TestClient
+
+from app.core.compression import available_encodings, make_compressor
+from app.core.database import get_db
+from app.main import app
+
+
+def compress(encoding: str, level: int, payload: bytes, chunk_size: int = 64 * 1024) -> bytes:
+    """
+    Compression par morceaux, comme le middleware sur une réponse en flux
+    """
+    compressor = make_compressor(encoding, gzip_level=level, brotli_quality=level)
+    parts = [compressor.compress(payload[i:i + chunk_size]) for i in range(0, len(payload), chunk_size)]
+    parts.append(compressor.finish())
+    return b"".join(parts)
+
+
+def report(name: str, payload: bytes, levels: dict, mbps: float, repeat: int):
+    raw_ms = len(payload) * 8 / (mbps * 1e6) * 1000
+    print(f"\n{name} : {len(payload) / 1024:.0f} Ko, transfert brut {raw_ms:.0f} ms à {mbps} Mbit/s")
+    print(f"  {'encodage':<10} {'niveau':>6} {'taille':>10} {'ratio':>7} {'CPU p50':>10} {'Mo/s':>7} {'gain net':>10}")
+    for encoding, encoding_levels in levels.items():
+        for level in encoding_levels:
+            size = len(compress(encoding, level, payload))
+            timing = measure(lambda: compress(encoding, level, payload), repeat=repeat, warmup=1)
+            cpu_ms = timing["p50_ms"]
+            # Gain net : temps de transfert économisé moins le temps de compression
+            saved_ms = (len(payload) - size) * 8 / (mbps * 1e6) * 1000 - cpu_ms
+            print(f"  {encoding:<10} {level:>6} {size / 1024:>8.0f} Ko {len(payload) / size:>6.1f}x "
+                  f"{cpu_ms:>7.2f} ms {len(payload) / 1e6 / (cpu_ms / 1000):>7.0f} {saved_ms:>7.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DEFAULT_URL, help="URL SQLAlchemy de la base de benchmark (elle est recréée)")
+    parser.add_argument("--rows", type=int, default=20_000, help="Colis exportés (pages /colis/ prises dedans)")
+    parser.add_argument("--mbps", type=float, default=5.0, help="Débit du lien client en Mbit/s")
+    parser.add_argument("--levels", default="1,4,6,9", help="Niveaux gzip / qualités brotli mesurés")
+    parser.add_argument("--repeat", type=int, default=10, help="Mesures par combinaison")
+    args = parser.parse_args()
+
+    engine = make_engine(args.url)
+    print(f"Préparation de {args.rows} colis sur {engine.dialect.name}...")
+    reset_schema(engine)
+    seed(engine, args.rows)
+
+    def override_get_db():
+        session = make_session(engine)
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    identity = {"Accept-Encoding": "identity"}
+    try:
+        with TestClient(app) as client:
+            payloads = {
+                "GET /colis/?limit=100": client.get("/colis/?limit=100", headers=identity).content,
+                "GET /colis/?limit=1000": client.get("/colis/?limit=1000", headers=identity).content,
+                "GET /colis/export": client.get("/colis/export", headers=identity).content,
+            }
+    finally:
+        app.dependency_overrides.clear()
+
+    chosen = [int(level) for level in args.levels.split(",")]
+    levels = {encoding: chosen for encoding in available_encodings()}
+    if "br" not in levels:
+        print("\nbrotli non installé : gzip seul (pip install brotli)")
+    for name, payload in payloads.items():
+        report(name, payload, levels, args.mbps, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
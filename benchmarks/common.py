@@ -0,0 +1,160 @@
+"""
+Outils communs aux benchmarks : base de données, jeu de données, mesures
+"""
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("TESTING", "1")
+
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+# Import all models to ensure they're registered with Base
+from app.models import client_expediteur, destinataire, livreur, colis, zone, historique_statut, charge_livreur, cle_idempotence
+from app.models.colis import Colis, StatutColis
+from app.controllers.workload_controller import rebuild_workload
+
+DEFAULT_URL = "sqlite:///./benchmarks/bench.db"
+
+# Répartition réaliste : la majorité des colis sont déjà livrés
+STATUT_WEIGHTS = {
+    StatutColis.LIVRE: 70,
+    StatutColis.EN_TRANSIT: 12,
+    StatutColis.CREE: 10,
+    StatutColis.COLLECTE: 5,
+    StatutColis.EN_STOCK: 3,
+}
+VILLES = ["Casablanca", "Rabat", "Marrakech", "Fès", "Tanger", "Agadir", "Oujda", "Kénitra"]
+ARTICLES = ["Ordinateur", "Téléphone", "Livres", "Vaisselle", "Vêtements", "Chaussures", "Jouets",
+            "Documents", "Pièces auto", "Cosmétiques", "Épices", "Tapis", "Lampe", "Montre", "Câbles"]
+QUALIFICATIFS = ["fragile", "urgent", "volumineux", "léger", "réfrigéré", "standard", "assuré", "lourd"]
+INSERT_CHUNK = 10000
+
+
+def make_engine(url: str = DEFAULT_URL, **options):
+    engine = create_engine(url, **options)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _sqlite_pragmas(dbapi_connection, _):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+    return engine
+
+
+def make_session(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def reset_schema(engine):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def drop_colis_indexes(engine):
+    for index in Colis.__table__.indexes:
+        index.drop(bind=engine, checkfirst=True)
+
+
+def create_colis_indexes(engine):
+    for index in Colis.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE"))
+
+
+def seed(engine, n_colis: int, n_livreurs: int = 500, n_zones: int = 50, seed_value: int = 42):
+    """
+    Remplit la base : un client, un destinataire, des zones, des livreurs
+    et n_colis colis répartis selon STATUT_WEIGHTS
+    """
+    rng = random.Random(seed_value)
+    tables = Base.metadata.tables
+    with engine.begin() as connection:
+        connection.execute(insert(tables["client_expediteur"]), [{
+            "nom": "Bench", "prenom": "Client", "email": "bench.client@example.com",
+            "telephone": "0600000000", "adresse": "1 rue du Bench"
+        }])
+        connection.execute(insert(tables["destinataires"]), [{
+            "nom": "Bench", "prenom": "Destinataire", "email": "bench.dest@example.com",
+            "telephone": "0600000001", "adresse": "2 rue du Bench"
+        }])
+        connection.execute(insert(tables["zones"]), [
+            {"nom": f"Zone {i}", "description": None} for i in range(1, n_zones + 1)
+        ])
+        connection.execute(insert(tables["livreurs"]), [{
+            "nom": f"Livreur{i}", "prenom": "Bench", "telephone": f"07{i:08d}",
+            "vehicule": rng.choice(["Moto", "Camionnette", "Vélo"]),
+            "zone_assignee": f"Zone {rng.randint(1, n_zones)}"
+        } for i in range(1, n_livreurs + 1)])
+
+    statuts = list(STATUT_WEIGHTS)
+    weights = list(STATUT_WEIGHTS.values())
+    for start in range(0, n_colis, INSERT_CHUNK):
+        rows = []
+        for i in range(start, min(start + INSERT_CHUNK, n_colis)):
+            statut = rng.choices(statuts, weights)[0]
+            assigned = statut not in (StatutColis.CREE, StatutColis.EN_STOCK)
+            poids = round(rng.uniform(0.1, 30), 1)
+            rows.append({
+                "description": f"{rng.choice(ARTICLES)} {rng.choice(QUALIFICATIFS)} n°{i}",
+                "poids": f"{poids}kg",
+                "poids_kg": poids,
+                "statut": statut,
+                "id_livreur": rng.randint(1, n_livreurs) if assigned else None,
+                "id_client_expediteur": 1,
+                "id_destinataire": 1,
+                "id_zone": rng.randint(1, n_zones),
+                "ville_destination": rng.choice(VILLES),
+            })
+        with engine.begin() as connection:
+            connection.execute(insert(Colis.__table__), rows)
+    refresh_workload(engine)
+
+
+def refresh_workload(engine):
+    """
+    Recalcule la charge des livreurs après une écriture directe dans colis
+    """
+    session = make_session(engine)
+    try:
+        rebuild_workload(session)
+        session.commit()
+    finally:
+        session.close()
+
+
+def measure(fn, repeat: int = 20, warmup: int = 2) -> dict:
+    """
+    Exécute fn() et retourne les latences en millisecondes (p50, p95, moyenne)
+    """
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def explain(engine, statement) -> str:
+    """
+    Plan d'exécution d'une requête (EXPLAIN QUERY PLAN sur SQLite, EXPLAIN ANALYZE sur PostgreSQL)
+    """
+    compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN (ANALYZE, BUFFERS) "
+    with engine.connect() as connection:
+        rows = connection.execute(text(prefix + str(compiled))).fetchall()
+    if engine.dialect.name == "sqlite":
+        return "\n".join(f"  {row[-1]}" for row in rows)
+    return "\n".join(f"  {row[0]}" for row in rows)
@@ -13,6 +13,10 @@ from fastapi.testclient import TestClient
 
 from app.core.database import Base, get_db
 from app.main import app
+from app.models.client_expediteur import ClientExpediteur
+from app.models.destinataire import Destinataire
+from app.models.livreur import Livreur
+from app.utils.cache import clear_all_caches
 
 
 # Configuration de la base de données de test en mémoire
@@ -57,6 +61,8 @@ def client(test_db):
             pass
     
     app.dependency_overrides[get_db] = override_get_db
+    # Les caches en mémoire survivent d'un test à l'autre : chaque test repart à vide
+    clear_all_caches()
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -120,3 +126,58 @@ def sample_zone_data():
         "nom": "Zone Nord",
         "description": "Zone de livraison Nord de Paris"
     }
+
+
+class ColisFactory:
+    """
+    Création des colis de test : l'expéditeur et le destinataire sont
+    enregistrés en base au premier appel et sample_colis_data les référence
+    ensuite ; les colis sont créés par POST /colis/.
+    Par défaut sur les fixtures client et test_db, ou sur un client et une
+    session fournis (base partagée des tests de charge).
+    """
+
+    def __init__(self, request, colis_data, client_data, destinataire_data, livreur_data):
+        self._request = request
+        self.colis_data = colis_data
+        self._client_data = client_data
+        self._destinataire_data = destinataire_data
+        self._livreur_data = livreur_data
+        self._seeded = False
+
+    def seed(self, db: Session = None, nb_livreurs: int = 0) -> list[Livreur]:
+        """
+        Enregistre l'expéditeur et le destinataire (une seule fois) et
+        nb_livreurs livreurs, retournés
+        """
+        db = db if db is not None else self._request.getfixturevalue("test_db")
+        livreurs = [Livreur(**self._livreur_data) for _ in range(nb_livreurs)]
+        if not self._seeded:
+            db_client = ClientExpediteur(**self._client_data)
+            db_dest = Destinataire(**self._destinataire_data)
+            db.add_all([db_client, db_dest])
+            db.flush()
+            self.colis_data["id_client_expediteur"] = db_client.id
+            self.colis_data["id_destinataire"] = db_dest.id
+            self._seeded = True
+        db.add_all(livreurs)
+        db.commit()
+        return livreurs
+
+    def __call__(self, client: TestClient = None, **overrides) -> dict:
+        """
+        Crée un colis (sample_colis_data complété par overrides) et retourne sa
+        représentation JSON
+        """
+        if not self._seeded:
+            self.seed()
+        client = client if client is not None else self._request.getfixturevalue("client")
+        response = client.post("/colis/", json={**self.colis_data, **overrides})
+        assert response.status_code == 201, response.text
+        return response.json()
+
+
+@pytest.fixture
+def colis_factory(request, sample_colis_data, sample_client_data, sample_destinataire_data, sample_livreur_data):
+    """Fabrique de colis de test (voir ColisFactory)"""
+    return ColisFactory(request, sample_colis_data, sample_client_data, sample_destinataire_data, sample_livreur_data)
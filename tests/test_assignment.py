@@ -1,12 +1,17 @@
 """
 Tests unitaires pour le module Assignment (Assignation des colis aux livreurs)
 """
+import logging
+
 import pytest
 from fastapi import status
+from app.controllers import assignment_controller
+from app.controllers.colis_controller import ConcurrentModificationError
 from app.models.client_expediteur import ClientExpediteur
 from app.models.destinataire import Destinataire
 from app.models.livreur import Livreur
 from app.models.zone import Zone
+from app.utils.dispatch import plan_assignments, OPTIMAL, GREEDY
 
 
 class TestAssignmentAPI:
@@ -279,3 +284,149 @@ class TestAssignmentAPI:
         assert len(data) == 2
         for colis in data:
             assert colis["id_livreur"] is None
+
+    def test_assign_colis_batch(self, client, test_db, sample_colis_data,
+                                sample_client_data, sample_destinataire_data,
+                                sample_livreur_data, sample_zone_data):
+        """Test d'assignation groupée avec résultats par élément"""
+        db_client = ClientExpediteur(**sample_client_data)
+        test_db.add(db_client)
+        test_db.commit()
+        
+        db_dest = Destinataire(**sample_destinataire_data)
+        test_db.add(db_dest)
+        test_db.commit()
+        
+        db_livreur = Livreur(**sample_livreur_data)
+        test_db.add(db_livreur)
+        test_db.commit()
+        
+        db_zone = Zone(**sample_zone_data)
+        test_db.add(db_zone)
+        test_db.commit()
+        
+        colis_ids = []
+        for statut in ["créé", "livré"]:
+            colis_data = sample_colis_data.copy()
+            colis_data["id_client_expediteur"] = db_client.id
+            colis_data["id_destinataire"] = db_dest.id
+            colis_data["statut"] = statut
+            colis_ids.append(client.post("/colis/", json=colis_data).json()["id"])
+        
+        batch = [
+            {"colis_id": colis_ids[0], "livreur_id": db_livreur.id, "zone_id": db_zone.id},
+            {"colis_id": colis_ids[1], "livreur_id": 9999},
+            {"colis_id": 9999, "livreur_id": db_livreur.id},
+            {"colis_id": colis_ids[0], "livreur_id": db_livreur.id},
+            {"colis_id": colis_ids[1], "livreur_id": db_livreur.id},
+        ]
+        response = client.post("/assignments/batch", json=batch)
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["assigned"] == 2
+        assert [r["success"] for r in data["results"]] == [True, False, False, False, True]
+        assert data["results"][1]["message"] == "Livreur not found"
+        assert data["results"][2]["message"] == "Colis not found"
+        assert data["results"][3]["message"] == "Duplicate colis in batch"
+        
+        first = client.get(f"/colis/{colis_ids[0]}").json()
+        assert first["id_livreur"] == db_livreur.id
+        assert first["id_zone"] == db_zone.id
+        assert first["statut"] == "en transit"
+        
+        second = client.get(f"/colis/{colis_ids[1]}").json()
+        assert second["id_livreur"] == db_livreur.id
+        assert second["statut"] == "livré"
+    
+    def test_auto_assignment(self, client, test_db, sample_colis_data,
+                             sample_client_data, sample_destinataire_data):
+        """Test de l'assignation automatique selon la zone et la charge"""
+        db_client = ClientExpediteur(**sample_client_data)
+        db_dest = Destinataire(**sample_destinataire_data)
+        nord = Zone(nom="Zone Nord")
+        sud = Zone(nom="Zone Sud")
+        test_db.add_all([db_client, db_dest, nord, sud])
+        test_db.commit()
+        
+        livreur_nord = Livreur(nom="A", prenom="A", telephone="1", zone_assignee="Zone Nord")
+        livreur_sud = Livreur(nom="B", prenom="B", telephone="2", zone_assignee="Zone Sud")
+        test_db.add_all([livreur_nord, livreur_sud])
+        test_db.commit()
+        
+        zones = [nord.id, nord.id, sud.id, None]
+        for zone_id in zones:
+            colis_data = sample_colis_data.copy()
+            colis_data["id_client_expediteur"] = db_client.id
+            colis_data["id_destinataire"] = db_dest.id
+            colis_data["id_zone"] = zone_id
+            client.post("/colis/", json=colis_data)
+        
+        response = client.post("/assignments/auto")
+        
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["method"] == "optimal"
+        assert data["assigned"] == 4
+        assert data["unassigned"] == 0
+        by_zone = {}
+        for result in data["results"]:
+            by_zone.setdefault(result["zone_id"], []).append(result["livreur_id"])
+        assert by_zone[nord.id] == [livreur_nord.id, livreur_nord.id]
+        assert by_zone[sud.id] == [livreur_sud.id]
+        # Colis sans zone : livreur le moins chargé
+        assert by_zone[None] == [livreur_sud.id]
+        assert client.get("/assignments/unassigned").json() == []
+        
+        # Capacité atteinte : les colis restent non assignés
+        colis_data = sample_colis_data.copy()
+        colis_data["id_client_expediteur"] = db_client.id
+        colis_data["id_destinataire"] = db_dest.id
+        client.post("/colis/", json=colis_data)
+        response = client.post("/assignments/auto", params={"max_load": 2})
+        assert response.json()["assigned"] == 0
+        assert response.json()["unassigned"] == 1
+
+    def test_auto_assignment_conflict(self, client, colis_factory, monkeypatch, caplog):
+        """Test d'un conflit de version pendant l'assignation automatique : 409, journalisé sans erreur"""
+        colis_factory.seed(nb_livreurs=1)
+        colis_factory()
+
+        def conflict(db, assignments):
+            raise ConcurrentModificationError("colis modifié")
+
+        monkeypatch.setattr(assignment_controller, "assign_colis_batch", conflict)
+        caplog.set_level(logging.WARNING, logger=assignment_controller.logger.name)
+        response = client.post("/assignments/auto")
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        records = [record for record in caplog.records if record.name == assignment_controller.logger.name]
+        assert [record.levelno for record in records] == [logging.WARNING]
+        assert records[0].exc_info is None
+
+
+class TestDispatch:
+    """Tests du calcul des assignations automatiques"""
+    
+    def test_optimal_et_glouton(self):
+        """Test que les deux méthodes préfèrent la zone et équilibrent la charge"""
+        colis = [(i, 1 if i % 2 else 2) for i in range(1, 9)]
+        livreurs = [(10, 1), (11, 1), (20, 2)]
+        loads = {10: 3}
+        
+        for optimal_max, expected in ((100, OPTIMAL), (0, GREEDY)):
+            plan, method = plan_assignments(colis, livreurs, loads, zone_penalty=20, max_load=50,
+                                            optimal_max=optimal_max)
+            assert method == expected
+            counts = {}
+            for colis_id, livreur_id in plan:
+                assert dict(livreurs)[livreur_id] == dict(colis)[colis_id]
+                counts[livreur_id] = counts.get(livreur_id, 0) + 1
+            assert counts == {10: 1, 11: 3, 20: 4}
+    
+    def test_hors_zone_si_surcharge(self):
+        """Test qu'un livreur hors zone est choisi quand l'écart de charge dépasse la pénalité"""
+        for optimal_max in (100, 0):
+            plan, _ = plan_assignments([(1, 1)], [(10, 1), (20, 2)], {10: 30, 20: 0},
+                                       zone_penalty=20, max_load=50, optimal_max=optimal_max)
+            assert plan == [(1, 20)]
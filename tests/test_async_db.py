@@ -0,0 +1,80 @@
+"""
+Tests de la pile base de données asynchrone (AsyncSession + aiosqlite)
+"""
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.database import Base, get_db
+from app.main import app
+
+pytest.importorskip("aiosqlite")
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    """Client de test dont les routes reçoivent une AsyncSession"""
+    db_path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+
+    # NullPool : chaque requête ouvre sa connexion dans la boucle qui la traite
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    AsyncTestingSession = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_db():
+        async with AsyncTestingSession() as db:
+            assert isinstance(db, AsyncSession)
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
+
+
+class TestAsyncDatabase:
+    """Tests des routes exécutées sur une AsyncSession"""
+
+    def test_crud_colis_async(self, async_client, sample_client_data, sample_destinataire_data,
+                              sample_livreur_data, sample_colis_data):
+        """Test du cycle création / lecture / assignation en mode asynchrone"""
+        client_id = async_client.post("/clients/", json=sample_client_data).json()["id"]
+        dest_id = async_client.post("/destinataires/", json=sample_destinataire_data).json()["id"]
+        livreur_id = async_client.post("/livreurs/", json=sample_livreur_data).json()["id"]
+
+        sample_colis_data["id_client_expediteur"] = client_id
+        sample_colis_data["id_destinataire"] = dest_id
+        response = async_client.post("/colis/", json=sample_colis_data)
+        assert response.status_code == status.HTTP_201_CREATED
+        colis_id = response.json()["id"]
+
+        response = async_client.post("/assignments/", json={"colis_id": colis_id, "livreur_id": livreur_id})
+        assert response.status_code == status.HTTP_201_CREATED
+
+        data = async_client.get(f"/colis/{colis_id}").json()
+        assert data["id_livreur"] == livreur_id
+        assert data["statut"] == "en transit"
+
+        page = async_client.get("/colis/").json()
+        assert [colis["id"] for colis in page["items"]] == [colis_id]
+
+    def test_export_colis_async(self, async_client, sample_client_data, sample_destinataire_data,
+                                sample_colis_data):
+        """Test de l'export en flux avec un curseur asynchrone"""
+        client_id = async_client.post("/clients/", json=sample_client_data).json()["id"]
+        dest_id = async_client.post("/destinataires/", json=sample_destinataire_data).json()["id"]
+        sample_colis_data["id_client_expediteur"] = client_id
+        sample_colis_data["id_destinataire"] = dest_id
+        async_client.post("/colis/bulk", json=[sample_colis_data] * 3)
+
+        response = async_client.get("/colis/export", params={"format": "csv"})
+
+        assert response.status_code == status.HTTP_200_OK
+        lines = response.text.splitlines()
+        assert lines[0].startswith("id,description")
+        assert len(lines) == 4
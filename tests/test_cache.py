@@ -0,0 +1,154 @@
+"""
+Tests unitaires pour le cache en mémoire (TTL + LRU)
+"""
+import asyncio
+import threading
+import time
+
+from fastapi import status
+from sqlalchemy import event
+from sqlalchemy.util import await_only, greenlet_spawn
+
+from app.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache:
+    """Tests du cache TTL + LRU"""
+
+    def test_expiration(self):
+        """Test de l'expiration d'une entrée après son TTL"""
+        clock = FakeClock()
+        cache = TTLCache("test_expiration", maxsize=10, ttl=5, clock=clock)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        clock.now = 6
+        assert cache.get("a") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction(self):
+        """Test de l'éviction de l'entrée la moins récemment utilisée"""
+        cache = TTLCache("test_lru", maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_stale_load_not_cached_after_invalidation(self):
+        """Test qu'une valeur chargée avant une invalidation n'est pas mise en cache"""
+        cache = TTLCache("test_generation", maxsize=10, ttl=60)
+
+        def loader():
+            cache.invalidate()
+            return "ancienne valeur"
+
+        assert cache.get_or_load("k", loader) == "ancienne valeur"
+        assert cache.get("k") is None
+
+
+    def test_single_flight(self):
+        """Test que les lectures simultanées d'une clé absente partagent un seul chargement"""
+        cache = TTLCache("test_single_flight", maxsize=10, ttl=60)
+        calls = []
+        started = threading.Event()
+
+        def loader():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return "valeur"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("a", loader)))
+                   for _ in range(10)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["valeur"] * 10
+        assert cache.stats()["coalesced"] == 9
+
+    def test_single_flight_event_loop(self):
+        """Test du single-flight sur la boucle d'événements (contrôleurs exécutés par run_sync)"""
+        cache = TTLCache("test_single_flight_async", maxsize=10, ttl=60)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            # Requête asynchrone simulée : la boucle reprend la main pendant le chargement
+            await_only(asyncio.sleep(0.05))
+            return "valeur"
+
+        async def scenario():
+            return await asyncio.gather(*(greenlet_spawn(cache.get_or_load, "a", loader) for _ in range(10)))
+
+        results = asyncio.run(scenario())
+        assert len(calls) == 1
+        assert results == ["valeur"] * 10
+        assert cache.stats()["coalesced"] == 9
+
+
+class TestReferenceDataCache:
+    """Tests du cache des zones et des livreurs"""
+
+    def test_zones_served_from_cache(self, client, test_engine, sample_zone_data):
+        """Test que les lectures répétées des zones n'interrogent pas la base"""
+        client.post("/zones/", json=sample_zone_data)
+        statements = []
+        event.listen(test_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        for _ in range(3):
+            response = client.get("/zones/")
+            assert response.status_code == status.HTTP_200_OK
+            assert len(response.json()) == 1
+
+        assert len(statements) == 1
+
+    def test_zone_creation_invalidates_cache(self, client, sample_zone_data):
+        """Test que la création d'une zone invalide le cache"""
+        client.post("/zones/", json=sample_zone_data)
+        assert len(client.get("/zones/").json()) == 1
+
+        client.post("/zones/", json={"nom": "Zone Sud"})
+
+        assert len(client.get("/zones/").json()) == 2
+
+    def test_livreur_update_and_delete_invalidate_cache(self, client, sample_livreur_data):
+        """Test que la modification et la suppression d'un livreur invalident le cache"""
+        livreur_id = client.post("/livreurs/", json=sample_livreur_data).json()["id"]
+        assert client.get(f"/livreurs/{livreur_id}").json()["nom"] == sample_livreur_data["nom"]
+
+        client.put(f"/livreurs/{livreur_id}", json={"nom": "Nouveau Nom"})
+        assert client.get(f"/livreurs/{livreur_id}").json()["nom"] == "Nouveau Nom"
+
+        client.delete(f"/livreurs/{livreur_id}")
+        assert client.get(f"/livreurs/{livreur_id}").status_code == status.HTTP_404_NOT_FOUND
+        assert client.get("/livreurs/").json() == []
+
+    def test_cache_metrics_route(self, client):
+        """Test de l'exposition des compteurs des caches"""
+        client.get("/zones/")
+        client.get("/zones/")
+
+        data = client.get("/metrics/cache").json()
+
+        assert data["zones"]["hits"] >= 1
+        assert data["zones"]["misses"] >= 1
+        assert "livreurs" in data
@@ -1,8 +1,14 @@
 import pytest
 from fastapi import status
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql
 from app.models.client_expediteur import ClientExpediteur
 from app.models.destinataire import Destinataire
 from app.models.colis import Colis, StatutColis
+from app.models.livreur import Livreur
+from app.core.config import settings
+from app.utils.poids import parse_poids
+from app.utils.text_search import apply_text_search, fts5_query
 
 
 class TestColisAPI:
@@ -39,7 +45,7 @@ class TestColisAPI:
         response = client.get("/colis/")
         
         assert response.status_code == status.HTTP_200_OK
-        assert response.json() == []
+        assert response.json() == {"items": [], "next_cursor": None}
     
     def test_get_all_colis_with_data(self, client, test_db, sample_colis_data,
                                      sample_client_data, sample_destinataire_data):
@@ -64,7 +70,8 @@ class TestColisAPI:
         
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
-        assert len(data) == 3
+        assert len(data["items"]) == 3
+        assert data["next_cursor"] is None
     
     def test_get_colis_by_id_success(self, client, test_db, sample_colis_data,
                                      sample_client_data, sample_destinataire_data):
@@ -192,7 +199,384 @@ class TestColisAPI:
         response = client.get("/colis/search?statut=en transit")
         
         assert response.status_code == status.HTTP_200_OK
-        data = response.json()
+        data = response.json()["items"]
         assert len(data) == 1
         assert data[0]["statut"] == "en transit"
 
+    def test_get_all_colis_pagination(self, client, test_db, sample_colis_data,
+                                      sample_client_data, sample_destinataire_data):
+        """Test du parcours complet des colis page par page avec le curseur"""
+        db_client = ClientExpediteur(**sample_client_data)
+        test_db.add(db_client)
+        test_db.commit()
+        
+        db_dest = Destinataire(**sample_destinataire_data)
+        test_db.add(db_dest)
+        test_db.commit()
+        
+        for i in range(5):
+            colis_data = sample_colis_data.copy()
+            colis_data["description"] = f"Colis {i}"
+            colis_data["id_client_expediteur"] = db_client.id
+            colis_data["id_destinataire"] = db_dest.id
+            client.post("/colis/", json=colis_data)
+        
+        ids = []
+        pages = 0
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["after"] = cursor
+            response = client.get("/colis/", params=params)
+            assert response.status_code == status.HTTP_200_OK
+            data = response.json()
+            ids.extend(colis["id"] for colis in data["items"])
+            pages += 1
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        
+        assert pages == 3
+        assert ids == sorted(ids)
+        assert len(set(ids)) == 5
+
+    def test_search_colis_pagination(self, client, test_db, sample_colis_data,
+                                     sample_client_data, sample_destinataire_data):
+        """Test de la pagination combinée aux filtres de recherche"""
+        db_client = ClientExpediteur(**sample_client_data)
+        test_db.add(db_client)
+        test_db.commit()
+        
+        db_dest = Destinataire(**sample_destinataire_data)
+        test_db.add(db_dest)
+        test_db.commit()
+        
+        for statut in ["créé", "livré", "créé", "livré", "créé"]:
+            colis_data = sample_colis_data.copy()
+            colis_data["id_client_expediteur"] = db_client.id
+            colis_data["id_destinataire"] = db_dest.id
+            colis_data["statut"] = statut
+            client.post("/colis/", json=colis_data)
+        
+        first = client.get("/colis/search", params={"statut": "créé", "limit": 2}).json()
+        assert len(first["items"]) == 2
+        assert first["next_cursor"] is not None
+        
+        second = client.get("/colis/search",
+                            params={"statut": "créé", "limit": 2, "after": first["next_cursor"]}).json()
+        assert len(second["items"]) == 1
+        assert second["next_cursor"] is None
+        assert all(colis["statut"] == "créé" for colis in first["items"] + second["items"])
+
+    def test_pagination_invalid_cursor(self, client):
+        """Test d'un curseur de pagination invalide"""
+        response = client.get("/colis/", params={"after": "pas-un-curseur"})
+        
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_pagination_limit_capped(self, client):
+        """Test du plafond de taille de page"""
+        response = client.get("/colis/", params={"limit": 100000})
+        
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+    def test_export_colis_ndjson(self, client, test_db, sample_colis_data,
+                                 sample_client_data, sample_destinataire_data):
+        """Test de l'export NDJSON filtré par statut"""
+        import json
+        
+        db_client = ClientExpediteur(**sample_client_data)
+        test_db.add(db_client)
+        test_db.commit()
+        
+        db_dest = Destinataire(**sample_destinataire_data)
+        test_db.add(db_dest)
+        test_db.commit()
+        
+        for statut in ["créé", "livré", "créé"]:
+            colis_data = sample_colis_data.copy()
+            colis_data["id_client_expediteur"] = db_client.id
+            colis_data["id_destinataire"] = db_dest.id
+            colis_data["statut"] = statut
+            client.post("/colis/", json=colis_data)
+        
+        response = client.get("/colis/export", params={"statut": "créé"})
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 2
+        assert all(line["statut"] == "créé" for line in lines)
+        assert lines[0]["id"] < lines[1]["id"]
+
+    def test_export_colis_csv(self, client, test_db, sample_colis_data,
+                              sample_client_data, sample_destinataire_data):
+        """Test de l'export CSV avec ligne d'en-tête"""
+        import csv
+        import io
+        
+        db_client = ClientExpediteur(**sample_client_data)
+        test_db.add(db_client)
+        test_db.commit()
+        
+        db_dest = Destinataire(**sample_destinataire_data)
+        test_db.add(db_dest)
+        test_db.commit()
+        
+        sample_colis_data["id_client_expediteur"] = db_client.id
+        sample_colis_data["id_destinataire"] = db_dest.id
+        client.post("/colis/", json=sample_colis_data)
+        
+        response = client.get("/colis/export", params={"format": "csv"})
+        
+        assert response.status_code == status.HTTP_200_OK
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 1
+        assert rows[0]["description"] == sample_colis_data["description"]
+        assert rows[0]["statut"] == "créé"
+
+    def test_create_colis_bulk(self, client, test_db, sample_colis_data,
+                               sample_client_data, sample_destinataire_data):
+        """Test de création en masse avec une ligne rejetée"""
+        db_client = ClientExpediteur(**sample_client_data)
+        test_db.add(db_client)
+        test_db.commit()
+        
+        db_dest = Destinataire(**sample_destinataire_data)
+        test_db.add(db_dest)
+        test_db.commit()
+        
+        manifest = []
+        for i in range(4):
+            colis_data = sample_colis_data.copy()
+            colis_data["description"] = f"Colis {i}"
+            colis_data["id_client_expediteur"] = db_client.id
+            colis_data["id_destinataire"] = db_dest.id
+            manifest.append(colis_data)
+        manifest[2]["id_destinataire"] = 9999
+        
+        response = client.post("/colis/bulk", json=manifest)
+        
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()
+        assert data["created"] == 3
+        assert len(data["ids"]) == 3
+        assert data["errors"] == [{"index": 2, "detail": "Destinataire introuvable"}]
+        
+        created = client.get(f"/colis/{data['ids'][2]}").json()
+        assert created["description"] == "Colis 3"
+
+    def test_create_colis_bulk_invalid_row(self, client, sample_colis_data):
+        """Test d'un lot contenant une ligne mal formée"""
+        bad_row = sample_colis_data.copy()
+        del bad_row["description"]
+        
+        response = client.post("/colis/bulk", json=[sample_colis_data, bad_row])
+        
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_search_colis_by_poids(self, client, test_db, sample_colis_data,
+                                   sample_client_data, sample_destinataire_data):
+        """Test des filtres poids_min / poids_max sur le poids numérique"""
+        db_client = ClientExpediteur(**sample_client_data)
+        db_dest = Destinataire(**sample_destinataire_data)
+        test_db.add_all([db_client, db_dest])
+        test_db.commit()
+        
+        for poids in ["500 g", "2,5 kg", "5kg", "inconnu"]:
+            colis_data = sample_colis_data.copy()
+            colis_data["id_client_expediteur"] = db_client.id
+            colis_data["id_destinataire"] = db_dest.id
+            colis_data["poids"] = poids
+            client.post("/colis/", json=colis_data)
+        
+        response = client.get("/colis/search", params={"poids_min": 1, "poids_max": 5})
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert [c["poids_kg"] for c in response.json()["items"]] == [2.5, 5.0]
+        
+        items = client.get("/colis/search", params={"poids_max": 1}).json()["items"]
+        assert [c["poids"] for c in items] == ["500 g"]
+        
+        # Modification du poids texte : le poids numérique suit
+        colis_id = items[0]["id"]
+        assert client.put(f"/colis/{colis_id}", json={"poids": "1.2 t"}).json()["poids_kg"] == 1200.0
+
+    
+    def test_fast_json_responses(self, client, test_db, sample_colis_data, sample_livreur_data,
+                                 sample_client_data, sample_destinataire_data, monkeypatch):
+        """Test du chemin rapide (FAST_JSON_RESPONSES) : réponses identiques au chemin validé"""
+        db_client = ClientExpediteur(**sample_client_data)
+        db_dest = Destinataire(**sample_destinataire_data)
+        db_livreur = Livreur(**sample_livreur_data)
+        test_db.add_all([db_client, db_dest, db_livreur])
+        test_db.commit()
+        
+        for i, poids in enumerate(["500 g", "2,5 kg", "inconnu", "5kg", "1 t"]):
+            colis_data = {**sample_colis_data, "id_client_expediteur": db_client.id, "id_destinataire": db_dest.id,
+                          "poids": poids, "description": f"Colis fragile {i}", "priorite": i % 2}
+            colis_id = client.post("/colis/", json=colis_data).json()["id"]
+            if i % 2:
+                client.post("/assignments/", json={"colis_id": colis_id, "livreur_id": db_livreur.id})
+        
+        urls = [
+            "/colis/?limit=2",
+            "/colis/search?statut=en%20transit",
+            "/colis/search?q=fragile&limit=2",
+            "/assignments/assigned",
+            "/assignments/unassigned",
+            f"/livreurs/{db_livreur.id}/colis",
+        ]
+        expected = [client.get(url).json() for url in urls]
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+        for url, body in zip(urls, expected):
+            response = client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json() == body, url
+        
+        # Le curseur du chemin rapide mène à la même page suivante
+        fast_page = client.get("/colis/search", params={"q": "fragile", "limit": 2}).json()
+        second = client.get("/colis/search", params={"q": "fragile", "limit": 2, "after": fast_page["next_cursor"]})
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+        assert second.json() == client.get(
+            "/colis/search", params={"q": "fragile", "limit": 2, "after": expected[2]["next_cursor"]}
+        ).json()
+
+    
+    def test_sparse_fields(self, client, test_db, test_engine, sample_colis_data, sample_livreur_data,
+                           sample_client_data, sample_destinataire_data):
+        """Test du paramètre fields : seules les colonnes demandées sont lues et retournées"""
+        db_client = ClientExpediteur(**sample_client_data)
+        db_dest = Destinataire(**sample_destinataire_data)
+        db_livreur = Livreur(**sample_livreur_data)
+        test_db.add_all([db_client, db_dest, db_livreur])
+        test_db.commit()
+        colis_data = {**sample_colis_data, "id_client_expediteur": db_client.id, "id_destinataire": db_dest.id}
+        ids = [client.post("/colis/", json=colis_data).json()["id"] for _ in range(3)]
+        client.post("/assignments/", json={"colis_id": ids[0], "livreur_id": db_livreur.id})
+        
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(test_engine, "before_cursor_execute", listener)
+        try:
+            page = client.get("/colis/", params={"fields": "statut, poids_kg", "limit": 2}).json()
+        finally:
+            event.remove(test_engine, "before_cursor_execute", listener)
+        assert page["items"] == [
+            {"statut": "en transit", "id": ids[0], "poids_kg": 5.0},
+            {"statut": "créé", "id": ids[1], "poids_kg": 5.0},
+        ]
+        select_colis = [statement for statement in statements if "FROM colis" in statement]
+        assert "description" not in select_colis[0] and "colis.statut" in select_colis[0]
+        
+        # Pagination, recherche texte et assignations avec projection
+        page = client.get("/colis/", params={"fields": "statut", "limit": 2, "after": page["next_cursor"]}).json()
+        assert page == {"items": [{"statut": "créé", "id": ids[2]}], "next_cursor": None}
+        page = client.get("/colis/search", params={"q": "fragile", "fields": "id", "limit": 2}).json()
+        assert len(page["items"]) == 2 and page["next_cursor"] is not None
+        assert all(item.keys() == {"id"} for item in page["items"])
+        assert client.get("/assignments/assigned", params={"fields": "id_livreur"}).json() == [
+            {"id_livreur": db_livreur.id, "id": ids[0]}
+        ]
+        assert client.get("/assignments/unassigned", params={"fields": "id"}).json() == [{"id": i} for i in ids[1:]]
+        
+        for url in ("/colis/", "/colis/search", "/assignments/assigned", "/assignments/unassigned"):
+            response = client.get(url, params={"fields": "id,mot_de_passe"})
+            assert response.status_code == status.HTTP_400_BAD_REQUEST, url
+
+
+class TestParsePoids:
+    """Tests de l'analyse des poids saisis en texte"""
+
+    @pytest.mark.parametrize("poids, expected", [
+        ("5kg", 5.0),
+        ("5", 5.0),
+        ("2,5 kg", 2.5),
+        ("750g", 0.75),
+        ("1.5 tonnes", 1500.0),
+        ("  12 KG ", 12.0),
+        ("lourd", None),
+        ("", None),
+        ("9999999.999 kg", 9999999.999),
+        ("10000000", None),
+        ("10000 t", None),
+    ])
+    def test_parse_poids(self, poids, expected):
+        assert parse_poids(poids) == expected
+
+
+class TestColisTextSearch:
+    """Tests de la recherche texte (paramètre q de /colis/search)"""
+
+    def test_search_text(self, client, colis_factory):
+        """Test de la recherche par mots, préfixes et accents, classée par pertinence"""
+        ids = [colis_factory(description=description, ville_destination=ville)["id"] for description, ville in [
+            ("Ordinateur portable", "Marrakech"),
+            ("Vaisselle fragile", "Fès"),
+            ("Livres", "Rabat"),
+            ("Vase fragile fragile", "Tanger"),
+        ]]
+
+        items = client.get("/colis/search", params={"q": "fragile"}).json()["items"]
+        assert sorted(c["id"] for c in items) == [ids[1], ids[3]]
+        assert items[0]["id"] == ids[3]
+
+        assert [c["id"] for c in client.get("/colis/search", params={"q": "marra"}).json()["items"]] == [ids[0]]
+        assert [c["id"] for c in client.get("/colis/search", params={"q": "fes"}).json()["items"]] == [ids[1]]
+        assert client.get("/colis/search", params={"q": "fragile rabat"}).json()["items"] == []
+
+        # L'index suit les modifications et suppressions
+        client.put(f"/colis/{ids[2]}", json={"description": "Livres fragiles"})
+        client.delete(f"/colis/{ids[3]}")
+        items = client.get("/colis/search", params={"q": "fragile"}).json()["items"]
+        assert sorted(c["id"] for c in items) == [ids[1], ids[2]]
+
+    def test_search_text_pagination(self, client, colis_factory):
+        """Test de la pagination par curseur (score, id) des résultats classés"""
+        rows = [(("Colis fragile " * (i % 3 + 1)).strip(), "Lyon") for i in range(7)]
+        ids = [colis_factory(description=description, ville_destination=ville)["id"] for description, ville in rows]
+
+        seen = []
+        params = {"q": "fragile", "limit": 3, "statut": "créé"}
+        while True:
+            page = client.get("/colis/search", params=params).json()
+            seen += [c["id"] for c in page["items"]]
+            if page["next_cursor"] is None:
+                break
+            params["after"] = page["next_cursor"]
+
+        assert sorted(seen) == sorted(ids)
+        assert len(seen) == len(set(seen))
+
+    def test_search_text_pagination_tied_scores(self, client, colis_factory):
+        """Test de la pagination sur des scores tous égaux : ni doublon ni trou, départagés par id"""
+        ids = [colis_factory(description="Colis fragile", ville_destination="Lyon")["id"] for _ in range(8)]
+
+        seen = []
+        params = {"q": "fragile", "limit": 3}
+        for _ in range(len(ids)):
+            page = client.get("/colis/search", params=params).json()
+            seen += [c["id"] for c in page["items"]]
+            if page["next_cursor"] is None:
+                break
+            params["after"] = page["next_cursor"]
+
+        assert seen == ids
+
+    def test_search_text_score_double_precision(self):
+        """Test du score PostgreSQL en double précision : il fait l'aller-retour exact par le curseur"""
+        query, score = apply_text_search(select(Colis.id), "postgresql", "fragile", Colis)
+        sql = str(score.compile(dialect=postgresql.dialect()))
+        assert "CAST(word_similarity(" in sql
+        assert sql.endswith("AS DOUBLE PRECISION)")
+
+    @pytest.mark.parametrize("q, expected", [
+        ("fragile", '"fragile"*'),
+        ("montre  assuré", '"montre"* "assuré"*'),
+        ("n°4242", '"n 4242"*'),
+        ('"; --', None),
+    ])
+    def test_fts5_query(self, q, expected):
+        assert fts5_query(q) == expected
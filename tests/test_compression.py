@@ -0,0 +1,108 @@
+"""
+Tests de la compression des réponses (gzip / brotli)
+"""
+import pytest
+from fastapi import status
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+
+
+class TestCompressionAPI:
+    """Tests de la négociation et de la compression des listes et exports"""
+
+    @pytest.mark.parametrize("accept_encoding, expected", [
+        ("gzip", "gzip"),
+        pytest.param("gzip, br", "br", marks=pytest.mark.skipif(
+            compression.brotli is None, reason="brotli non installé (dépendance optionnelle)")),
+        ("br;q=0, gzip", "gzip"),
+        ("identity", None),
+    ])
+    def test_colis_list_compressed(self, client, colis_factory, sample_colis_data, accept_encoding, expected):
+        """Test de la liste des colis selon Accept-Encoding"""
+        colis_factory.seed()
+        client.post("/colis/bulk", json=[sample_colis_data] * 50)
+
+        response = client.get("/colis/", headers={"Accept-Encoding": accept_encoding})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers.get("content-encoding") == expected
+        assert len(response.json()["items"]) == 50
+        if expected:
+            assert response.headers["vary"] == "Accept-Encoding"
+            assert int(response.headers["content-length"]) < len(response.content)
+
+    def test_small_response_not_compressed(self, client):
+        """Test d'une réponse sous le seuil, envoyée telle quelle"""
+        response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"status": "healthy"}
+
+    def test_export_streamed_compressed(self, client, colis_factory, sample_colis_data):
+        """Test de l'export NDJSON compressé en flux"""
+        colis_factory.seed()
+        client.post("/colis/bulk", json=[sample_colis_data] * 50)
+
+        response = client.get("/colis/export", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert len(response.text.splitlines()) == 50
+
+    def test_etag_weakened_when_compressed(self, client, colis_factory):
+        """Test de l'ETag rendu faible sur une réponse compressée, toujours accepté en If-None-Match"""
+        (livreur,) = colis_factory.seed(nb_livreurs=1)
+        for _ in range(20):
+            response = client.post("/assignments/", json={"colis_id": colis_factory()["id"], "livreur_id": livreur.id})
+            assert response.status_code == status.HTTP_201_CREATED
+
+        url = f"/livreurs/{livreur.id}/colis"
+        response = client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 20
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"')
+
+        response = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+class TestCompressionMiddleware:
+    """Tests du middleware sur une application minimale"""
+
+    def _client(self, media_type, chunks):
+        async def endpoint(request):
+            async def body():
+                for chunk in chunks:
+                    yield chunk
+            return StreamingResponse(body(), media_type=media_type)
+
+        app = Starlette(routes=[Route("/", endpoint)])
+        return TestClient(CompressionMiddleware(app, minimum_size=100, gzip_level=6, brotli_quality=4))
+
+    def test_streaming_below_threshold(self):
+        """Les premiers morceaux sont retenus jusqu'au seuil, puis envoyés tels quels"""
+        response = self._client("application/x-ndjson", [b"a" * 10, b"b" * 10]).get(
+            "/", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.content == b"a" * 10 + b"b" * 10
+
+    def test_streaming_chunks(self):
+        """Un flux au-delà du seuil est compressé morceau par morceau"""
+        chunks = [f"{i}\n".encode() * 50 for i in range(20)]
+        response = self._client("text/csv", chunks).get("/", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == b"".join(chunks)
+
+    def test_event_stream_excluded(self):
+        """Le flux SSE n'est jamais compressé"""
+        response = self._client("text/event-stream", [b"data: x\n\n" * 50]).get(
+            "/", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_negotiate_encoding(self):
+        assert negotiate_encoding("*", ("br", "gzip")) == "br"
+        assert negotiate_encoding("gzip;q=0.5, br;q=0", ("br", "gzip")) == "gzip"
+        assert negotiate_encoding(None, ("gzip",)) is None
@@ -0,0 +1,210 @@
+"""
+Tests de concurrence des assignations (verrou de ligne et colonne version)
+"""
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, get_db
+from app.main import app
+from app.models.colis import Colis
+from app.models.historique_statut import HistoriqueStatut
+from app.utils.cache import clear_all_caches
+
+# Volume du test de charge, ajustable : STRESS_ASSIGNMENTS=20000 pytest -m stress
+STRESS_ASSIGNMENTS = int(os.environ.get("STRESS_ASSIGNMENTS", "2000"))
+STRESS_WORKERS = int(os.environ.get("STRESS_WORKERS", "16"))
+# Débit minimal vérifié seulement s'il est fourni (dépend de la machine)
+STRESS_MIN_THROUGHPUT = float(os.environ["STRESS_MIN_THROUGHPUT"]) if os.environ.get("STRESS_MIN_THROUGHPUT") else None
+
+
+class TestConcurrencyAPI:
+    """Tests du contrôle de version des colis"""
+
+    def test_assignment_with_stale_version(self, client, colis_factory):
+        """Une assignation fondée sur une version périmée est refusée (409)"""
+        livreur_a, livreur_b = colis_factory.seed(nb_livreurs=2)
+        colis = colis_factory()
+        assert colis["version"] == 1
+
+        # Deux dispatchers lisent la version 1 ; le premier gagne
+        first = client.post("/assignments/", json={"colis_id": colis["id"], "livreur_id": livreur_a.id, "version": 1})
+        assert first.status_code == status.HTTP_201_CREATED
+        assert first.json()["version"] == 2
+
+        second = client.post("/assignments/", json={"colis_id": colis["id"], "livreur_id": livreur_b.id, "version": 1})
+        assert second.status_code == status.HTTP_409_CONFLICT
+
+        current = client.get(f"/colis/{colis['id']}").json()
+        assert current["id_livreur"] == livreur_a.id
+        assert current["version"] == 2
+
+        # Sans version, l'assignation s'applique sur l'état courant
+        third = client.post("/assignments/", json={"colis_id": colis["id"], "livreur_id": livreur_b.id})
+        assert third.status_code == status.HTTP_201_CREATED
+        assert third.json()["version"] == 3
+
+    def test_update_with_stale_version(self, client, colis_factory):
+        """Une modification fondée sur une version périmée est refusée (409)"""
+        colis_id = colis_factory()["id"]
+
+        response = client.put(f"/colis/{colis_id}", json={"statut": "collecté", "version": 1})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["version"] == 2
+
+        response = client.put(f"/colis/{colis_id}", json={"statut": "livré", "version": 1})
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert client.get(f"/colis/{colis_id}").json()["statut"] == "collecté"
+
+    def test_batch_assignment_with_stale_version(self, client, colis_factory):
+        """Dans un lot, seul l'élément à version périmée est rejeté"""
+        (livreur,) = colis_factory.seed(nb_livreurs=1)
+        ids = [colis_factory()["id"] for _ in range(2)]
+        client.put(f"/colis/{ids[1]}", json={"description": "Modifié"})
+
+        response = client.post("/assignments/batch", json=[
+            {"colis_id": ids[0], "livreur_id": livreur.id, "version": 1},
+            {"colis_id": ids[1], "livreur_id": livreur.id, "version": 1},
+        ])
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["assigned"] == 1
+        assert [r["success"] for r in data["results"]] == [True, False]
+        assert data["results"][1]["message"] == "Colis modified concurrently"
+        assert client.get(f"/colis/{ids[0]}").json()["version"] == 2
+        assert client.get(f"/colis/{ids[1]}").json()["version"] == 2
+
+
+@pytest.fixture
+def concurrent_client(tmp_path):
+    """
+    Client de test sur une base SQLite fichier partagée par plusieurs
+    connexions : une session par requête, comme en production
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'stress.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=STRESS_WORKERS,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _wal(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    clear_all_caches()
+    with TestClient(app) as test_client:
+        yield test_client, SessionLocal
+    app.dependency_overrides.clear()
+    engine.dispose()
+
+
+@pytest.mark.stress
+def test_concurrent_assignments_no_lost_update(concurrent_client, colis_factory):
+    """
+    Des milliers d'assignations parallèles sur peu de colis : chaque succès
+    correspond à exactement une version, aucune écriture n'est perdue, les
+    compteurs de charge et l'historique restent cohérents
+    """
+    client, SessionLocal = concurrent_client
+    with SessionLocal() as db:
+        livreur_ids = [livreur.id for livreur in colis_factory.seed(db, nb_livreurs=STRESS_ASSIGNMENTS)]
+    colis_ids = [colis_factory(client)["id"] for _ in range(50)]
+
+    # Un livreur différent par requête : aucune assignation n'est sans effet,
+    # chaque succès modifie donc réellement la ligne
+    rng = random.Random(17)
+    requests = [(rng.choice(colis_ids), livreur_id) for livreur_id in livreur_ids]
+
+    def assign(request):
+        colis_id, livreur_id = request
+        response = client.post("/assignments/", json={"colis_id": colis_id, "livreur_id": livreur_id})
+        return colis_id, livreur_id, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=STRESS_WORKERS) as pool:
+        outcomes = list(pool.map(assign, requests))
+    elapsed = time.perf_counter() - started
+    throughput = len(requests) / elapsed
+
+    codes = Counter(code for _, _, code in outcomes)
+    print(f"\n{len(requests)} assignations en {elapsed:.2f} s ({throughput:.0f}/s) - {dict(codes)}")
+    assert set(codes) <= {status.HTTP_201_CREATED, status.HTTP_409_CONFLICT}
+    assert codes[status.HTTP_201_CREATED] > 0
+    if STRESS_MIN_THROUGHPUT is not None:
+        assert throughput >= STRESS_MIN_THROUGHPUT
+
+    # Chaque succès a incrémenté la version exactement une fois : deux succès
+    # partageant une même version (écriture perdue) laisseraient la version en retrait
+    successes = Counter(colis_id for colis_id, _, code in outcomes if code == status.HTTP_201_CREATED)
+
+    with SessionLocal() as db:
+        rows = {row.id: row for row in db.execute(select(Colis.id, Colis.id_livreur, Colis.version))}
+        for colis_id in colis_ids:
+            assert rows[colis_id].version == successes[colis_id] + 1
+
+        # Une création par colis, plus un passage "en transit" par colis assigné
+        historique = Counter(db.scalars(select(HistoriqueStatut.id_colis)))
+        for colis_id in colis_ids:
+            assert historique[colis_id] == (2 if successes[colis_id] else 1)
+
+    expected = Counter(row.id_livreur for row in rows.values() if row.id_livreur is not None)
+    workload = {item["id_livreur"]: item["total"] for item in client.get("/livreurs/workload").json()}
+    assert {k: v for k, v in workload.items() if v} == dict(expected)
+
+
+@pytest.mark.stress
+def test_concurrent_claims_no_double_assignment(concurrent_client, colis_factory, sample_colis_data):
+    """
+    Des livreurs vident la file en parallèle : chaque colis est pris en
+    charge une seule fois et la file est entièrement vidée
+    """
+    client, SessionLocal = concurrent_client
+    with SessionLocal() as db:
+        livreur_ids = [livreur.id for livreur in colis_factory.seed(db, nb_livreurs=STRESS_WORKERS * 4)]
+    response = client.post("/colis/bulk", json=[sample_colis_data] * STRESS_ASSIGNMENTS)
+    assert response.json()["created"] == STRESS_ASSIGNMENTS
+
+    def drain(worker):
+        claims = []
+        livreur_id = livreur_ids[worker]
+        while True:
+            response = client.post(f"/livreurs/{livreur_id}/claim?n=10")
+            assert response.status_code == status.HTTP_200_OK
+            if not response.json():
+                return claims
+            claims.extend((colis["id"], livreur_id) for colis in response.json())
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=STRESS_WORKERS) as pool:
+        results = list(pool.map(drain, range(len(livreur_ids))))
+    elapsed = time.perf_counter() - started
+
+    claims = [claim for result in results for claim in result]
+    print(f"\n{len(claims)} colis pris en charge en {elapsed:.2f} s ({len(claims) / elapsed:.0f}/s)")
+    assert len(claims) == STRESS_ASSIGNMENTS
+    assert len({colis_id for colis_id, _ in claims}) == STRESS_ASSIGNMENTS
+
+    with SessionLocal() as db:
+        owners = dict(db.execute(select(Colis.id, Colis.id_livreur)).all())
+    assert owners == dict(claims)
+    workload = {item["id_livreur"]: item["total"] for item in client.get("/livreurs/workload").json()}
+    assert {k: v for k, v in workload.items() if v} == dict(Counter(livreur_id for _, livreur_id in claims))
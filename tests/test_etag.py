@@ -0,0 +1,81 @@
+"""
+Tests des ETags et GET conditionnels (If-None-Match)
+"""
+import pytest
+from fastapi import status
+from app.models.livreur import Livreur
+from app.schemas.zone import ZoneRead
+from app.utils.etag import content_etag, etag_matches
+
+
+class TestETagAPI:
+    """Tests des réponses 304 sur les colis, les colis d'un livreur et les zones"""
+
+    def test_colis_etag(self, client, colis_factory):
+        """Test du GET conditionnel d'un colis, invalidé par une modification"""
+        colis_id = colis_factory()["id"]
+
+        response = client.get(f"/colis/{colis_id}")
+        etag = response.headers["etag"]
+        assert etag == f'"colis-{colis_id}-1"'
+
+        response = client.get(f"/colis/{colis_id}", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+
+        client.put(f"/colis/{colis_id}", json={"statut": "collecté"})
+        response = client.get(f"/colis/{colis_id}", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["statut"] == "collecté"
+        assert response.headers["etag"] != etag
+
+        assert client.get("/colis/999", headers={"If-None-Match": etag}).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_livreur_colis_etag(self, client, colis_factory, test_db, sample_livreur_data):
+        """Test du GET conditionnel des colis d'un livreur : ajout et modification changent l'ETag"""
+        colis_id = colis_factory()["id"]
+        other_id = colis_factory()["id"]
+        livreur = Livreur(**sample_livreur_data)
+        test_db.add(livreur)
+        test_db.commit()
+        client.post("/assignments/", json={"colis_id": colis_id, "livreur_id": livreur.id})
+
+        url = f"/livreurs/{livreur.id}/colis"
+        etag = client.get(url).headers["etag"]
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.post("/assignments/", json={"colis_id": other_id, "livreur_id": livreur.id})
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert [colis["id"] for colis in response.json()] == [colis_id, other_id]
+
+        etag = response.headers["etag"]
+        client.put(f"/colis/{colis_id}", json={"statut": "livré"})
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == status.HTTP_200_OK
+
+    def test_zones_etag(self, client, sample_zone_data):
+        """Test du GET conditionnel de la liste des zones"""
+        client.post("/zones/", json=sample_zone_data)
+        etag = client.get("/zones/").headers["etag"]
+
+        response = client.get("/zones/", headers={"If-None-Match": f'W/{etag}, "autre"'})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+        client.post("/zones/", json={"nom": "Zone Sud", "description": None})
+        response = client.get("/zones/", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()) == 2
+        # L'ETag est l'empreinte de la liste effectivement renvoyée
+        assert response.headers["etag"] == content_etag([ZoneRead(**zone) for zone in response.json()])
+
+    @pytest.mark.parametrize("header, expected", [
+        (None, False),
+        ('"a"', True),
+        ('W/"a"', True),
+        ('"b", "a"', True),
+        ("*", True),
+        ('"b"', False),
+    ])
+    def test_etag_matches(self, header, expected):
+        assert etag_matches(header, '"a"') is expected
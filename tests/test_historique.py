@@ -0,0 +1,67 @@
+"""
+Tests unitaires pour l'historique des statuts des colis
+"""
+import pytest
+from fastapi import status
+from app.models.historique_statut import HistoriqueStatut
+from app.models.livreur import Livreur
+
+
+class TestHistoriqueAPI:
+    """Tests pour l'endpoint GET /colis/{id}/historique"""
+
+    def test_historique_creation(self, client, colis_factory):
+        """Test que la création d'un colis ouvre son historique"""
+        colis_id = colis_factory()["id"]
+
+        response = client.get(f"/colis/{colis_id}/historique")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["ancien_statut"] is None
+        assert data[0]["nouveau_statut"] == "créé"
+
+    def test_historique_transitions(self, client, colis_factory, test_db, sample_livreur_data):
+        """Test de l'enregistrement des transitions par l'assignation et la modification"""
+        colis_id = colis_factory()["id"]
+        db_livreur = Livreur(**sample_livreur_data)
+        test_db.add(db_livreur)
+        test_db.commit()
+
+        client.post("/assignments/", json={"colis_id": colis_id, "livreur_id": db_livreur.id})
+        client.put(f"/colis/{colis_id}", json={"statut": "livré"})
+        # Modification sans changement de statut : pas de nouvelle entrée
+        client.put(f"/colis/{colis_id}", json={"statut": "livré", "description": "Colis livré"})
+
+        data = client.get(f"/colis/{colis_id}/historique").json()
+
+        assert [(e["ancien_statut"], e["nouveau_statut"]) for e in data] == [
+            (None, "créé"),
+            ("créé", "en transit"),
+            ("en transit", "livré"),
+        ]
+
+    def test_historique_colis_not_found(self, client):
+        """Test de l'historique d'un colis inexistant"""
+        response = client.get("/colis/99999/historique")
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_historique_supprime_avec_colis(self, client, colis_factory, test_db):
+        """Test que la suppression d'un colis supprime son historique"""
+        colis_id = colis_factory()["id"]
+
+        client.delete(f"/colis/{colis_id}")
+
+        assert test_db.query(HistoriqueStatut).filter(HistoriqueStatut.id_colis == colis_id).count() == 0
+
+    def test_historique_ajout_seul(self, client, colis_factory, test_db):
+        """Test qu'une entrée de l'historique ne peut pas être modifiée"""
+        colis_id = colis_factory()["id"]
+        entry = test_db.query(HistoriqueStatut).filter(HistoriqueStatut.id_colis == colis_id).one()
+
+        entry.nouveau_statut = "livré"
+        with pytest.raises(ValueError):
+            test_db.commit()
+        test_db.rollback()
@@ -0,0 +1,154 @@
+"""
+Tests des clés d'idempotence (en-tête Idempotency-Key)
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+from sqlalchemy import func, insert, select
+
+from app.core.config import settings
+from app.models.cle_idempotence import CleIdempotence
+from app.models.colis import Colis
+from app.models.historique_statut import HistoriqueStatut
+from app.models.livreur import Livreur
+from app.schemas.assignment import AssignmentCreate, AssignmentResponse
+from app.utils import idempotency
+from app.utils.cache import clear_all_caches
+
+
+@pytest.fixture(params=["memory", "database"])
+def store(request, monkeypatch):
+    """Les deux stockages, derrière la même interface (mémoire par défaut)"""
+    if request.param == "database":
+        monkeypatch.setattr(idempotency, "store", idempotency.DatabaseIdempotencyStore())
+    return request.param
+
+
+class TestIdempotencyAPI:
+    """Tests du rejeu des POST /colis et POST /assignments"""
+
+    def test_create_colis_replayed(self, store, client, colis_factory, test_db, sample_colis_data):
+        """Test d'une reprise de création : même réponse, aucun doublon"""
+        colis_factory.seed()
+        headers = {"Idempotency-Key": "mobile-42"}
+
+        first = client.post("/colis/", json=sample_colis_data, headers=headers)
+        assert first.status_code == status.HTTP_201_CREATED
+        assert "idempotent-replayed" not in first.headers
+
+        retry = client.post("/colis/", json=sample_colis_data, headers=headers)
+        assert retry.status_code == status.HTTP_201_CREATED
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert retry.json() == first.json()
+        assert test_db.scalar(select(func.count()).select_from(Colis)) == 1
+
+        # Clé réutilisée pour un autre corps
+        sample_colis_data["description"] = "Autre colis"
+        response = client.post("/colis/", json=sample_colis_data, headers=headers)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        # Sans clé, chaque requête est exécutée
+        client.post("/colis/", json=sample_colis_data)
+        assert test_db.scalar(select(func.count()).select_from(Colis)) == 2
+
+    def test_assignment_replayed(self, store, client, colis_factory, test_db, sample_livreur_data):
+        """Test d'une reprise d'assignation : ni nouvelle version ni nouvel historique"""
+        colis_id = colis_factory()["id"]
+        payload = {"colis_id": colis_id, "livreur_id": 1}
+        headers = {"Idempotency-Key": "assign-1"}
+
+        # Une erreur n'est pas conservée : la reprise est exécutée à nouveau
+        assert client.post("/assignments/", json=payload, headers=headers).status_code == status.HTTP_404_NOT_FOUND
+        test_db.add(Livreur(**sample_livreur_data))
+        test_db.commit()
+
+        first = client.post("/assignments/", json=payload, headers=headers)
+        assert first.status_code == status.HTTP_201_CREATED
+        retry = client.post("/assignments/", json=payload, headers=headers)
+        assert retry.status_code == status.HTTP_201_CREATED
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert retry.json() == first.json()
+
+        assert client.get(f"/colis/{colis_id}").json()["version"] == 2
+        historique = test_db.scalar(select(func.count()).where(HistoriqueStatut.id_colis == colis_id))
+        assert historique == 2
+
+    def test_same_key_per_endpoint(self, store, client, colis_factory, sample_colis_data):
+        """Test d'une même clé sur deux routes : portées distinctes"""
+        colis_factory.seed()
+        headers = {"Idempotency-Key": "k"}
+        colis_id = client.post("/colis/", json=sample_colis_data, headers=headers).json()["id"]
+        response = client.post("/assignments/", json={"colis_id": colis_id, "livreur_id": 99}, headers=headers)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_key_in_progress_elsewhere(self, client, colis_factory, test_db, monkeypatch, sample_colis_data):
+        """Test d'une clé réservée par un autre worker (stockage en base) : 409"""
+        monkeypatch.setattr(idempotency, "store", idempotency.DatabaseIdempotencyStore())
+        colis_factory.seed()
+        test_db.execute(insert(CleIdempotence).values(
+            cle="colis:busy", empreinte="x", expire_le=datetime.now(timezone.utc) + timedelta(hours=1)
+        ))
+        test_db.commit()
+
+        response = client.post("/colis/", json=sample_colis_data, headers={"Idempotency-Key": "busy"})
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert test_db.scalar(select(func.count()).select_from(Colis)) == 0
+
+    def test_expired_lease_taken_over(self, client, colis_factory, test_db, monkeypatch, sample_colis_data):
+        """Test d'une clé en cours dont le bail a expiré (worker arrêté) : la requête est exécutée"""
+        monkeypatch.setattr(idempotency, "store", idempotency.DatabaseIdempotencyStore())
+        colis_factory.seed()
+        test_db.execute(insert(CleIdempotence).values(
+            cle="colis:crash", empreinte="x", expire_le=datetime.now(timezone.utc) - timedelta(seconds=1)
+        ))
+        test_db.commit()
+
+        before = datetime.now(timezone.utc)
+        response = client.post("/colis/", json=sample_colis_data, headers={"Idempotency-Key": "crash"})
+        assert response.status_code == status.HTTP_201_CREATED
+        assert test_db.scalar(select(func.count()).select_from(Colis)) == 1
+
+        # Réponse conservée : la durée de conservation remplace le bail
+        expire_le = test_db.scalar(select(CleIdempotence.expire_le).where(CleIdempotence.cle == "colis:crash"))
+        if expire_le.tzinfo is None:
+            expire_le = expire_le.replace(tzinfo=timezone.utc)
+        assert expire_le > before + timedelta(hours=1)
+
+    def test_pending_key_short_lease(self, test_db):
+        """Test du bail d'une clé en cours : IDEMPOTENCY_LEASE_SECONDS, pas la durée de conservation"""
+        before = datetime.now(timezone.utc)
+        assert idempotency._db_reserve(test_db, "colis:lease", "x")
+        expire_le = test_db.scalar(select(CleIdempotence.expire_le).where(CleIdempotence.cle == "colis:lease"))
+        if expire_le.tzinfo is None:
+            expire_le = expire_le.replace(tzinfo=timezone.utc)
+        assert expire_le <= datetime.now(timezone.utc) + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+        assert expire_le >= before + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+        # Bail en cours : un autre worker ne peut pas la réserver
+        assert not idempotency._db_reserve(test_db, "colis:lease", "x")
+
+
+class TestIdempotencySingleFlight:
+    """Tests du regroupement des doublons simultanés"""
+
+    def test_concurrent_duplicates_collapsed(self):
+        clear_all_caches()
+        payload = AssignmentCreate(colis_id=1, livreur_id=1)
+        calls = []
+
+        async def handler():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return AssignmentResponse(colis_id=1, livreur_id=1, zone_id=None, version=2, message="ok")
+
+        async def scenario():
+            return await asyncio.gather(*(
+                idempotency.idempotent(None, "assignments", "dup", payload, handler, AssignmentResponse, 201)
+                for _ in range(10)
+            ))
+
+        responses = asyncio.run(scenario())
+        assert len(calls) == 1
+        assert len({response.body for response in responses}) == 1
+        assert sum(idempotency.REPLAYED_HEADER.lower() in response.headers for response in responses) == 9
@@ -3,6 +3,10 @@ Tests unitaires pour le module Livreur
 """
 import pytest
 from fastapi import status
+from app.controllers.workload_controller import rebuild_workload
+from app.models.client_expediteur import ClientExpediteur
+from app.models.destinataire import Destinataire
+from app.models.zone import Zone
 
 
 class TestLivreurAPI:
@@ -109,3 +113,87 @@ class TestLivreurAPI:
         
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
+    
+    def test_workload(self, client, test_db, sample_livreur_data, sample_colis_data,
+                      sample_client_data, sample_destinataire_data):
+        """Test des compteurs de charge à travers assignations, changements de statut et suppressions"""
+        db_client = ClientExpediteur(**sample_client_data)
+        db_dest = Destinataire(**sample_destinataire_data)
+        test_db.add_all([db_client, db_dest])
+        test_db.commit()
+        livreur_a = client.post("/livreurs/", json=sample_livreur_data).json()["id"]
+        livreur_b = client.post("/livreurs/", json=sample_livreur_data).json()["id"]
+        
+        sample_colis_data["id_client_expediteur"] = db_client.id
+        sample_colis_data["id_destinataire"] = db_dest.id
+        colis_ids = [client.post("/colis/", json=sample_colis_data).json()["id"] for _ in range(4)]
+        client.post("/colis/", json={**sample_colis_data, "id_livreur": livreur_b, "statut": "livré"})
+        client.post("/colis/bulk", json=[{**sample_colis_data, "id_livreur": livreur_b}])
+        
+        client.post("/assignments/", json={"colis_id": colis_ids[0], "livreur_id": livreur_a})
+        client.post("/assignments/batch", json=[
+            {"colis_id": colis_ids[1], "livreur_id": livreur_a},
+            {"colis_id": colis_ids[2], "livreur_id": livreur_a},
+        ])
+        client.put(f"/colis/{colis_ids[1]}", json={"statut": "livré"})
+        client.put(f"/colis/{colis_ids[2]}", json={"id_livreur": livreur_b})
+        client.delete(f"/colis/{colis_ids[0]}")
+        
+        response = client.get("/livreurs/workload")
+        
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [
+            {"id_livreur": livreur_a, "total": 1, "en_cours": 0, "par_statut": {"livré": 1}},
+            {"id_livreur": livreur_b, "total": 3, "en_cours": 2,
+             "par_statut": {"créé": 1, "en transit": 1, "livré": 1}},
+        ]
+        
+        # Les compteurs incrémentaux égalent un recalcul complet
+        rebuild_workload(test_db)
+        assert client.get("/livreurs/workload").json() == response.json()
+    
+    def test_claim_colis(self, client, test_db, sample_livreur_data, sample_colis_data,
+                         sample_client_data, sample_destinataire_data, sample_zone_data):
+        """Test de la prise en charge : zone du livreur, statuts en attente, priorité puis ancienneté"""
+        db_client = ClientExpediteur(**sample_client_data)
+        db_dest = Destinataire(**sample_destinataire_data)
+        zone_nord = Zone(**sample_zone_data)
+        zone_sud = Zone(nom="Zone Sud", description="Zone de livraison Sud")
+        test_db.add_all([db_client, db_dest, zone_nord, zone_sud])
+        test_db.commit()
+        livreur_id = client.post("/livreurs/", json=sample_livreur_data).json()["id"]
+        
+        sample_colis_data["id_client_expediteur"] = db_client.id
+        sample_colis_data["id_destinataire"] = db_dest.id
+        sample_colis_data["id_zone"] = zone_nord.id
+        ancien = client.post("/colis/", json=sample_colis_data).json()["id"]
+        urgent = client.post("/colis/", json={**sample_colis_data, "priorite": 5}).json()["id"]
+        en_stock = client.post("/colis/", json={**sample_colis_data, "statut": "en stock"}).json()["id"]
+        # Hors file : autre zone, déjà livré
+        client.post("/colis/", json={**sample_colis_data, "id_zone": zone_sud.id})
+        client.post("/colis/", json={**sample_colis_data, "statut": "livré"})
+        
+        response = client.post(f"/livreurs/{livreur_id}/claim?n=2")
+        
+        assert response.status_code == status.HTTP_200_OK
+        claimed = response.json()
+        assert [colis["id"] for colis in claimed] == [urgent, ancien]
+        assert all(colis["id_livreur"] == livreur_id for colis in claimed)
+        assert all(colis["statut"] == "en transit" and colis["version"] == 2 for colis in claimed)
+        
+        # Le reste de la file, puis une file vide
+        claimed = client.post(f"/livreurs/{livreur_id}/claim?n=10").json()
+        assert [(colis["id"], colis["statut"]) for colis in claimed] == [(en_stock, "en stock")]
+        assert client.post(f"/livreurs/{livreur_id}/claim").json() == []
+        
+        historique = client.get(f"/colis/{urgent}/historique").json()
+        assert [h["nouveau_statut"] for h in historique] == ["créé", "en transit"]
+        assert client.get("/livreurs/workload").json() == [
+            {"id_livreur": livreur_id, "total": 3, "en_cours": 3,
+             "par_statut": {"en transit": 2, "en stock": 1}},
+        ]
+    
+    def test_claim_colis_not_found(self, client):
+        """Test de prise en charge pour un livreur inexistant"""
+        response = client.post("/livreurs/999/claim")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,51 @@
+"""
+Test de charge mixte de l'API (harnais benchmarks/load_test.py, en processus)
+"""
+import json
+import os
+
+import pytest
+
+from app.main import app
+from benchmarks.common import make_engine
+from benchmarks.load_test import DEFAULT_MIX, Workload, in_process_client, run_load, seed_realistic
+
+# Volume ajustable : LOAD_REQUESTS=20000 LOAD_COLIS=100000 pytest -m load
+LOAD_COLIS = int(os.environ.get("LOAD_COLIS", "2000"))
+LOAD_REQUESTS = int(os.environ.get("LOAD_REQUESTS", "500"))
+LOAD_CONCURRENCY = int(os.environ.get("LOAD_CONCURRENCY", "8"))
+# Débit minimal vérifié seulement s'il est fourni (dépend de la machine)
+LOAD_MIN_THROUGHPUT = float(os.environ["LOAD_MIN_THROUGHPUT"]) if os.environ.get("LOAD_MIN_THROUGHPUT") else None
+
+
+@pytest.mark.load
+def test_mixed_workload(tmp_path):
+    """
+    Création, recherche, assignation et lecture simultanées : aucune erreur
+    serveur, chaque route mesurée, résultats sérialisables en JSON
+    """
+    engine = make_engine(
+        f"sqlite:///{tmp_path / 'load.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=LOAD_CONCURRENCY, max_overflow=0,
+    )
+    dataset = seed_realistic(engine, LOAD_COLIS, n_clients=50, n_destinataires=200, n_livreurs=20, n_zones=5)
+    try:
+        with in_process_client(engine) as client:
+            results = run_load(client, Workload(dataset, DEFAULT_MIX), LOAD_CONCURRENCY, requests=LOAD_REQUESTS)
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    total = results["total"]
+    print(f"\n{total['requests']} requêtes en {results['elapsed_s']} s ({total['rps']}/s), "
+          f"p95 {total['p95_ms']} ms")
+    assert total["requests"] == LOAD_REQUESTS
+    assert total["errors"] == 0
+    assert set(results["endpoints"]) == {
+        "POST /colis/", "GET /colis/search", "POST /assignments/", "GET /colis/{id}", "GET /livreurs/{id}/colis"
+    }
+    assert total["p50_ms"] <= total["p95_ms"] <= total["p99_ms"]
+    if LOAD_MIN_THROUGHPUT is not None:
+        assert total["rps"] >= LOAD_MIN_THROUGHPUT
+    json.dumps(results)
@@ -0,0 +1,82 @@
+"""
+Tests unitaires pour le module Monitoring (statistiques du pool de connexions)
+"""
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine, exc
+
+from app.core.pool_metrics import InstrumentedQueuePool, instrument_pool
+
+
+class TestPoolMetrics:
+    """Tests des compteurs du pool de connexions"""
+
+    def test_pool_metrics_route(self, client):
+        """Test de l'exposition des compteurs du pool"""
+        response = client.get("/metrics/pool")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert "sync" in data
+        for key in ("pool_size", "checked_out", "checkouts", "timeouts", "wait_time_avg_ms", "saturation"):
+            assert key in data["sync"]
+
+    def test_checkout_checkin_and_timeout(self, tmp_path, caplog):
+        """Test des compteurs d'emprunt, de la saturation et du délai d'attente"""
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.1,
+        )
+        metrics = instrument_pool(engine.pool, "test")
+        metrics.capacity = 1
+
+        first = engine.connect()
+        assert metrics.snapshot()["checked_out"] == 1
+        assert "saturé" in caplog.text
+
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        first.close()
+
+        snapshot = metrics.snapshot()
+        assert snapshot["checked_out"] == 0
+        assert snapshot["checkouts"] == 1
+        assert snapshot["checkins"] == 1
+        assert snapshot["timeouts"] == 1
+        assert snapshot["wait_time_max_ms"] >= 100
+        engine.dispose()
+
+
+class TestLogging:
+    """Tests de la journalisation asynchrone"""
+
+    def test_logging_metrics_route(self, client):
+        """Test de l'exposition de l'état de la file de journalisation"""
+        response = client.get("/metrics/logging")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["policy"] in ("drop", "block")
+        assert data["queue_capacity"] > 0
+
+    def test_bounded_queue_drops_when_full(self):
+        """Test de la politique d'abandon quand la file est pleine"""
+        import logging
+        import queue
+        from app.utils.logger import BoundedQueueHandler
+
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2), policy="drop")
+        logger = logging.getLogger("tests.bounded_queue")
+        logger.propagate = False
+        logger.addHandler(handler)
+        try:
+            for i in range(5):
+                logger.warning(f"message {i}")
+        finally:
+            logger.removeHandler(handler)
+
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
@@ -0,0 +1,80 @@
+"""
+Tests unitaires pour les événements temps réel (bus, WebSocket, SSE)
+"""
+import asyncio
+import json
+
+from app.core.events import EventBus, InMemoryBackend, sse_stream
+
+
+class TestEventBus:
+    """Tests du bus d'événements en processus"""
+
+    def test_filtres(self):
+        """Test que seuls les événements correspondant aux filtres sont reçus"""
+        async def scenario():
+            bus = EventBus(InMemoryBackend(), queue_size=10)
+            subscription = bus.subscribe(zone_id=2)
+            bus.publish("colis.updated", colis_id=1, id_zone=1, id_livreur=None)
+            bus.publish("colis.updated", colis_id=2, id_zone=2, id_livreur=None)
+            await asyncio.sleep(0)
+            return [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+
+        events = asyncio.run(scenario())
+
+        assert [e["colis_id"] for e in events] == [2]
+
+    def test_file_bornee(self):
+        """Test qu'un abonné lent ne conserve que les événements les plus récents"""
+        async def scenario():
+            bus = EventBus(InMemoryBackend(), queue_size=3)
+            subscription = bus.subscribe()
+            for colis_id in range(10):
+                bus.publish("colis.updated", colis_id=colis_id)
+            await asyncio.sleep(0)
+            events = [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+            return events, bus.stats()
+
+        events, stats = asyncio.run(scenario())
+
+        assert [e["colis_id"] for e in events] == [7, 8, 9]
+        assert stats["dropped"] == 7
+        assert stats["published"] == 10
+
+    def test_sse_format(self):
+        """Test du format Server-Sent Events et du keepalive"""
+        async def scenario():
+            bus = EventBus(InMemoryBackend(), queue_size=10)
+            subscription = bus.subscribe()
+            stream = sse_stream(subscription, keepalive=0.01)
+            keepalive = await stream.__anext__()
+            bus.publish("colis.assigned", colis_id=5, statut="en transit")
+            chunk = await stream.__anext__()
+            await stream.aclose()
+            return keepalive, chunk
+
+        keepalive, chunk = asyncio.run(scenario())
+
+        assert keepalive == b": keepalive\n\n"
+        lines = chunk.decode("utf-8").split("\n")
+        assert lines[1] == "event: colis.assigned"
+        assert json.loads(lines[2][len("data: "):])["colis_id"] == 5
+
+
+class TestRealtimeAPI:
+    """Tests pour le WebSocket /ws/colis"""
+
+    def test_websocket_update(self, client, colis_factory):
+        """Test de la réception d'un changement de statut par WebSocket"""
+        colis_id = colis_factory()["id"]
+        other_id = colis_factory()["id"]
+
+        with client.websocket_connect(f"/ws/colis?colis_id={colis_id}") as websocket:
+            client.put(f"/colis/{other_id}", json={"statut": "livré"})
+            client.put(f"/colis/{colis_id}", json={"statut": "en transit"})
+            event = websocket.receive_json()
+
+        assert event["type"] == "colis.updated"
+        assert event["colis_id"] == colis_id
+        assert event["statut"] == "en transit"
+        assert client.get("/metrics/events").json()["subscribers"] == 0
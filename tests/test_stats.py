@@ -0,0 +1,61 @@
+"""
+Tests unitaires pour les statistiques du tableau de bord
+"""
+import pytest
+from fastapi import status
+from app.models.client_expediteur import ClientExpediteur
+from app.models.destinataire import Destinataire
+from app.models.zone import Zone
+
+
+class TestStatsAPI:
+    """Tests pour l'endpoint GET /stats/colis"""
+
+    def test_colis_stats(self, client, test_db, sample_colis_data,
+                         sample_client_data, sample_destinataire_data):
+        """Test des compteurs par statut, zone et livreur"""
+        db_client = ClientExpediteur(**sample_client_data)
+        db_dest = Destinataire(**sample_destinataire_data)
+        db_zone = Zone(nom="Zone Nord")
+        test_db.add_all([db_client, db_dest, db_zone])
+        test_db.commit()
+        sample_colis_data["id_client_expediteur"] = db_client.id
+        sample_colis_data["id_destinataire"] = db_dest.id
+        for statut, zone_id, poids in [("créé", db_zone.id, "2kg"), ("créé", db_zone.id, "3kg"),
+                                       ("créé", None, "inconnu"), ("livré", db_zone.id, "500 g")]:
+            client.post("/colis/", json={**sample_colis_data, "statut": statut, "id_zone": zone_id, "poids": poids})
+
+        response = client.get("/stats/colis")
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total"] == 4
+        assert data["par_statut"] == {"créé": 3, "livré": 1}
+        assert data["poids_total_kg"] == 5.5
+        assert data["poids_moyen_kg"] == pytest.approx(5.5 / 3, abs=0.001)
+        groupes = {
+            (g["statut"], g["id_zone"], g["id_livreur"]): (g["nombre"], g["poids_total_kg"], g["poids_moyen_kg"])
+            for g in data["groupes"]
+        }
+        assert groupes == {
+            ("créé", db_zone.id, None): (2, 5.0, 2.5),
+            ("créé", None, None): (1, 0.0, None),
+            ("livré", db_zone.id, None): (1, 0.5, 0.5),
+        }
+
+    def test_colis_stats_cache(self, client, test_db, sample_colis_data,
+                               sample_client_data, sample_destinataire_data):
+        """Test que le résultat est servi depuis le cache pendant sa durée de vie"""
+        first = client.get("/stats/colis").json()
+        db_client = ClientExpediteur(**sample_client_data)
+        db_dest = Destinataire(**sample_destinataire_data)
+        test_db.add_all([db_client, db_dest])
+        test_db.commit()
+        sample_colis_data["id_client_expediteur"] = db_client.id
+        sample_colis_data["id_destinataire"] = db_dest.id
+        client.post("/colis/", json=sample_colis_data)
+
+        second = client.get("/stats/colis").json()
+
+        assert second == first
+        assert client.get("/metrics/cache").json()["stats"]["hits"] == 1